@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
@@ -224,8 +225,10 @@ async def send_message(
             user_nickname = "사용자"  # 오류 시 기본값
         
         # AI 서비스를 통한 메시지 처리 (페르소나 타입과 사용자 닉네임 포함)
+        # LLM 왕복 동안 이벤트 루프가 멈추지 않도록 스레드풀에서 실행
         ai_service = AIService(db)
-        ai_response_content = ai_service.process_message(
+        ai_response_content = await run_in_threadpool(
+            ai_service.process_message,
             session_id=session_id, 
             user_message=message_request.content,
             persona_type=persona_type,
@@ -394,7 +397,9 @@ async def get_personalized_greeting(
         try:
             if user_analysis_result:
                 print(f"[개인화 인사] AI 서비스로 개인화된 인사 생성 요청")
-                greeting = ai_service._generate_personalized_greeting(persona_type, user_analysis_result, user_nickname)
+                greeting = await run_in_threadpool(
+                    ai_service._generate_personalized_greeting, persona_type, user_analysis_result, user_nickname
+                )
                 print(f"[개인화 인사] 생성된 인사: {greeting}")
                 
                 # 🆕 개인화된 인사를 채팅 메시지로 저장 (사이드바 히스토리에 표시되도록)
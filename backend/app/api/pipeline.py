@@ -5,13 +5,14 @@ TestPage.tsx에서 버튼 클릭 시 호출되는 통합 파이프라인 인터
 """
 
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any
 import os
 import uuid
 import json
 import asyncio
+import threading
 from datetime import datetime
 import pytz
 from pathlib import Path
@@ -21,6 +22,10 @@ from ..database import get_db
 from ..models.test import DrawingTest, DrawingTestResult
 from ..models.user import UserInformation
 from ..schemas.test import DrawingTestCreate, DrawingTestResultCreate
+from ..services.analysis_queue import get_analysis_queue, get_worker_pool, QueueFullError
+from ..services.progress_events import get_progress_bus
+from ..services.progress_store import get_progress_store, AnalysisProgressStore
+from ..services.warmup import get_pipeline_warmup
 from .auth import get_current_user
 
 # HTP 파이프라인 모듈 (절대 경로로 import)
@@ -29,38 +34,63 @@ project_root = Path(__file__).parent.parent.parent
 pipeline_module_path = project_root / 'llm' / 'model'
 sys.path.insert(0, str(pipeline_module_path))
 
-try:
-    from main import HTPAnalysisPipeline, PipelineStatus, PipelineResult
-    PIPELINE_IMPORT_ERROR = None
-    print("✅ HTP 파이프라인 모듈 import 성공")
-except Exception as e:
-    import sys
-    error_msg = str(e)
-    print(f"❌ HTP 파이프라인 import 실패: {e}", file=sys.stderr)
+# 파이프라인 모듈은 import 시점에 모델/OpenSearch를 초기화하므로 앱 import를 막지 않도록 지연 로드
+# (시작 시 워밍업 스레드에서 load_pipeline_module()로 미리 불러옴)
+HTPAnalysisPipeline = None
+PipelineStatus = None
+PipelineResult = None
+PIPELINE_IMPORT_ERROR = None
+_pipeline_import_attempted = False
+_pipeline_import_lock = threading.Lock()
+
+
+def load_pipeline_module() -> bool:
+    """HTP 파이프라인 모듈 import (최초 1회만 시도)
     
-    if "numpy.dtype size changed" in error_msg:
-        print(f"💡 numpy/pandas 버전 충돌 해결방법:", file=sys.stderr)
-        print(f"   conda install -c conda-forge numpy pandas --force-reinstall", file=sys.stderr)
-        print(f"   또는 pip uninstall numpy pandas -y && pip install numpy pandas", file=sys.stderr)
-    else:
-        print(f"💡 일반적인 해결방법:", file=sys.stderr)
-        print(f"   pip install pandas transformers ultralytics torch opencv-python scikit-learn", file=sys.stderr)
+    Returns:
+        bool: import 성공 여부 (실패 원인은 PIPELINE_IMPORT_ERROR)
+    """
+    global HTPAnalysisPipeline, PipelineStatus, PipelineResult, PIPELINE_IMPORT_ERROR, _pipeline_import_attempted
+    if _pipeline_import_attempted:
+        return HTPAnalysisPipeline is not None
     
-    HTPAnalysisPipeline = None
-    PipelineStatus = None
-    PipelineResult = None
-    PIPELINE_IMPORT_ERROR = error_msg
+    with _pipeline_import_lock:
+        if _pipeline_import_attempted:
+            return HTPAnalysisPipeline is not None
+        try:
+            from main import HTPAnalysisPipeline, PipelineStatus, PipelineResult
+            PIPELINE_IMPORT_ERROR = None
+            print("✅ HTP 파이프라인 모듈 import 성공")
+        except Exception as e:
+            error_msg = str(e)
+            print(f"❌ HTP 파이프라인 import 실패: {e}", file=sys.stderr)
+            
+            if "numpy.dtype size changed" in error_msg:
+                print(f"💡 numpy/pandas 버전 충돌 해결방법:", file=sys.stderr)
+                print(f"   conda install -c conda-forge numpy pandas --force-reinstall", file=sys.stderr)
+                print(f"   또는 pip uninstall numpy pandas -y && pip install numpy pandas", file=sys.stderr)
+            else:
+                print(f"💡 일반적인 해결방법:", file=sys.stderr)
+                print(f"   pip install pandas transformers ultralytics torch opencv-python scikit-learn", file=sys.stderr)
+            
+            HTPAnalysisPipeline = None
+            PipelineStatus = None
+            PipelineResult = None
+            PIPELINE_IMPORT_ERROR = error_msg
+        _pipeline_import_attempted = True
+    return HTPAnalysisPipeline is not None
 
 router = APIRouter()
 
 # 전역 파이프라인 인스턴스
 pipeline_instance= None
+_pipeline_instance_lock = threading.Lock()
 
 def get_pipeline():
     """파이프라인 인스턴스 가져오기 (싱글톤 패턴)"""
     global pipeline_instance
     if pipeline_instance is None:
-        if HTPAnalysisPipeline is None:
+        if not load_pipeline_module():
             missing_packages = ["pandas", "transformers", "ultralytics", "torch", "opencv-python", "scikit-learn"]
             raise HTTPException(
                 status_code=503,  # Service Unavailable
@@ -72,7 +102,9 @@ def get_pipeline():
                     "status": "service_unavailable"
                 }
             )
-        pipeline_instance = HTPAnalysisPipeline()
+        with _pipeline_instance_lock:
+            if pipeline_instance is None:
+                pipeline_instance = HTPAnalysisPipeline()
     return pipeline_instance
 
 
@@ -156,6 +188,19 @@ async def analyze_drawing_image(
                 detail="지원하지 않는 이미지 형식입니다. (.jpg, .jpeg, .png, .bmp, .gif 지원)"
             )
         
+        # 모델 워밍업이 끝나기 전에는 요청을 받지 않음 (요청이 콜드 스타트를 기다리지 않도록)
+        warmup = get_pipeline_warmup()
+        if not warmup.is_ready:
+            print(f"⏳ 분석 파이프라인 워밍업 중 - 요청 거절")
+            raise _warming_up_exception(warmup)
+        
+        # 대기열이 가득 찬 경우 이미지 저장 전에 바로 거절 (backpressure)
+        analysis_queue = get_analysis_queue()
+        worker_pool = get_worker_pool()
+        if worker_pool.is_running and not analysis_queue.has_capacity():
+            print(f"❌ 분석 대기열 초과: {analysis_queue.pending_count()}/{analysis_queue.max_pending}")
+            raise _queue_full_exception(analysis_queue)
+        
         unique_id = str(uuid.uuid4())
         image_filename = f"{unique_id}{file_extension}"
         
@@ -182,48 +227,29 @@ async def analyze_drawing_image(
         pipeline_upload_dir.mkdir(parents=True, exist_ok=True)
         pipeline_image_path = pipeline_upload_dir / f"{unique_id}.jpg"
         
-        # 이미지를 JPG 형식으로 변환하여 저장
-        import PIL.Image as PILImage
-        from PIL import ImageOps
-        import io
+        # 업로드 이미지를 한 번만 디코딩하여 모든 해상도/단계에서 재사용
+        from image_artifact import ImageArtifact
         
-        # 업로드된 파일을 PIL Image로 로드
         image_data = await upload_file.read()
-        pil_image = PILImage.open(io.BytesIO(image_data))
-        
-        # EXIF 회전 정보 자동 적용 (스마트폰 사진 회전 문제 해결)
-        try:
-            pil_image = ImageOps.exif_transpose(pil_image)
-            print(f"✅ EXIF 회전 정보 적용 완료")
-        except Exception as e:
-            print(f"⚠️ EXIF 회전 정보 적용 실패 (무시 가능): {e}")
-        
-        # RGB 모드로 변환 (RGBA 등 다른 모드 처리)
-        if pil_image.mode != 'RGB':
-            pil_image = pil_image.convert('RGB')
+        image_artifact = ImageArtifact.from_bytes(image_data, unique_id)
+        print(f"✅ 이미지 디코딩 완료 (EXIF 회전 적용): {image_artifact.size}")
         
         # 다중 해상도 이미지 저장
         print(f"📸 다중 해상도 이미지 저장 시작...")
         
-        # 1. 원본 저장 (사용자 조회용, 고품질)
-        pil_image.save(original_path, 'JPEG', quality=95, optimize=True)
-        print(f"✅ 원본 저장 완료: {original_path}")
-        
-        # 2. YOLO용 압축 (320x320, quality=10)
-        yolo_image = pil_image.copy()
-        yolo_image.thumbnail((320, 320), PILImage.Resampling.LANCZOS)
-        yolo_image.save(yolo_path, 'JPEG', quality=10, optimize=True)
-        print(f"✅ YOLO용 압축 완료: {yolo_path} (320x320, q=10)")
+        # 1. 파이프라인용 디렉토리에 YOLO 압축본 저장 (320x320, quality=10)
+        #    분석 워커가 바로 읽어야 하므로 동기 저장
+        image_artifact.save(str(pipeline_image_path), max_size=(320, 320), quality=10)
+        print(f"✅ 파이프라인 호환성 저장 완료: {pipeline_image_path}")
         
-        # 3. 웹용 중간 품질 (640x640, quality=85)
-        web_image = pil_image.copy()
-        web_image.thumbnail((640, 640), PILImage.Resampling.LANCZOS)
-        web_image.save(web_path, 'JPEG', quality=85, optimize=True)
-        print(f"✅ 웹용 이미지 완료: {web_path} (640x640, q=85)")
+        # 2. 원본은 image_url로 바로 조회될 수 있으므로 레코드 생성 전에 동기 저장
+        image_artifact.save(str(original_path), quality=95)
+        print(f"✅ 원본 이미지 저장 완료: {original_path}")
         
-        # 4. 파이프라인용 디렉토리에 YOLO 압축본 저장 (기존 호환성)
-        yolo_image.save(pipeline_image_path, 'JPEG', quality=10, optimize=True)
-        print(f"✅ 파이프라인 호환성 저장 완료: {pipeline_image_path}")
+        # 3. YOLO용/웹용 이미지는 백그라운드로 저장 (YOLO용은 위에서 인코딩한 바이트 재사용)
+        image_artifact.save(str(yolo_path), max_size=(320, 320), quality=10, background=True)
+        image_artifact.save(str(web_path), max_size=(640, 640), quality=85, background=True)
+        print(f"✅ YOLO용(320x320, q=10)/웹용(640x640, q=85) 이미지 백그라운드 저장 시작")
         
         # 6. 데이터베이스에 테스트 레코드 생성 (원본 이미지 경로 저장)
         seoul_tz = pytz.timezone('Asia/Seoul')
@@ -240,22 +266,54 @@ async def analyze_drawing_image(
         db.commit()
         db.refresh(drawing_test)
         
-        # 7. 백그라운드에서 분석 실행
-        background_tasks.add_task(
-            run_analysis_pipeline,
-            unique_id,
-            drawing_test.test_id,
-            description
-        )
+        # 7. 분석 작업 큐에 등록 (워커 풀 미사용 시 기존처럼 백그라운드 태스크로 실행)
+        if not worker_pool.is_running:
+            # 같은 프로세스에서 실행하므로 디스크에 저장한 압축본과 같은 이미지를 메모리로 전달
+            background_tasks.add_task(
+                run_analysis_pipeline,
+                unique_id,
+                drawing_test.test_id,
+                description,
+                image_artifact=image_artifact.reencoded((320, 320), 10)
+            )
+            
+            return JSONResponse(
+                status_code=202,  # Accepted
+                content={
+                    "message": "이미지 분석이 시작되었습니다.",
+                    "test_id": drawing_test.test_id,
+                    "task_id": unique_id,
+                    "status": "processing",
+                    "estimated_time": "2-3분 소요 예상"
+                }
+            )
+        
+        try:
+            job = analysis_queue.enqueue(unique_id, drawing_test.test_id, description)
+        except QueueFullError:
+            save_analysis_error_sync(drawing_test.test_id, "분석 요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해주세요.", db)
+            raise _queue_full_exception(analysis_queue)
+        
+        queue_position = analysis_queue.position(job)
+        estimated_wait = analysis_queue.estimate_wait_seconds(queue_position, worker_pool.num_workers)
+        get_progress_bus().publish(drawing_test.test_id, {
+            "type": "queued",
+            "queue_position": queue_position,
+            "estimated_wait_seconds": round(estimated_wait)
+        })
+        print(f"📥 분석 작업 등록: job_id={job['job_id']}, 대기 순번={queue_position}, 예상 {estimated_wait:.0f}초")
         
         return JSONResponse(
             status_code=202,  # Accepted
             content={
-                "message": "이미지 분석이 시작되었습니다.",
+                "message": "이미지 분석이 대기열에 등록되었습니다.",
                 "test_id": drawing_test.test_id,
                 "task_id": unique_id,
-                "status": "processing",
-                "estimated_time": "2-3분 소요 예상"
+                "job_id": job["job_id"],
+                "status": "queued",
+                "queue_position": queue_position,
+                "estimated_wait_seconds": round(estimated_wait),
+                "estimated_time": f"약 {max(1, round(estimated_wait / 60))}분 소요 예상"
             }
         )
         
@@ -268,11 +326,43 @@ async def analyze_drawing_image(
         )
 
 
+def _queue_full_exception(analysis_queue) -> HTTPException:
+    """대기열 초과 시 반환할 503 응답 (Retry-After 포함)"""
+    retry_after = max(1, round(analysis_queue.average_duration()))
+    return HTTPException(
+        status_code=503,
+        detail={
+            "error": "분석 요청이 많아 잠시 후 다시 시도해주세요.",
+            "pending_jobs": analysis_queue.pending_count(),
+            "max_pending": analysis_queue.max_pending,
+            "status": "queue_full"
+        },
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+def _warming_up_exception(warmup) -> HTTPException:
+    """워밍업 미완료 시 반환할 503 응답 (Retry-After 포함)"""
+    snapshot = warmup.snapshot()
+    failed = snapshot["state"] == "failed"
+    return HTTPException(
+        status_code=503,
+        detail={
+            "error": "분석 기능을 사용할 수 없습니다." if failed else "분석 모델을 준비 중입니다. 잠시 후 다시 시도해주세요.",
+            "status": "warmup_failed" if failed else "warming_up",
+            "components": {name: c["status"] for name, c in snapshot["components"].items()}
+        },
+        headers={"Retry-After": "60" if failed else "10"}
+    )
+
+
 def run_analysis_pipeline(
     unique_id: str,
     test_id: int,
-    description: Optional[str]
-):
+    description: Optional[str],
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    image_artifact=None
+) -> Optional[str]:
     """
     백그라운드에서 실행되는 HTP 분석 파이프라인
     
@@ -280,7 +370,16 @@ def run_analysis_pipeline(
         unique_id: 고유 이미지 ID
         test_id: 데이터베이스 테스트 ID
         description: 사용자 설명
+        progress_callback: 진행 이벤트 전달 함수 (기본값: 현재 프로세스의 이벤트 버스에 발행)
+        image_artifact: 업로드 단계에서 디코딩한 이미지 (같은 프로세스에서 실행할 때만 전달)
+    
+    Returns:
+        Optional[str]: 분석 실패 시 오류 메시지, 성공 시 None (오류는 DB에 저장하고 다시 raise하지 않음)
     """
+    if progress_callback is None:
+        progress_bus = get_progress_bus()
+        progress_callback = lambda event: progress_bus.publish(test_id, event)
+    
     # 백그라운드 태스크용 새 DB 세션 생성 (HTTP 요청 세션과 독립적)
     from ..database import SessionLocal
     import time  # time 모듈 import 추가
@@ -293,9 +392,16 @@ def run_analysis_pipeline(
         print(f"🚀 [PERFORMANCE] 백그라운드 분석 시작: {unique_id}")
         print(f"🕐 [PERFORMANCE] 분석 시작시간: {analysis_start_datetime.strftime('%H:%M:%S.%f')[:-3]} ({analysis_start_time:.3f}초)")
         
-        # 파이프라인 실행
+        # 파이프라인 실행 (같은 이미지의 분석 결과가 캐시에 있으면 바로 사용)
         pipeline = get_pipeline()
-        result: PipelineResult = pipeline.analyze_image(unique_id)
+        result, cache_key = pipeline.lookup_cached_result(unique_id, image_artifact=image_artifact)
+        if result is not None:
+            print(f"♻️ [PERFORMANCE] 결과 캐시 적중 - 분석 생략: {unique_id}")
+            _notify_progress(progress_callback, {"type": "cache_hit"})
+        else:
+            result = pipeline.analyze_image(unique_id, progress_callback=progress_callback,
+                                            image_artifact=image_artifact)
+            pipeline.store_cached_result(result, cache_key)
         
         analysis_end_time = time.time()
         analysis_duration = analysis_end_time - analysis_start_time
@@ -309,12 +415,20 @@ def run_analysis_pipeline(
         save_analysis_result_sync(result, test_id, description, db)
         print(f"🔥 save_analysis_result_sync 함수 호출 완료 - test_id: {test_id}")
         
+        # 결과가 DB에 저장된 뒤 완료 이벤트 발행 (클라이언트는 이 시점에 결과 조회)
+        succeeded = PipelineStatus is not None and result.status == PipelineStatus.SUCCESS
+        _notify_progress(progress_callback, {
+            "type": "completed" if succeeded else "failed",
+            "error": None if succeeded else result.error_message
+        })
+        
         total_end_time = time.time() 
         total_duration = total_end_time - analysis_start_time
         total_end_datetime = datetime.fromtimestamp(total_end_time, tz=seoul_tz)
         print(f"✅ [PERFORMANCE] 분석 완료 및 저장: {unique_id}")
         print(f"🕐 [PERFORMANCE] 최종 완료시간: {total_end_datetime.strftime('%H:%M:%S.%f')[:-3]} ({total_end_time:.3f}초)")
         print(f"⏱️  [PERFORMANCE] 총 소요시간 (분석+저장): {total_duration:.2f}초 ({total_duration/60:.1f}분)")
+        return None if succeeded else (result.error_message or f"분석 실패: {result.status}")
         
     except Exception as e:
         error_time = time.time()
@@ -336,26 +450,49 @@ def run_analysis_pipeline(
         
         # 빈 결과로 오류 상태 저장
         try:
-            seoul_tz = pytz.timezone('Asia/Seoul')
-            utc_now = datetime.utcnow().replace(tzinfo=pytz.UTC)
-            seoul_time = utc_now.astimezone(seoul_tz).replace(tzinfo=None)
-            
-            error_result = DrawingTestResult(
-                test_id=test_id,
-                persona_type=None,
-                summary_text=f"분석 중 오류가 발생했습니다: {str(e)}",
-                created_at=seoul_time
-            )
-            
-            db.add(error_result)
-            db.commit()
-            print(f"오류 상태 저장 완료: {test_id}")
+            save_analysis_error_sync(test_id, f"분석 중 오류가 발생했습니다: {str(e)}", db)
         except Exception as db_error:
             print(f"오류 상태 저장 실패: {db_error}")
+        
+        _notify_progress(progress_callback, {"type": "failed", "error": str(e)})
+        return str(e)
     finally:
         db.close()
 
 
+def _notify_progress(progress_callback: Callable[[Dict[str, Any]], None], event: Dict[str, Any]):
+    """진행 이벤트 전달 (전달 실패가 분석 결과 저장에 영향을 주지 않도록 함)"""
+    try:
+        event.setdefault("timestamp", datetime.now().timestamp())
+        progress_callback(event)
+    except Exception as e:
+        print(f"⚠️ 진행 이벤트 전달 실패: {e}")
+
+
+def save_analysis_error_sync(test_id: int, message: str, db: Session):
+    """
+    분석 실패 시 오류 상태를 결과 테이블에 저장
+    
+    Args:
+        test_id: 데이터베이스 테스트 ID
+        message: 사용자에게 보여줄 오류 메시지
+        db: 데이터베이스 세션
+    """
+    seoul_tz = pytz.timezone('Asia/Seoul')
+    utc_now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+    seoul_time = utc_now.astimezone(seoul_tz).replace(tzinfo=None)
+    
+    error_result = DrawingTestResult(
+        test_id=test_id,
+        persona_type=None,
+        summary_text=message,
+        created_at=seoul_time
+    )
+    
+    db.add(error_result)
+    db.commit()
+    print(f"오류 상태 저장 완료: {test_id}")
+
 
 def save_analysis_result_sync(
     result: Any,  # PipelineResult가 None일 수 있으므로 Any 사용
@@ -613,93 +750,77 @@ async def get_analysis_status(
         ).first()
         
         if not test_result:
-            # 파이프라인 진행상황 확인
-            pipeline = get_pipeline()
+            # 진행 상태 저장소에서 조회 (파일 확인 없이 O(1))
+            state = get_progress_store().get(test_id)
+            if state is None:
+                state = AnalysisProgressStore.from_db_status(test_id, drawing_test.analysis_status)
             
-            # 이미지 파일명 추출 (URL에서 파일명 부분만)
-            image_url = drawing_test.image_url  # "result/images/original/{unique_id}.jpg"
-            if image_url:
-                # "result/images/original/uuid.jpg" -> "uuid"
-                import re
-                match = re.search(r'result/images/original/(.+?)\.jpg', image_url)
-                if match:
-                    unique_id = match.group(1)
-                    status_info = pipeline.get_analysis_status(unique_id)
-                    
-                    # 단계별 진행상황 구성
-                    detection_completed = status_info.get("detection_completed", False)
-                    analysis_completed = status_info.get("analysis_completed", False)
-                    classification_completed = status_info.get("classification_completed", False)
-                    
-                    steps = [
-                        {
-                            "name": "객체 탐지",
-                            "description": "YOLO를 사용한 그림 요소 검출",
-                            "completed": detection_completed,
-                            "current": not detection_completed
-                        },
-                        {
-                            "name": "심리 분석", 
-                            "description": "GPT-4를 사용한 심리상태 분석",
-                            "completed": analysis_completed,
-                            "current": detection_completed and not analysis_completed
-                        },
-                        {
-                            "name": "성격 분류",
-                            "description": "키워드 분류기를 사용한 성격유형 분류", 
-                            "completed": classification_completed,
-                            "current": analysis_completed and not classification_completed
-                        }
-                    ]
-                    
-                    # 현재 진행 중인 단계 찾기
-                    current_step = next((i+1 for i, step in enumerate(steps) if step["current"]), 1)
-                    completed_steps = sum(1 for step in steps if step["completed"])
-                    
-                    # 모든 단계가 완료되었는지 확인
-                    if classification_completed:
-                        # 3단계 모두 완료된 경우, 최종 결과가 DB에 저장될 때까지 잠시 대기
-                        print(f"🎯 모든 단계 완료됨 - 최종 결과 대기 중")
-                        return JSONResponse(content={
-                            "test_id": test_id,
-                            "status": "processing",
-                            "message": "최종 결과 생성 중...",
-                            "steps": steps,
-                            "current_step": 3,
-                            "completed_steps": 3,
-                            "total_steps": 3,
-                            "estimated_remaining": "잠시만 기다려주세요"
-                        })
-                    
+            # 아직 워커가 가져가지 않은 작업이면 대기 순번 반환
+            if state is None or state["status"] == "queued":
+                analysis_queue = get_analysis_queue()
+                job = analysis_queue.get_job_by_test_id(test_id)
+                if job and job["status"] == "queued":
+                    queue_position = analysis_queue.position(job)
+                    estimated_wait = analysis_queue.estimate_wait_seconds(
+                        queue_position, get_worker_pool().num_workers
+                    )
                     return JSONResponse(content={
                         "test_id": test_id,
                         "status": "processing",
-                        "message": f"단계 {current_step}/3 진행 중...",
-                        "steps": steps,
-                        "current_step": current_step,
-                        "completed_steps": completed_steps,
+                        "queue_status": "queued",
+                        "queue_position": queue_position,
+                        "estimated_wait_seconds": round(estimated_wait),
+                        "message": f"분석 대기 중입니다 (대기 순번 {queue_position}번)",
+                        "steps": _build_analysis_steps(0, 1, waiting=True),
+                        "current_step": 1,
+                        "completed_steps": 0,
                         "total_steps": 3,
-                        "estimated_remaining": f"{4-completed_steps}분 소요 예상"
+                        "estimated_remaining": f"약 {max(1, round(estimated_wait / 60))}분"
                     })
             
-            # 기본 응답 (파일명 추출 실패 시)
+            if state is None:
+                # 기본 응답 (진행 이벤트가 아직 없는 경우)
+                return JSONResponse(content={
+                    "test_id": test_id,
+                    "status": "processing",
+                    "message": "분석이 진행 중입니다...",
+                    "steps": _build_analysis_steps(0, 1),
+                    "current_step": 1,
+                    "completed_steps": 0,
+                    "total_steps": 3,
+                    "estimated_remaining": "2-3분"
+                })
+            
+            current_step = state["current_step"]
+            completed_steps = state["completed_steps"]
+            steps = _build_analysis_steps(completed_steps, current_step)
+            
+            if completed_steps >= 3 or state["status"] in ("completed", "failed"):
+                # 3단계 모두 완료된 경우, 최종 결과가 DB에 저장될 때까지 잠시 대기
+                return JSONResponse(content={
+                    "test_id": test_id,
+                    "status": "processing",
+                    "message": "최종 결과 생성 중...",
+                    "steps": steps,
+                    "current_step": 3,
+                    "completed_steps": completed_steps,
+                    "total_steps": 3,
+                    "estimated_remaining": "잠시만 기다려주세요"
+                })
+            
             return JSONResponse(content={
                 "test_id": test_id,
-                "status": "processing", 
-                "message": "분석이 진행 중입니다...",
-                "steps": [
-                    {"name": "객체 탐지", "description": "그림 요소 검출 중", "completed": False, "current": True},
-                    {"name": "심리 분석", "description": "심리상태 분석 대기 중", "completed": False, "current": False},
-                    {"name": "성격 분류", "description": "키워드 기반 성격유형 분류 대기 중", "completed": False, "current": False}
-                ],
-                "current_step": 1,
-                "completed_steps": 0,
+                "status": "processing",
+                "message": f"단계 {current_step}/3 진행 중...",
+                "steps": steps,
+                "current_step": current_step,
+                "completed_steps": completed_steps,
                 "total_steps": 3,
-                "estimated_remaining": "2-3분"
+                "stage_timings": state.get("stage_timings", {}),
+                "estimated_remaining": f"{4-completed_steps}분 소요 예상"
             })
         
         # DB에서 직접 확률 데이터 가져오기 (기존 JSON 파일 의존성 제거)
-        pipeline = get_pipeline()
         result_text = test_result.summary_text  # DB에서 직접 가져오기
         
         # 성격 유형 매핑 (persona_type ID -> 이름)
@@ -778,6 +899,106 @@ async def get_analysis_status(
         )
 
 
+def _build_analysis_steps(completed_steps: int, current_step: int, waiting: bool = False) -> list:
+    """상태 조회 응답의 단계별 진행 정보 구성"""
+    steps = [
+        ("객체 탐지", "YOLO를 사용한 그림 요소 검출"),
+        ("심리 분석", "GPT-4를 사용한 심리상태 분석"),
+        ("성격 분류", "키워드 분류기를 사용한 성격유형 분류")
+    ]
+    return [
+        {
+            "name": name,
+            "description": "분석 대기 중" if waiting and index == 1 else description,
+            "completed": index <= completed_steps,
+            "current": index == current_step and index > completed_steps
+        }
+        for index, (name, description) in enumerate(steps, start=1)
+    ]
+
+
+@router.get("/analysis-events/{test_id}")
+async def stream_analysis_events(
+    test_id: int,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    분석 진행 이벤트 스트림 API (Server-Sent Events)
+    
+    단계 시작/종료 시점에 이벤트를 바로 전달합니다. 이미 지나간 이벤트는 접속 시 다시 전달되며,
+    completed/failed 이벤트 이후 스트림이 종료됩니다. 단계별 최소 표시 시간은 클라이언트에서 처리합니다.
+    
+    Args:
+        test_id: 테스트 ID
+        db: 데이터베이스 세션
+        current_user: 현재 사용자
+        
+    Returns:
+        StreamingResponse: text/event-stream 응답
+    """
+    drawing_test = db.query(DrawingTest).filter(
+        DrawingTest.test_id == test_id,
+        DrawingTest.user_id == current_user["user_id"]
+    ).first()
+    
+    if not drawing_test:
+        raise HTTPException(
+            status_code=404,
+            detail="해당 테스트를 찾을 수 없습니다."
+        )
+    
+    progress_bus = get_progress_bus()
+    
+    # 이벤트 이력이 없는데 결과가 이미 저장된 경우 (서버 재시작 등) 완료 이벤트만 전달
+    already_finished = not progress_bus.history(test_id) and db.query(DrawingTestResult).filter(
+        DrawingTestResult.test_id == test_id
+    ).first() is not None
+    
+    async def event_stream():
+        if already_finished:
+            yield _format_sse({"type": "completed", "test_id": test_id})
+            return
+        async for event in progress_bus.subscribe(test_id):
+            if event is None:
+                # 프록시 타임아웃 방지용 keep-alive 주석
+                yield ": keep-alive\n\n"
+                continue
+            yield _format_sse(event)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    """이벤트 dict를 SSE 메시지 형식으로 변환"""
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+@router.get("/queue-stats")
+async def get_queue_stats():
+    """
+    분석 작업 큐 상태 조회 API
+    
+    대기/실행/완료/실패 작업 수와 워커 프로세스 상태를 확인할 때 사용합니다.
+    
+    Returns:
+        JSON: 작업 큐 및 워커 풀 상태
+    """
+    worker_pool = get_worker_pool()
+    return JSONResponse(content={
+        "running": worker_pool.is_running,
+        "timestamp": datetime.now().isoformat(),
+        **worker_pool.stats()
+    })
+
+
 @router.get("/pipeline-health")
 async def check_pipeline_health():
     """
@@ -801,11 +1022,15 @@ async def check_pipeline_health():
                 "directories": False
             },
             "directories": {},
+            "models": {},
             "error_details": None
         }
         
+        # 워밍업 진행 상태 (구성 요소별 로드 상태)
+        status["warmup"] = get_pipeline_warmup().snapshot()
+        
         # 파이프라인 import 확인
-        if HTPAnalysisPipeline is not None:
+        if load_pipeline_module():
             status["components"]["pipeline_import"] = True
             
             try:
@@ -836,6 +1061,9 @@ async def check_pipeline_health():
                 ]
                 status["components"]["directories"] = all(d.exists() for d in required_dirs)
                 
+                # 레지스트리 모델 상태 (로드 시간, 메모리 사용량)
+                status["models"] = pipeline.get_model_status()
+                
             except Exception as pipeline_error:
                 status["error_details"] = f"Pipeline initialization failed: {str(pipeline_error)}"
         else:
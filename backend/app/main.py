@@ -98,6 +98,14 @@ async def startup_event():
         finally:
             db.close()
         
+        # 3. 그림 분석 워커 풀 시작 (중단된 분석 작업은 다시 대기열로 복구)
+        from .services.analysis_queue import get_worker_pool
+        get_worker_pool().start()
+        
+        # 4. 분석 파이프라인 워밍업 (백그라운드 스레드에서 모델 로드, 완료 전까지 분석 요청은 503)
+        from .services.warmup import get_pipeline_warmup
+        get_pipeline_warmup().start()
+        
         print("Care Chat API is starting...")
     except Exception as e:
         print(f"Application initialization failed: {e}")
@@ -105,6 +113,30 @@ async def startup_event():
         traceback.print_exc()
         raise
 
+# 종료 이벤트
+@app.on_event("shutdown")
+async def shutdown_event():
+    """애플리케이션 종료 시 실행"""
+    from .services.analysis_queue import get_worker_pool
+    from .services.warmup import get_pipeline_warmup
+    get_pipeline_warmup().stop()
+    get_worker_pool().stop()
+    print("Care Chat API is shutting down...")
+
+# 헬스 체크 (liveness: 프로세스 응답 여부 / readiness: 분석 모델 워밍업 완료 여부)
+@app.get("/health/live", tags=["health"])
+async def health_live():
+    """프로세스가 요청에 응답하는지 확인 (모델 로드 여부와 무관)"""
+    from .services.warmup import get_pipeline_warmup
+    return {"status": "alive", "warmup": get_pipeline_warmup().snapshot()["state"]}
+
+@app.get("/health/ready", tags=["health"])
+async def health_ready():
+    """분석 요청을 받을 준비가 되었는지 확인 (구성 요소별 워밍업 상태 포함, 미준비 시 503)"""
+    from .services.warmup import get_pipeline_warmup
+    snapshot = get_pipeline_warmup().snapshot()
+    return JSONResponse(status_code=200 if snapshot["ready"] else 503, content=snapshot)
+
 # 422 오류 전용 핸들러 추가
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException
@@ -11,6 +11,7 @@ class DrawingTest(Base):
     user_id = Column(Integer, ForeignKey('user_informations.user_id'), nullable=False)
     image_url = Column(String(2048))
     submitted_at = Column(DateTime, nullable=False)
+    analysis_status = Column(String(32))  # 분석 진행 단계 (ANALYSIS_PROGRESS_DB_MIRROR 사용 시 기록)
     
     # 관계 정의
     user_information = relationship("UserInformation", back_populates="drawing_tests")
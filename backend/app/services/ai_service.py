@@ -6,7 +6,6 @@ import pytz
 from sqlalchemy.orm import Session
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from ..models.chat import ChatSession, ChatMessage
 from .prompt_manager import PersonaPromptManager
 from pydantic import SecretStr
@@ -14,7 +13,9 @@ from dotenv import load_dotenv
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'llm', 'model'))
 from prompt_chaining import ChainedPromptManager
+from llm_gateway import get_llm_gateway, LLMResponse
 
 load_dotenv()
 # OPENAPIKEY 생성 
@@ -27,10 +28,12 @@ class AIService:
     def __init__(self, db: Session):
         self.db = db
         
-        # OpenAI API 키가 있으면 
+        # OpenAI API 키가 있으면 공용 LLM 게이트웨이 사용 (파이프라인과 동시 실행/분당 제한 공유)
         if OPENAI_API_KEY and str(OPENAI_API_KEY) != "None":
-            self.llm = ChatOpenAI(model="gpt-4o", api_key=OPENAI_API_KEY, 
-                                    temperature=0.9, max_tokens=1000)
+            self.llm = get_llm_gateway()
+            self.model = "gpt-4o"
+            self.temperature = 0.9
+            self.max_tokens = 1000
         else: # OpenAI API키가 없을 경우 에러 발생 
             raise ValueError("OpenAI API 키가 없습니다. 환경 변수(OPENAI_API_KEY)를 설정해주세요.")
         
@@ -38,6 +41,21 @@ class AIService:
         self.prompt_manager = PersonaPromptManager()
         self.chained_prompt_manager = ChainedPromptManager()
     
+    def _invoke_llm(self, llm_messages: list, caller: str) -> LLMResponse:
+        """LangChain 메시지 목록을 게이트웨이 형식으로 변환하여 호출"""
+        role_mapping = {"system": "system", "human": "user", "ai": "assistant"}
+        messages = [
+            {"role": role_mapping.get(msg.type, "user"), "content": msg.content}
+            for msg in llm_messages
+        ]
+        return self.llm.chat(
+            messages,
+            caller=f"chat:{caller}",
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature
+        )
+    
     def get_persona_prompt(self, persona_type: str = "내면형", **context) -> str:
         """페르소나별 시스템 프롬프트 생성"""
         return self.prompt_manager.get_persona_prompt(persona_type, **context)
@@ -325,7 +343,7 @@ class AIService:
             llm_messages.append(HumanMessage(content=user_message))
             
             # OpenAI API 호출
-            response = self.llm.invoke(llm_messages)
+            response = self._invoke_llm(llm_messages, "common_response")
             common_response = response.content
             
             # 토큰 사용량 계산
@@ -396,7 +414,7 @@ class AIService:
             ]
             
             # OpenAI API 호출
-            response = self.llm.invoke(llm_messages)
+            response = self._invoke_llm(llm_messages, "persona_transform")
             persona_response = response.content
             
             # 토큰 사용량 계산
@@ -411,11 +429,10 @@ class AIService:
     
     def _calculate_tokens(self, llm_messages: list, response_content: str, response_obj) -> Dict[str, int]:
         """토큰 사용량 계산"""
-        if hasattr(response_obj, 'response_metadata') and 'token_usage' in response_obj.response_metadata:
-            token_usage = response_obj.response_metadata['token_usage']
+        if getattr(response_obj, 'prompt_tokens', 0) or getattr(response_obj, 'completion_tokens', 0):
             return {
-                'input': token_usage.get('prompt_tokens', 0),
-                'output': token_usage.get('completion_tokens', 0)
+                'input': response_obj.prompt_tokens,
+                'output': response_obj.completion_tokens
             }
         else:
             # 대략적인 토큰 계산 (1토큰 ≈ 4글자)
@@ -515,7 +532,7 @@ class AIService:
         # GPT-4o 호출
         from langchain.schema import HumanMessage
         
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+        response = self._invoke_llm([HumanMessage(content=prompt)], "greeting")
         greeting = response.content.strip()
         
         print(f"[AI] DB 기반 개인화된 인사 생성: {greeting}")
@@ -577,7 +594,7 @@ class AIService:
 
             # GPT로 요약 생성
             from langchain.schema import HumanMessage
-            response = self.llm.invoke([HumanMessage(content=summary_prompt)])
+            response = self._invoke_llm([HumanMessage(content=summary_prompt)], "history_summary")
             summary = response.content.strip()
             
             print(f"[요약] 생성된 대화 요약: {summary}")
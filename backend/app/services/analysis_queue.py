@@ -0,0 +1,570 @@
+"""
+그림 분석 작업 큐 서비스
+- SQLite 기반 로컬 작업 큐 (프로세스 재시작 시에도 작업 유지)
+- HTPAnalysisPipeline을 올려두는 분석 전용 워커 프로세스 풀
+- 동시 실행 수 제한, 대기열 길이 제한(backpressure), 대기 순번/예상 시간 계산
+"""
+import os
+import math
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+import multiprocessing
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .progress_events import get_progress_bus
+from .warmup import OPTIONAL_COMPONENTS
+
+logger = logging.getLogger(__name__)
+
+BACKEND_ROOT = Path(__file__).parent.parent.parent
+
+# 작업 큐 설정 (환경변수)
+QUEUE_DB_PATH = os.getenv("ANALYSIS_QUEUE_DB", str(BACKEND_ROOT / "result" / "queue" / "analysis_jobs.db"))
+NUM_WORKERS = max(0, int(os.getenv("ANALYSIS_WORKERS", "1")))  # 0이면 워커 풀 없이 API 프로세스에서 실행
+MAX_PENDING_JOBS = int(os.getenv("ANALYSIS_QUEUE_MAX_PENDING", "100"))
+MAX_ATTEMPTS = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", "2"))
+POLL_INTERVAL = float(os.getenv("ANALYSIS_WORKER_POLL_INTERVAL", "1.0"))
+# 실행 중 작업의 임대 시간 (초). 워커가 주기적으로 갱신하며, 만료된 작업만 다른 프로세스가 복구
+JOB_LEASE_SECONDS = float(os.getenv("ANALYSIS_JOB_LEASE_SECONDS", "120"))
+HEARTBEAT_INTERVAL = JOB_LEASE_SECONDS / 4
+
+# 완료 이력이 없을 때 사용하는 작업당 예상 소요시간 (초)
+DEFAULT_JOB_SECONDS = 120.0
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 차서 작업을 받을 수 없을 때 발생"""
+
+    def __init__(self, pending: int, limit: int):
+        super().__init__(f"분석 대기열이 가득 찼습니다 ({pending}/{limit})")
+        self.pending = pending
+        self.limit = limit
+
+
+class AnalysisJobQueue:
+    """SQLite 기반 분석 작업 큐
+
+    API 프로세스와 워커 프로세스가 같은 DB 파일을 공유합니다.
+    호출마다 짧은 연결을 열어 사용하므로 프로세스/스레드 간 공유에 안전합니다.
+    """
+
+    def __init__(self, db_path: str = QUEUE_DB_PATH, max_pending: int = MAX_PENDING_JOBS,
+                 max_attempts: int = MAX_ATTEMPTS, lease_seconds: float = JOB_LEASE_SECONDS):
+        self.db_path = db_path
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    unique_id TEXT NOT NULL,
+                    test_id INTEGER NOT NULL,
+                    description TEXT,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker_id TEXT,
+                    error TEXT,
+                    enqueued_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    heartbeat_at REAL
+                )
+            """)
+            # 임대(heartbeat) 컬럼 추가 이전에 만든 DB 파일 호환
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(analysis_jobs)")}
+            if "heartbeat_at" not in columns:
+                conn.execute("ALTER TABLE analysis_jobs ADD COLUMN heartbeat_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_jobs_status ON analysis_jobs (status, enqueued_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_jobs_test_id ON analysis_jobs (test_id)")
+        finally:
+            conn.close()
+
+    def pending_count(self) -> int:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM analysis_jobs WHERE status = ?", (JOB_QUEUED,)
+            ).fetchone()
+            return row[0]
+        finally:
+            conn.close()
+
+    def has_capacity(self) -> bool:
+        """대기열에 새 작업을 받을 여유가 있는지 확인"""
+        return self.max_pending <= 0 or self.pending_count() < self.max_pending
+
+    def enqueue(self, unique_id: str, test_id: int, description: Optional[str]) -> Dict[str, Any]:
+        """분석 작업 등록
+
+        Raises:
+            QueueFullError: 대기열이 가득 찬 경우
+        """
+        job_id = str(uuid.uuid4())
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM analysis_jobs WHERE status = ?", (JOB_QUEUED,)
+            ).fetchone()[0]
+            if self.max_pending > 0 and pending >= self.max_pending:
+                conn.execute("ROLLBACK")
+                raise QueueFullError(pending, self.max_pending)
+            conn.execute(
+                "INSERT INTO analysis_jobs (job_id, unique_id, test_id, description, status, enqueued_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, unique_id, test_id, description, JOB_QUEUED, time.time())
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        logger.info(f"분석 작업 등록: job_id={job_id}, test_id={test_id}")
+        return self.get_job(job_id)
+
+    def claim_next(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """가장 오래된 대기 작업을 원자적으로 가져와 실행 상태로 변경"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM analysis_jobs WHERE status = ? ORDER BY enqueued_at LIMIT 1",
+                (JOB_QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE analysis_jobs SET status = ?, worker_id = ?, started_at = ?, heartbeat_at = ?, "
+                "attempts = attempts + 1 WHERE job_id = ?",
+                (JOB_RUNNING, worker_id, now, now, row["job_id"])
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return self.get_job(row["job_id"])
+
+    def heartbeat(self, worker_id: str) -> int:
+        """워커가 실행 중인 작업의 임대 갱신 (갱신된 작업 수 반환)"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE analysis_jobs SET heartbeat_at = ? WHERE status = ? AND worker_id = ?",
+                (time.time(), JOB_RUNNING, worker_id)
+            )
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def complete(self, job_id: str):
+        self._finish(job_id, JOB_DONE, None)
+
+    def fail(self, job_id: str, error: str):
+        self._finish(job_id, JOB_FAILED, error)
+
+    def _finish(self, job_id: str, status: str, error: Optional[str]):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE analysis_jobs SET status = ?, error = ?, finished_at = ? WHERE job_id = ?",
+                (status, error, time.time(), job_id)
+            )
+        finally:
+            conn.close()
+
+    def requeue_in_flight(self, worker_ids: Optional[List[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """실행 중 상태로 남은 작업을 다시 대기열로 복귀 (재시작/워커 비정상 종료 복구)
+
+        같은 DB를 공유하는 다른 API 프로세스의 워커가 실행 중인 작업을 가져가지 않도록,
+        worker_ids를 지정하지 않으면 임대(heartbeat)가 만료된 작업만 복구합니다.
+
+        Args:
+            worker_ids: 종료가 확인된 워커 ID 목록. None이면 임대가 만료된 작업
+
+        Returns:
+            Dict: requeued(재등록된 작업), abandoned(최대 시도 횟수 초과로 실패 처리된 작업)
+        """
+        conn = self._connect()
+        requeued, abandoned = [], []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT * FROM analysis_jobs WHERE status = ?", (JOB_RUNNING,)
+            ).fetchall()
+            lease_expired_before = time.time() - self.lease_seconds
+            for row in rows:
+                if worker_ids is not None:
+                    if row["worker_id"] not in worker_ids:
+                        continue
+                elif (row["heartbeat_at"] or row["started_at"] or 0) > lease_expired_before:
+                    continue
+                if row["attempts"] >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE analysis_jobs SET status = ?, error = ?, finished_at = ? WHERE job_id = ?",
+                        (JOB_FAILED, "워커 중단으로 분석이 완료되지 않았습니다.", time.time(), row["job_id"])
+                    )
+                    abandoned.append(dict(row))
+                else:
+                    conn.execute(
+                        "UPDATE analysis_jobs SET status = ?, worker_id = NULL, started_at = NULL WHERE job_id = ?",
+                        (JOB_QUEUED, row["job_id"])
+                    )
+                    requeued.append(dict(row))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        if requeued or abandoned:
+            logger.warning(f"중단된 분석 작업 복구: 재등록 {len(requeued)}건, 실패 처리 {len(abandoned)}건")
+        return {"requeued": requeued, "abandoned": abandoned}
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM analysis_jobs WHERE job_id = ?", (job_id,)).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+
+    def get_job_by_test_id(self, test_id: int) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT * FROM analysis_jobs WHERE test_id = ? ORDER BY enqueued_at DESC LIMIT 1",
+                (test_id,)
+            ).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+
+    def position(self, job: Dict[str, Any]) -> int:
+        """대기 순번 (1부터 시작, 실행 중이거나 끝난 작업은 0)"""
+        if job["status"] != JOB_QUEUED:
+            return 0
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM analysis_jobs WHERE status = ? AND enqueued_at <= ?",
+                (JOB_QUEUED, job["enqueued_at"])
+            ).fetchone()
+            return row[0]
+        finally:
+            conn.close()
+
+    def average_duration(self, window: int = 20) -> float:
+        """최근 완료된 작업들의 평균 소요시간 (초)"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT finished_at - started_at FROM analysis_jobs "
+                "WHERE status = ? AND started_at IS NOT NULL AND finished_at IS NOT NULL "
+                "ORDER BY finished_at DESC LIMIT ?",
+                (JOB_DONE, window)
+            ).fetchall()
+        finally:
+            conn.close()
+        durations = [row[0] for row in rows if row[0] and row[0] > 0]
+        return sum(durations) / len(durations) if durations else DEFAULT_JOB_SECONDS
+
+    def estimate_wait_seconds(self, position: int, num_workers: int) -> float:
+        """대기 순번과 워커 수로 예상 완료 시간 계산 (앞선 작업 + 자신의 작업)"""
+        rounds = math.ceil(max(position, 1) / max(num_workers, 1))
+        return rounds * self.average_duration()
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM analysis_jobs GROUP BY status"
+            ).fetchall()
+        finally:
+            conn.close()
+        counts = {status: 0 for status in (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)}
+        counts.update({row[0]: row[1] for row in rows})
+        return {
+            "counts": counts,
+            "max_pending": self.max_pending,
+            "average_job_seconds": round(self.average_duration(), 2)
+        }
+
+
+def _heartbeat_loop(queue: AnalysisJobQueue, worker_id: str, stop_event, interval: float):
+    """실행 중인 작업의 임대를 주기적으로 갱신 (분석이 오래 걸려도 다른 프로세스가 복구하지 않도록)"""
+    while not stop_event.wait(interval):
+        try:
+            queue.heartbeat(worker_id)
+        except Exception as e:
+            logger.warning(f"[{worker_id}] 작업 임대 갱신 실패: {e}")
+
+
+def _worker_main(db_path: str, worker_id: str, poll_interval: float, stop_event, event_queue, ready_event,
+                 status_conn):
+    """분석 워커 프로세스 진입점
+
+    프로세스 시작 시 파이프라인을 생성하고 모델을 미리 로드(워밍업)한 뒤,
+    필수 구성 요소(OPTIONAL_COMPONENTS 제외)가 모두 준비되면 ready_event를 설정합니다.
+    워밍업 결과는 status_conn으로 API 프로세스에 전달하고, 필수 구성 요소가 실패한 워커는
+    모든 작업이 실패할 것이므로 작업을 가져가지 않고 종료 신호만 기다립니다.
+    진행 이벤트는 event_queue를 통해 API 프로세스의 이벤트 버스로 전달됩니다.
+    """
+    from ..api.pipeline import get_pipeline, run_analysis_pipeline
+
+    queue = AnalysisJobQueue(db_path)
+    threading.Thread(
+        target=_heartbeat_loop, args=(queue, worker_id, stop_event, HEARTBEAT_INTERVAL),
+        name=f"{worker_id}-heartbeat", daemon=True
+    ).start()
+    try:
+        statuses = get_pipeline().warm_up()
+    except Exception as e:
+        logger.error(f"[{worker_id}] 파이프라인 초기화 실패: {e}")
+        statuses = {"pipeline": {"status": "failed", "seconds": None, "error": str(e)}}
+
+    failed = [name for name, status in statuses.items() if status["status"] != "ready"]
+    required_failed = [name for name in failed if name not in OPTIONAL_COMPONENTS]
+    try:
+        status_conn.send(statuses)
+    except Exception as e:
+        logger.warning(f"[{worker_id}] 워밍업 결과 전달 실패: {e}")
+
+    if required_failed:
+        logger.error(f"[{worker_id}] 필수 구성 요소 워밍업 실패로 작업을 받지 않습니다: {required_failed}")
+        stop_event.wait()
+        return
+    if failed:
+        logger.warning(f"[{worker_id}] 선택 구성 요소 워밍업 실패 (RAG 없이 분석): {failed}")
+    ready_event.set()
+    logger.info(f"[{worker_id}] 분석 워커 준비 완료 (pid={os.getpid()})")
+
+    while not stop_event.is_set():
+        job = queue.claim_next(worker_id)
+        if job is None:
+            stop_event.wait(poll_interval)
+            continue
+
+        logger.info(f"[{worker_id}] 분석 작업 시작: job_id={job['job_id']}, test_id={job['test_id']}")
+        test_id = job["test_id"]
+        try:
+            error = run_analysis_pipeline(
+                job["unique_id"], test_id, job["description"],
+                progress_callback=lambda event: event_queue.put((test_id, event))
+            )
+            if error is None:
+                queue.complete(job["job_id"])
+            else:
+                logger.error(f"[{worker_id}] 분석 작업 실패: job_id={job['job_id']} - {error}")
+                queue.fail(job["job_id"], error)
+        except Exception as e:
+            logger.error(f"[{worker_id}] 분석 작업 실패: job_id={job['job_id']} - {e}")
+            queue.fail(job["job_id"], str(e))
+
+
+class AnalysisWorkerPool:
+    """분석 전용 워커 프로세스 풀
+
+    - 워커 수만큼만 동시에 분석이 실행됩니다 (bounded concurrency)
+    - 워커 ID에 API 프로세스 pid와 임의 접미사를 붙여 같은 DB를 공유하는 다른 프로세스의 워커와 구분합니다
+    - 시작 시와 모니터 주기마다 임대가 만료된 작업(종료된 프로세스가 남긴 작업)을 다시 대기열에 올립니다
+    - 모니터 스레드가 비정상 종료된 워커를 감지하여 작업을 복구하고 워커를 재시작합니다
+    """
+
+    def __init__(self, queue: AnalysisJobQueue, num_workers: int = NUM_WORKERS,
+                 poll_interval: float = POLL_INTERVAL, monitor_interval: float = 5.0):
+        self.queue = queue
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.monitor_interval = monitor_interval
+        self._ctx = multiprocessing.get_context("spawn")
+        # 컨테이너 재시작 후 pid가 같아도 이전 프로세스의 워커 ID와 겹치지 않도록 임의 접미사 추가
+        self._pool_id = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._stop_event = None
+        self._event_queue = None
+        self._processes: Dict[str, Any] = {}
+        self._ready_events: Dict[str, Any] = {}
+        self._status_conns: Dict[str, Any] = {}
+        self._warmup_results: Dict[str, Dict[str, Any]] = {}
+        self._status_lock = threading.Lock()
+        self._monitor_thread: Optional[threading.Thread] = None
+        self._monitor_stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._processes) and not self._monitor_stop.is_set()
+
+    def start(self):
+        """워커 프로세스 시작 (중단된 작업 복구 포함)"""
+        with self._lock:
+            if self._processes or self.num_workers <= 0:
+                return
+
+            recovered = self.queue.requeue_in_flight()
+            self._handle_abandoned(recovered["abandoned"])
+
+            self._stop_event = self._ctx.Event()
+            self._event_queue = self._ctx.Queue()
+            get_progress_bus().start_relay(self._event_queue)
+            self._monitor_stop.clear()
+            for index in range(self.num_workers):
+                self._spawn(f"{self._pool_id}-worker-{index}")
+
+            self._monitor_thread = threading.Thread(
+                target=self._monitor, name="analysis-worker-monitor", daemon=True
+            )
+            self._monitor_thread.start()
+            logger.info(f"분석 워커 풀 시작: {self.num_workers}개 프로세스")
+
+    def _spawn(self, worker_id: str):
+        ready_event = self._ctx.Event()
+        status_recv, status_send = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.queue.db_path, worker_id, self.poll_interval, self._stop_event, self._event_queue,
+                  ready_event, status_send),
+            name=f"analysis-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self._processes[worker_id] = process
+        self._ready_events[worker_id] = ready_event
+        with self._status_lock:
+            self._status_conns[worker_id] = status_recv
+            self._warmup_results.pop(worker_id, None)
+
+    def ready_count(self) -> int:
+        """워밍업을 마치고 작업을 받을 수 있는 워커 수"""
+        ready = 0
+        for worker_id, process in list(self._processes.items()):
+            event = self._ready_events.get(worker_id)
+            if event is not None and event.is_set() and process.is_alive():
+                ready += 1
+        return ready
+
+    def warmup_failures(self) -> Dict[str, Dict[str, Any]]:
+        """필수 구성 요소 워밍업에 실패한 워커별 실패 구성 요소 {worker_id: {name: error}}"""
+        with self._status_lock:
+            for worker_id, conn in list(self._status_conns.items()):
+                try:
+                    if conn.poll():
+                        self._warmup_results[worker_id] = conn.recv()
+                except (EOFError, OSError):
+                    pass
+            failures = {}
+            for worker_id, statuses in self._warmup_results.items():
+                failed = {
+                    name: status.get("error") for name, status in statuses.items()
+                    if status["status"] != "ready" and name not in OPTIONAL_COMPONENTS
+                }
+                if failed:
+                    failures[worker_id] = failed
+            return failures
+
+    def _monitor(self):
+        while not self._monitor_stop.wait(self.monitor_interval):
+            with self._lock:
+                if self._stop_event.is_set():
+                    continue
+                # 다른(종료된) API 프로세스의 워커가 남긴 작업 복구
+                recovered = self.queue.requeue_in_flight()
+                self._handle_abandoned(recovered["abandoned"])
+
+                dead = [wid for wid, proc in self._processes.items() if not proc.is_alive()]
+                if not dead:
+                    continue
+                logger.warning(f"비정상 종료된 분석 워커 감지: {dead}")
+                recovered = self.queue.requeue_in_flight(worker_ids=dead)
+                self._handle_abandoned(recovered["abandoned"])
+                for worker_id in dead:
+                    self._spawn(worker_id)
+
+    def _handle_abandoned(self, jobs: List[Dict[str, Any]]):
+        """재시도 한도를 넘긴 작업은 오류 결과를 저장하여 사용자가 무한 대기하지 않도록 함"""
+        if not jobs:
+            return
+        from ..database import SessionLocal
+        from ..api.pipeline import save_analysis_error_sync
+
+        db = SessionLocal()
+        try:
+            for job in jobs:
+                try:
+                    save_analysis_error_sync(job["test_id"], "분석 작업이 중단되어 완료되지 않았습니다.", db)
+                    get_progress_bus().publish(job["test_id"], {"type": "failed", "error": "worker_interrupted"})
+                except Exception as e:
+                    logger.error(f"중단된 작업 오류 상태 저장 실패: test_id={job['test_id']} - {e}")
+        finally:
+            db.close()
+
+    def stop(self, timeout: float = 10.0):
+        """워커 프로세스 종료 (실행 중인 작업은 다음 시작 시 복구됨)"""
+        with self._lock:
+            if not self._processes:
+                return
+            self._monitor_stop.set()
+            self._stop_event.set()
+            for process in self._processes.values():
+                process.join(timeout)
+                if process.is_alive():
+                    process.terminate()
+            self._processes.clear()
+            self._ready_events.clear()
+            with self._status_lock:
+                self._status_conns.clear()
+                self._warmup_results.clear()
+            get_progress_bus().stop_relay()
+            logger.info("분석 워커 풀 종료")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "num_workers": self.num_workers,
+            "workers": {wid: proc.is_alive() for wid, proc in self._processes.items()},
+            "ready_workers": self.ready_count(),
+            "warmup_failures": self.warmup_failures(),
+            "queue": self.queue.stats()
+        }
+
+
+_queue: Optional[AnalysisJobQueue] = None
+_pool: Optional[AnalysisWorkerPool] = None
+_singleton_lock = threading.Lock()
+
+
+def get_analysis_queue() -> AnalysisJobQueue:
+    """분석 작업 큐 인스턴스 가져오기 (싱글톤 패턴)"""
+    global _queue
+    if _queue is None:
+        with _singleton_lock:
+            if _queue is None:
+                _queue = AnalysisJobQueue()
+    return _queue
+
+
+def get_worker_pool() -> AnalysisWorkerPool:
+    """분석 워커 풀 인스턴스 가져오기 (싱글톤 패턴)"""
+    global _pool
+    if _pool is None:
+        with _singleton_lock:
+            if _pool is None:
+                _pool = AnalysisWorkerPool(get_analysis_queue())
+    return _pool
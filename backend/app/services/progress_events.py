@@ -0,0 +1,170 @@
+"""
+그림 분석 진행 이벤트 서비스
+- 프로세스 내부 pub/sub (test_id 단위 구독)
+- 워커 프로세스에서 발생한 이벤트를 multiprocessing 큐로 받아 API 프로세스에 중계
+- 늦게 접속한 구독자를 위해 test_id별 이벤트 이력 재전송
+- 발행된 이벤트는 진행 상태 저장소(progress_store)에도 반영
+"""
+import time
+import queue
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .progress_store import get_progress_store
+
+logger = logging.getLogger(__name__)
+
+# 분석이 끝나 더 이상 이벤트가 오지 않는 이벤트 타입
+TERMINAL_EVENTS = {"completed", "failed"}
+
+# 종료된 분석의 이벤트 이력 보관 시간 (초)
+HISTORY_TTL_SECONDS = 600
+MAX_HISTORY_PER_TEST = 50
+
+
+class ProgressEventBus:
+    """test_id 단위 분석 진행 이벤트 pub/sub
+
+    publish()는 어느 스레드에서 호출해도 되며, 구독자는 asyncio 큐로 이벤트를 받습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._history: Dict[int, deque] = {}
+        self._finished_at: Dict[int, float] = {}
+        self._subscribers: Dict[int, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._relay_queue = None
+        self._relay_thread: Optional[threading.Thread] = None
+        self._relay_stop = threading.Event()
+
+    def publish(self, test_id: int, event: Dict[str, Any]):
+        """이벤트 발행 (진행 상태 갱신, 이력 저장 후 현재 구독자들에게 전달)"""
+        event = dict(event)
+        event.setdefault("test_id", test_id)
+        event.setdefault("timestamp", time.time())
+
+        try:
+            get_progress_store().apply(test_id, event)
+        except Exception as e:
+            logger.error(f"진행 상태 갱신 실패: test_id={test_id} - {e}")
+
+        with self._lock:
+            self._prune_history()
+            history = self._history.setdefault(test_id, deque(maxlen=MAX_HISTORY_PER_TEST))
+            history.append(event)
+            if event.get("type") in TERMINAL_EVENTS:
+                self._finished_at[test_id] = time.time()
+            subscribers = list(self._subscribers.get(test_id, []))
+
+        for loop, subscriber_queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(subscriber_queue.put_nowait, event)
+            except RuntimeError:
+                # 이미 종료된 이벤트 루프
+                pass
+
+    def history(self, test_id: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._history.get(test_id, []))
+
+    def last_event(self, test_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            history = self._history.get(test_id)
+            return history[-1] if history else None
+
+    async def subscribe(self, test_id: int, heartbeat: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """test_id의 이벤트 구독 (지난 이벤트 재전송 후 실시간 이벤트 전달)
+
+        heartbeat 초 동안 이벤트가 없으면 None을 전달하여 연결 유지에 사용할 수 있게 합니다.
+        종료 이벤트(completed/failed)를 전달한 뒤 구독이 끝납니다.
+        """
+        loop = asyncio.get_running_loop()
+        subscriber_queue: asyncio.Queue = asyncio.Queue()
+        entry = (loop, subscriber_queue)
+
+        with self._lock:
+            replay = list(self._history.get(test_id, []))
+            self._subscribers.setdefault(test_id, []).append(entry)
+
+        try:
+            for event in replay:
+                yield event
+                if event.get("type") in TERMINAL_EVENTS:
+                    return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber_queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield event
+                if event.get("type") in TERMINAL_EVENTS:
+                    return
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(test_id, [])
+                if entry in subscribers:
+                    subscribers.remove(entry)
+                if not subscribers:
+                    self._subscribers.pop(test_id, None)
+
+    def _prune_history(self):
+        now = time.time()
+        expired = [tid for tid, finished in self._finished_at.items() if now - finished > HISTORY_TTL_SECONDS]
+        for test_id in expired:
+            self._history.pop(test_id, None)
+            self._finished_at.pop(test_id, None)
+
+    def start_relay(self, relay_queue):
+        """워커 프로세스 이벤트 중계 시작
+
+        Args:
+            relay_queue: 워커가 (test_id, event) 튜플을 넣는 multiprocessing 큐
+        """
+        if self._relay_thread is not None:
+            return
+        self._relay_queue = relay_queue
+        self._relay_stop.clear()
+        self._relay_thread = threading.Thread(
+            target=self._relay_loop, name="progress-event-relay", daemon=True
+        )
+        self._relay_thread.start()
+
+    def stop_relay(self):
+        if self._relay_thread is None:
+            return
+        self._relay_stop.set()
+        self._relay_thread.join(timeout=5)
+        self._relay_thread = None
+        self._relay_queue = None
+
+    def _relay_loop(self):
+        while not self._relay_stop.is_set():
+            try:
+                test_id, event = self._relay_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            try:
+                self.publish(test_id, event)
+            except Exception as e:
+                logger.error(f"진행 이벤트 중계 실패: test_id={test_id} - {e}")
+
+
+_bus: Optional[ProgressEventBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_progress_bus() -> ProgressEventBus:
+    """분석 진행 이벤트 버스 인스턴스 가져오기 (싱글톤 패턴)"""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = ProgressEventBus()
+    return _bus
@@ -0,0 +1,140 @@
+"""
+그림 분석 진행 상태 저장소
+- test_id별 현재 진행 상태를 메모리(dict)에 보관하여 상태 조회를 O(1)로 처리
+- 진행 이벤트 버스에 발행된 이벤트로 상태를 갱신
+- 선택적으로 drawing_tests.analysis_status 컬럼에 단계 변경을 기록 (재시작/다중 인스턴스 대비)
+"""
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# drawing_tests.analysis_status 컬럼 미러링 여부
+MIRROR_TO_DB = os.getenv("ANALYSIS_PROGRESS_DB_MIRROR", "false").lower() == "true"
+
+# 종료된 분석 상태 보관 시간 (초)
+STATE_TTL_SECONDS = 600
+
+TOTAL_STEPS = 3
+
+# analysis_status 컬럼 값: queued, detection, analysis, classification, completed, failed
+STAGE_NAMES = {1: "detection", 2: "analysis", 3: "classification"}
+STAGE_NUMBERS = {name: number for number, name in STAGE_NAMES.items()}
+
+
+class AnalysisProgressStore:
+    """test_id 단위 분석 진행 상태 저장소"""
+
+    def __init__(self, mirror_to_db: bool = MIRROR_TO_DB):
+        self.mirror_to_db = mirror_to_db
+        self._states: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def apply(self, test_id: int, event: Dict[str, Any]):
+        """진행 이벤트를 상태에 반영"""
+        event_type = event.get("type")
+        now = time.time()
+        mirror_value = None
+
+        with self._lock:
+            self._prune(now)
+            state = self._states.get(test_id)
+            if state is None:
+                state = {
+                    "test_id": test_id,
+                    "status": "queued",
+                    "current_step": 1,
+                    "completed_steps": 0,
+                    "stage_timings": {},
+                    "error": None
+                }
+                self._states[test_id] = state
+
+            if event_type == "queued":
+                state["status"] = "queued"
+                state["queue_position"] = event.get("queue_position")
+                mirror_value = "queued"
+            elif event_type == "stage_start":
+                state["status"] = "running"
+                state["current_step"] = event["stage"]
+                mirror_value = event.get("stage_name") or STAGE_NAMES.get(event["stage"])
+            elif event_type == "stage_end":
+                if event.get("success", True):
+                    state["completed_steps"] = max(state["completed_steps"], event["stage"])
+                    state["current_step"] = min(event["stage"] + 1, TOTAL_STEPS)
+                state["stage_timings"][event.get("stage_name") or STAGE_NAMES.get(event["stage"])] = event.get("elapsed")
+            elif event_type in ("completed", "failed"):
+                state["status"] = event_type
+                state["error"] = event.get("error")
+                state["finished_at"] = now
+                if event_type == "completed":
+                    state["completed_steps"] = TOTAL_STEPS
+                    state["current_step"] = TOTAL_STEPS
+                mirror_value = event_type
+
+            state["updated_at"] = now
+            snapshot = dict(state)
+
+        if mirror_value and self.mirror_to_db:
+            self._mirror(test_id, mirror_value)
+        return snapshot
+
+    def get(self, test_id: int) -> Optional[Dict[str, Any]]:
+        state = self._states.get(test_id)
+        return dict(state) if state else None
+
+    def _prune(self, now: float):
+        expired = [
+            test_id for test_id, state in self._states.items()
+            if state.get("finished_at") and now - state["finished_at"] > STATE_TTL_SECONDS
+        ]
+        for test_id in expired:
+            del self._states[test_id]
+
+    def _mirror(self, test_id: int, value: str):
+        from ..database import SessionLocal
+        from ..models.test import DrawingTest
+
+        db = SessionLocal()
+        try:
+            db.query(DrawingTest).filter(DrawingTest.test_id == test_id).update(
+                {DrawingTest.analysis_status: value}, synchronize_session=False
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"분석 상태 DB 기록 실패: test_id={test_id} - {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def from_db_status(test_id: int, analysis_status: Optional[str]) -> Optional[Dict[str, Any]]:
+        """drawing_tests.analysis_status 컬럼 값으로 상태 복원 (메모리에 상태가 없을 때 사용)"""
+        if not analysis_status:
+            return None
+        if analysis_status in STAGE_NUMBERS:
+            step = STAGE_NUMBERS[analysis_status]
+            return {"test_id": test_id, "status": "running", "current_step": step,
+                    "completed_steps": step - 1, "stage_timings": {}, "error": None}
+        completed = analysis_status == "completed"
+        return {"test_id": test_id, "status": analysis_status,
+                "current_step": TOTAL_STEPS if completed else 1,
+                "completed_steps": TOTAL_STEPS if completed else 0,
+                "stage_timings": {}, "error": None}
+
+
+_store: Optional[AnalysisProgressStore] = None
+_store_lock = threading.Lock()
+
+
+def get_progress_store() -> AnalysisProgressStore:
+    """분석 진행 상태 저장소 인스턴스 가져오기 (싱글톤 패턴)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AnalysisProgressStore()
+    return _store
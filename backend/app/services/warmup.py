@@ -0,0 +1,197 @@
+"""
+그림 분석 파이프라인 워밍업 서비스
+- 앱 시작 시 백그라운드 스레드에서 파이프라인 모듈 import 및 모델 로드
+- 구성 요소별 워밍업 상태(pending/loading/ready/failed, 소요시간) 제공
+- 준비(readiness) 여부로 분석 요청을 받을지 결정 (첫 요청이 콜드 스타트 비용을 내지 않도록)
+"""
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 워밍업 설정 (환경변수)
+WARMUP_ENABLED = os.getenv("PIPELINE_WARMUP", "true").lower() == "true"
+WORKER_READY_TIMEOUT = float(os.getenv("PIPELINE_WARMUP_WORKER_TIMEOUT", "900"))  # 워커 워밍업 대기 한도 (초)
+WORKER_POLL_INTERVAL = 1.0
+
+# HTPAnalysisPipeline.warm_up()이 로드하는 구성 요소
+PIPELINE_COMPONENTS = ("yolo_model", "keyword_classifier", "rag_models", "opensearch")
+
+# 준비 판정에서 제외하는 선택 구성 요소 (실패해도 RAG 없이 분석 가능)
+OPTIONAL_COMPONENTS = {"rag_models", "opensearch"}
+
+STATUS_PENDING = "pending"
+STATUS_LOADING = "loading"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+
+class PipelineWarmup:
+    """파이프라인 워밍업 상태 관리
+
+    워커 풀을 사용하면 모델은 워커 프로세스에서 로드되므로 API 프로세스는 워커의 준비 신호를 기다리고,
+    워커 풀 없이 실행하면 API 프로세스에서 직접 모델을 로드합니다.
+    """
+
+    def __init__(self, enabled: bool = WARMUP_ENABLED, worker_timeout: float = WORKER_READY_TIMEOUT):
+        self.enabled = enabled
+        self.worker_timeout = worker_timeout
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """워밍업 스레드 시작 (비활성화 시 요청 시점 지연 로드를 그대로 사용)"""
+        with self._lock:
+            if self._thread is not None or not self.enabled:
+                return
+            self.started_at = time.time()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="pipeline-warmup", daemon=True)
+            self._thread.start()
+        logger.info("파이프라인 워밍업 시작")
+
+    def stop(self):
+        self._stop.set()
+
+    def _set(self, name: str, **fields):
+        with self._lock:
+            component = self._components.setdefault(name, {
+                "status": STATUS_PENDING,
+                "required": name not in OPTIONAL_COMPONENTS,
+                "seconds": None,
+                "error": None
+            })
+            component.update(fields)
+            component["updated_at"] = time.time()
+
+    def _step(self, name: str, func) -> bool:
+        """구성 요소 하나를 로드하고 상태 기록"""
+        self._set(name, status=STATUS_LOADING)
+        start = time.time()
+        try:
+            func()
+        except Exception as e:
+            self._set(name, status=STATUS_FAILED, seconds=round(time.time() - start, 2), error=str(e))
+            logger.error(f"워밍업 실패: {name} - {e}")
+            return False
+        self._set(name, status=STATUS_READY, seconds=round(time.time() - start, 2), error=None)
+        logger.info(f"워밍업 완료: {name} ({time.time() - start:.2f}초)")
+        return True
+
+    def _run(self):
+        from ..api import pipeline as pipeline_api
+        from .analysis_queue import get_worker_pool
+
+        worker_pool = get_worker_pool()
+        for name in ("pipeline_import", "pipeline"):
+            self._set(name)
+        if worker_pool.is_running:
+            self._set("analysis_workers", ready_workers=0, failed_workers=0, num_workers=worker_pool.num_workers)
+        else:
+            for name in PIPELINE_COMPONENTS:
+                self._set(name)
+
+        try:
+            def import_pipeline():
+                if not pipeline_api.load_pipeline_module():
+                    raise RuntimeError(pipeline_api.PIPELINE_IMPORT_ERROR or "HTP 파이프라인 import 실패")
+
+            if (not self._step("pipeline_import", import_pipeline)
+                    or not self._step("pipeline", pipeline_api.get_pipeline)):
+                return
+
+            if worker_pool.is_running:
+                # 모델은 워커 프로세스에서 로드되므로 API 프로세스는 워커 준비 신호만 기다림
+                self._wait_for_workers(worker_pool)
+            else:
+                pipeline_api.get_pipeline().warm_up(on_component=lambda name, status: self._set(name, **status))
+        finally:
+            self.finished_at = time.time()
+            logger.info(f"파이프라인 워밍업 종료 ({self.finished_at - self.started_at:.2f}초), 준비 상태: {self.is_ready}")
+
+    def _wait_for_workers(self, worker_pool):
+        self._set("analysis_workers", status=STATUS_LOADING)
+        start = time.time()
+        announced = False
+        while not self._stop.is_set():
+            ready_workers = worker_pool.ready_count()
+            failures = worker_pool.warmup_failures()
+            self._set("analysis_workers", ready_workers=ready_workers, failed_workers=len(failures))
+            if ready_workers == 0 and len(failures) >= worker_pool.num_workers:
+                # 모든 워커가 필수 모델 로드에 실패하면 기다리지 않고 실패로 보고 (요청은 503)
+                errors = sorted({f"{name}: {error}" for failed in failures.values() for name, error in failed.items()})
+                self._set("analysis_workers", status=STATUS_FAILED, seconds=round(time.time() - start, 2),
+                          error="; ".join(errors))
+                logger.error(f"분석 워커 워밍업 실패: {errors}")
+                return
+            if ready_workers > 0 and not announced:
+                announced = True
+                self._set("analysis_workers", status=STATUS_READY, seconds=round(time.time() - start, 2))
+                logger.info(f"분석 워커 준비 완료 ({time.time() - start:.2f}초)")
+            if ready_workers + len(failures) >= worker_pool.num_workers:
+                return
+            if ready_workers == 0 and time.time() - start > self.worker_timeout:
+                self._set("analysis_workers", status=STATUS_FAILED, seconds=round(time.time() - start, 2),
+                          error=f"{self.worker_timeout:.0f}초 안에 준비된 분석 워커가 없습니다.")
+                return
+            self._stop.wait(WORKER_POLL_INTERVAL)
+
+    @property
+    def is_ready(self) -> bool:
+        """필수 구성 요소가 모두 준비되었는지 여부 (워밍업 비활성화 시 항상 True)"""
+        if not self.enabled:
+            return True
+        with self._lock:
+            required = [c for c in self._components.values() if c["required"]]
+            return bool(required) and all(c["status"] == STATUS_READY for c in required)
+
+    @property
+    def has_failed(self) -> bool:
+        """필수 구성 요소 중 로드에 실패한 것이 있는지 여부"""
+        with self._lock:
+            return any(c["required"] and c["status"] == STATUS_FAILED for c in self._components.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """워밍업 상태 조회용 dict"""
+        ready = self.is_ready
+        with self._lock:
+            components = {name: dict(component) for name, component in self._components.items()}
+        if not self.enabled:
+            state = "disabled"
+        elif ready:
+            state = "ready"
+        elif self.has_failed:
+            state = "failed"
+        elif self.started_at is None:
+            state = "not_started"
+        else:
+            state = "warming_up"
+        return {
+            "state": state,
+            "ready": ready,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round((self.finished_at or time.time()) - self.started_at, 2) if self.started_at else None,
+            "components": components
+        }
+
+
+_warmup: Optional[PipelineWarmup] = None
+_warmup_lock = threading.Lock()
+
+
+def get_pipeline_warmup() -> PipelineWarmup:
+    """파이프라인 워밍업 인스턴스 가져오기 (싱글톤 패턴)"""
+    global _warmup
+    if _warmup is None:
+        with _warmup_lock:
+            if _warmup is None:
+                _warmup = PipelineWarmup()
+    return _warmup
@@ -49,9 +49,12 @@ CREATE TABLE IF NOT EXISTS "drawing_tests" (
   "user_id" int4 NOT NULL,
   "image_url" varchar(2048),
   "submitted_at" timestamp NOT NULL DEFAULT (now()),
+  "analysis_status" varchar(32),
   PRIMARY KEY ("test_id")
 );
 
+ALTER TABLE "drawing_tests" ADD COLUMN IF NOT EXISTS "analysis_status" varchar(32);
+
 CREATE TABLE IF NOT EXISTS "ratings" (
   "ratings_id" serial4 NOT NULL,
   "session_id" uuid NOT NULL,
@@ -1,49 +1,36 @@
 import base64
 import os
-import openai
 from dotenv import load_dotenv
 import sys
 import json
 import numpy as np
-from openai import OpenAI
 import re
 from PIL import Image, ImageOps
 import io
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 sys.path.append(os.path.dirname(__file__))
 sys.path.append(os.path.join(os.path.dirname(__file__), '../opensearch_modules'))
 
-from opensearch_client import OpenSearchEmbeddingClient
-opensearch_client = OpenSearchEmbeddingClient(host='3.39.30.211')
+from rag_client import get_rag_client_provider, RAG_INDEX_NAME
+from rag_lookup import get_rag_lookup_table
+from llm_gateway import get_llm_gateway, backoff_delay
+from image_artifact import ImageArtifact
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# 초기 분석을 집/나무/사람 개별 호출로 나누어 동시에 수행할지 여부
+PARALLEL_SUBANALYSES = os.getenv("HTP_GPT_PARALLEL_SUBANALYSES", "false").lower() == "true"
+# 요소별 분석 시 전체 그림 대신 YOLO로 탐지한 요소 영역 크롭만 전송할지 여부
+OBJECT_CROPS = os.getenv("HTP_GPT_OBJECT_CROPS", "false").lower() == "true"
 
 IMAGE_DIR = os.path.join(os.path.dirname(__file__), '../detection_results/images')
 RESULT_DIR = os.path.join(os.path.dirname(__file__), '../detection_results/results')
 
-# OpenSearch RAG 시스템 초기화
-try:
-    # 작업 디렉토리를 opensearch_modules로 변경하여 임베딩 파일 접근
-    original_cwd = os.getcwd()
-    opensearch_modules_dir = os.path.join(os.path.dirname(__file__), '../opensearch_modules')
-    os.chdir(opensearch_modules_dir)
-    
-    opensearch_client = OpenSearchEmbeddingClient(host='3.39.30.211')
-    RAG_INDEX_NAME = "psychology_analysis"
-    
-    # 작업 디렉토리 복구
-    os.chdir(original_cwd)
-    print("OpenSearch RAG 시스템 초기화 완료")
-except Exception as e:
-    print(f"OpenSearch 초기화 실패: {e}")
-    opensearch_client = None
-    # 작업 디렉토리 복구 (에러 발생 시에도)
-    try:
-        os.chdir(original_cwd)
-    except:
-        pass
+# OpenSearch RAG 클라이언트는 첫 검색 시 rag_client에서 지연 생성 (import 시 네트워크/작업 디렉토리 변경 없음)
+
 def extract_psychological_elements(analysis_text):
     """
     GPT 분석 결과에서 심리 분석 요소들을 추출
@@ -92,21 +79,30 @@ def extract_psychological_elements(analysis_text):
 def search_rag_documents(query_elements):
     """
     OpenSearch를 사용하여 관련 RAG 문서 검색
+    
+    자주 나오는 요소 집합은 미리 계산한 조회 테이블에서 바로 반환하고, 없을 때만 실시간 검색합니다.
     """
-    if not opensearch_client or not query_elements:
+    if not query_elements:
         return []
     
+    lookup_table = get_rag_lookup_table()
+    cached_results = lookup_table.get(query_elements)
+    if cached_results is not None:
+        return cached_results[0] if cached_results else None
+    
     try:
         # 모든 요소를 하나의 쿼리로 합침
         combined_query = ' '.join(query_elements)
         
-        # 하이브리드 검색 수행
-        search_results = opensearch_client.hybrid_search(
+        # 하이브리드 검색 수행 (OpenSearch 장애로 차단된 상태면 네트워크 호출 없이 None)
+        search_results = get_rag_client_provider().hybrid_search(
+            combined_query,
             index_name=RAG_INDEX_NAME,
-            query_text=combined_query,
             k=10,
             use_reranker=True
         )
+        if search_results is not None:
+            lookup_table.record_miss(query_elements)
         
         # Reranker 기준 1번째 결과 반환
         if search_results:
@@ -159,8 +155,6 @@ PROMPT = '''
         - 이제 주어진 HTP 그림을 분석해 주세요.
         '''
 
-openai.api_key = OPENAI_API_KEY
-
 def optimize_image_for_gpt(image_path: str, max_size: tuple = (1024, 1024), quality: int = 85) -> tuple:
     """
     GPT Vision API 호출을 위해 이미지를 최적화
@@ -225,133 +219,134 @@ def optimize_image_for_gpt(image_path: str, max_size: tuple = (1024, 1024), qual
                 'error': str(e)
             }
 
-def analyze_image_with_gpt(image_path, prompt, rag_context=None, max_retries=5):
-    """
-    GPT Vision API를 사용하여 이미지를 분석하는 함수 (거부 방지 로직 포함)
+# 거부 응답 패턴 정의
+REJECTION_PATTERNS = [
+    "I'm unable to",
+    "I can't provide an analysis",
+    "I'm sorry",
+    "죄송합니다",
+    "죄송하지만",
+    "분석할 수 없습니다",
+    "분석하기 어렵습니다",
+    "정확하게 분석하기 어렵습니다",
+    "인식을 하기 굉장히 어렵습니다",
+    "이미지를 분석하기 어렵습니다",
+    "추가 정보나 설명을 제공해 주시면",
+    "하지만 일반적인",
+    "예를 들어 설명할 수 있습니다",
+    "이미지를 인식할 수 없습니다"
+]
+
+VISION_SYSTEM_PROMPT = "당신은 HTP(House-Tree-Person) 심리검사 전문 분석가입니다. 제공된 그림은 심리검사 목적으로 그려진 그림이며, 실제 인물의 신원 식별이 아닌 심리적 특성 분석을 위한 것입니다. 그림의 시각적 요소들을 통해 심리 상태를 분석해 주세요. 개인의 정체성이나 신원을 파악하려는 것이 아니라, 그림 표현 방식을 통한 심리 분석임을 명심하세요. 이미지가 제대로 보이지 않으면 '이미지를 인식할 수 없습니다'라고 응답하지 말고, 다시 시도해보거나 이미지 파일 문제일 수 있다고 안내해주세요."
+
+TEXT_SYSTEM_PROMPT = "당신은 HTP(House-Tree-Person) 심리검사 전문 분석가입니다. 이미 작성된 그림 심리 분석 결과를 바탕으로, 사용자가 이해하기 쉬운 해석문을 작성합니다."
+
+
+def encode_image_for_gpt(image_path):
+    """GPT Vision 호출용 이미지 base64 인코딩 (분석 1건당 한 번만 수행하여 재사용)
     
     Args:
         image_path (str): 분석할 이미지 파일 경로
-        prompt (str): GPT에게 전달할 프롬프트
-        rag_context (dict): RAG 검색 결과 (선택사항)
+        
+    Returns:
+        tuple: (base64 문자열, compression_info)
+    """
+    # 🚀 이미지 최적화: 이미 YOLO에서 320x320으로 압축된 이미지인지 확인
+    try:
+        # 파일 크기와 이미지 크기 확인
+        file_size = os.path.getsize(image_path)
+        with Image.open(image_path) as img:
+            img_size = img.size
+        
+        # 이미 작은 이미지(YOLO 처리된)이면 추가 압축 없이 사용
+        if img_size[0] <= 320 and img_size[1] <= 320 and file_size < 50000:  # 50KB 미만
+            print(f"📸 이미 최적화된 이미지 감지: {img_size}, {file_size:,} bytes - 추가 압축 생략")
+            with open(image_path, 'rb') as f:
+                img_base64 = base64.b64encode(f.read()).decode('utf-8')
+            compression_info = {
+                'original_file_size': file_size,
+                'compressed_size': file_size,
+                'compression_ratio': 0,
+                'original_dimensions': img_size,
+                'compressed_dimensions': img_size
+            }
+        else:
+            print(f"📸 큰 이미지 감지: {img_size}, {file_size:,} bytes - GPT용 압축 적용")
+            img_base64, compression_info = optimize_image_for_gpt(image_path, max_size=(1024, 1024), quality=85)
+            
+    except Exception as e:
+        print(f"⚠️ 이미지 크기 확인 실패, 기본 압축 적용: {e}")
+        img_base64, compression_info = optimize_image_for_gpt(image_path, max_size=(1024, 1024), quality=85)
+    
+    # 압축 결과 로그
+    print(f"이미지 파일 크기: {compression_info['original_file_size']:,} bytes")
+    if 'error' not in compression_info:
+        print(f"처리 후 크기: {compression_info['compressed_size']:,} bytes")
+        print(f"압축률: {compression_info['compression_ratio']}%")
+        print(f"원본 크기: {compression_info['original_dimensions']}")
+        print(f"처리 후 크기: {compression_info['compressed_dimensions']}")
+    print(f"MIME 타입: image/jpeg")
+    print(f"Base64 길이: {len(img_base64)}")
+    
+    return img_base64, compression_info
+
+
+def _chat_with_retries(system_prompt, build_content, max_retries=5, timings=None, call_name="gpt"):
+    """GPT 호출 + 거부 응답 재시도 공통 처리
+    
+    Args:
+        system_prompt (str): 시스템 프롬프트
+        build_content (callable): 시도 번호를 받아 user 메시지 content를 반환하는 함수
         max_retries (int): 최대 재시도 횟수
+        timings (list): 호출별 소요시간을 기록할 리스트 (선택사항)
+        call_name (str): 소요시간 기록에 사용할 호출 이름
         
     Returns:
-        str: GPT 분석 결과 텍스트
+        str: GPT 응답 텍스트
     """
-    # 거부 응답 패턴 정의
-    rejection_patterns = [
-        "I'm unable to",
-        "I can't provide an analysis",
-        "I'm sorry",
-        "죄송합니다",
-        "죄송하지만",
-        "분석할 수 없습니다",
-        "분석하기 어렵습니다",
-        "정확하게 분석하기 어렵습니다",
-        "인식을 하기 굉장히 어렵습니다",
-        "이미지를 분석하기 어렵습니다",
-        "추가 정보나 설명을 제공해 주시면",
-        "하지만 일반적인",
-        "예를 들어 설명할 수 있습니다",
-        "이미지를 인식할 수 없습니다"
-    ]
+    call_start_time = time.time()
+    
+    def record(attempts, ok):
+        if timings is not None:
+            timings.append({
+                "call": call_name,
+                "seconds": round(time.time() - call_start_time, 3),
+                "attempts": attempts,
+                "ok": ok
+            })
     
     for attempt in range(max_retries):
         try:
-            # 재시도 시 프롬프트 강화
-            if attempt > 0:
-                enhanced_prompt = f"""
-{prompt}
-
-[중요] 이전 시도에서 이미지 분석이 거부되었습니다. 
-이번에는 반드시 이미지의 시각적 요소들을 관찰하여 HTP 심리검사 분석을 수행해주세요.
-이미지가 흐리거나 불분명하더라도 보이는 요소들(선, 모양, 크기, 위치 등)을 바탕으로 분석해주세요.
-완전한 거부보다는 관찰 가능한 요소라도 분석해주시기 바랍니다.
-"""
-            else:
-                enhanced_prompt = prompt
-
-            # 🚀 이미지 최적화: 이미 YOLO에서 320x320으로 압축된 이미지인지 확인
-            try:
-                import os
-                from PIL import Image
-                
-                # 파일 크기와 이미지 크기 확인
-                file_size = os.path.getsize(image_path)
-                with Image.open(image_path) as img:
-                    img_size = img.size
-                
-                # 이미 작은 이미지(YOLO 처리된)이면 추가 압축 없이 사용
-                if img_size[0] <= 320 and img_size[1] <= 320 and file_size < 50000:  # 50KB 미만
-                    print(f"📸 이미 최적화된 이미지 감지: {img_size}, {file_size:,} bytes - 추가 압축 생략")
-                    with open(image_path, 'rb') as f:
-                        img_base64 = base64.b64encode(f.read()).decode('utf-8')
-                    compression_info = {
-                        'original_file_size': file_size,
-                        'compressed_size': file_size,
-                        'compression_ratio': 0,
-                        'original_dimensions': img_size,
-                        'compressed_dimensions': img_size
-                    }
-                else:
-                    print(f"📸 큰 이미지 감지: {img_size}, {file_size:,} bytes - GPT용 압축 적용")
-                    img_base64, compression_info = optimize_image_for_gpt(image_path, max_size=(1024, 1024), quality=85)
-                    
-            except Exception as e:
-                print(f"⚠️ 이미지 크기 확인 실패, 기본 압축 적용: {e}")
-                img_base64, compression_info = optimize_image_for_gpt(image_path, max_size=(1024, 1024), quality=85)
-            
-            # 압축 결과 로그
-            print(f"이미지 파일 크기: {compression_info['original_file_size']:,} bytes")
-            if 'error' not in compression_info:
-                print(f"처리 후 크기: {compression_info['compressed_size']:,} bytes")
-                print(f"압축률: {compression_info['compression_ratio']}%")
-                print(f"원본 크기: {compression_info['original_dimensions']}")
-                print(f"처리 후 크기: {compression_info['compressed_dimensions']}")
-            
-            data_url = f"data:image/jpeg;base64,{img_base64}"
-            print(f"MIME 타입: image/jpeg")
-            print(f"Base64 길이: {len(img_base64)}")
+            content = build_content(attempt)
             
-            # 메시지 컨텐츠 구성
-            content = [
-                {"type": "text", "text": enhanced_prompt},
-                {"type": "image_url", "image_url": {"url": data_url}}
-            ]
-            
-            # RAG 컨텍스트 추가
-            if rag_context:
-                rag_text = f"\n\n[참고 자료]\n문서: {rag_context['document']} - {rag_context['element']}\n내용: {rag_context['text']}"
-                content.append({"type": "text", "text": rag_text})
-
-            import time
             gpt_start_time = time.time()
             gpt_start_datetime = datetime.now()
-            print(f"🤖 [TIMING] GPT API 호출 시작: {gpt_start_datetime.strftime('%H:%M:%S.%f')[:-3]} (시도 {attempt + 1}/{max_retries})")
+            print(f"🤖 [TIMING] GPT API 호출 시작 ({call_name}): {gpt_start_datetime.strftime('%H:%M:%S.%f')[:-3]} (시도 {attempt + 1}/{max_retries})")
             
-            response = openai.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "당신은 HTP(House-Tree-Person) 심리검사 전문 분석가입니다. 제공된 그림은 심리검사 목적으로 그려진 그림이며, 실제 인물의 신원 식별이 아닌 심리적 특성 분석을 위한 것입니다. 그림의 시각적 요소들을 통해 심리 상태를 분석해 주세요. 개인의 정체성이나 신원을 파악하려는 것이 아니라, 그림 표현 방식을 통한 심리 분석임을 명심하세요. 이미지가 제대로 보이지 않으면 '이미지를 인식할 수 없습니다'라고 응답하지 말고, 다시 시도해보거나 이미지 파일 문제일 수 있다고 안내해주세요."},
+            # 공용 LLM 게이트웨이 경유 (동시 실행/분당 요청·토큰 제한, 일시 오류 재시도 포함)
+            response = get_llm_gateway().chat(
+                [
+                    {"role": "system", "content": system_prompt},
                     {
                         "role": "user",
                         "content": content
                     }
                 ],
+                caller=f"pipeline:{call_name}",
+                model="gpt-4o",
                 max_tokens=2000,
             )
             
-            gpt_end_time = time.time()
-            gpt_duration = gpt_end_time - gpt_start_time
+            gpt_duration = time.time() - gpt_start_time
             gpt_end_datetime = datetime.now()
-            print(f"✅ [TIMING] GPT API 호출 완료: {gpt_end_datetime.strftime('%H:%M:%S.%f')[:-3]}")
-            print(f"⏱️  [TIMING] GPT API 소요시간: {gpt_duration:.2f}초")
+            print(f"✅ [TIMING] GPT API 호출 완료 ({call_name}): {gpt_end_datetime.strftime('%H:%M:%S.%f')[:-3]}")
+            print(f"⏱️  [TIMING] GPT API 소요시간 ({call_name}): {gpt_duration:.2f}초")
             
-            result_text = response.choices[0].message.content.strip()
+            result_text = response.content.strip()
             
             # 거부 응답 패턴 확인
             is_rejection = False
-            for pattern in rejection_patterns:
+            for pattern in REJECTION_PATTERNS:
                 if pattern.lower() in result_text.lower():
                     is_rejection = True
                     print(f"거부 응답 패턴 감지: '{pattern}' (시도 {attempt + 1}/{max_retries})")
@@ -361,28 +356,182 @@ def analyze_image_with_gpt(image_path, prompt, rag_context=None, max_retries=5):
             if not is_rejection or attempt == max_retries - 1:
                 if is_rejection and attempt == max_retries - 1:
                     print(f"경고: 모든 재시도가 실패했습니다. 마지막 응답을 반환합니다.")
+                record(attempt + 1, not is_rejection)
                 return result_text
             
-            # 재시도 전 잠시 대기
-            print(f"거부 응답으로 인한 재시도 대기 중... (2초)")
-            time.sleep(2)
+            # 재시도 전 잠시 대기 (지수 백오프 + 지터)
+            delay = backoff_delay(attempt)
+            print(f"거부 응답으로 인한 재시도 대기 중... ({delay:.1f}초)")
+            time.sleep(delay)
             
         except Exception as e:
+            # 일시적 오류(429, 5xx, 연결 오류)는 게이트웨이에서 이미 재시도했으므로 바로 전달
             print(f"GPT API 호출 실패 (시도 {attempt + 1}/{max_retries}): {e}")
-            if attempt == max_retries - 1:
-                raise
-            # 재시도 전 잠시 대기
-            import time
-            time.sleep(2)
+            record(attempt + 1, False)
+            raise
     
+    record(max_retries, False)
     return "분석을 완료할 수 없습니다."
 
 
-def analyze_image_gpt(image_base):
+def analyze_image_with_gpt(image_path, prompt, rag_context=None, max_retries=5,
+                           image_base64=None, timings=None, call_name="vision"):
+    """
+    GPT Vision API를 사용하여 이미지를 분석하는 함수 (거부 방지 로직 포함)
+    
+    Args:
+        image_path (str): 분석할 이미지 파일 경로
+        prompt (str): GPT에게 전달할 프롬프트
+        rag_context (dict): RAG 검색 결과 (선택사항)
+        max_retries (int): 최대 재시도 횟수
+        image_base64 (str): 미리 인코딩한 이미지 (지정 시 인코딩 생략)
+        timings (list): 호출별 소요시간을 기록할 리스트 (선택사항)
+        call_name (str): 소요시간 기록에 사용할 호출 이름
+        
+    Returns:
+        str: GPT 분석 결과 텍스트
+    """
+    if image_base64 is None:
+        image_base64, _ = encode_image_for_gpt(image_path)
+    data_url = f"data:image/jpeg;base64,{image_base64}"
+    
+    def build_content(attempt):
+        # 재시도 시 프롬프트 강화
+        if attempt > 0:
+            enhanced_prompt = f"""
+{prompt}
+
+[중요] 이전 시도에서 이미지 분석이 거부되었습니다. 
+이번에는 반드시 이미지의 시각적 요소들을 관찰하여 HTP 심리검사 분석을 수행해주세요.
+이미지가 흐리거나 불분명하더라도 보이는 요소들(선, 모양, 크기, 위치 등)을 바탕으로 분석해주세요.
+완전한 거부보다는 관찰 가능한 요소라도 분석해주시기 바랍니다.
+"""
+        else:
+            enhanced_prompt = prompt
+        
+        # 메시지 컨텐츠 구성
+        content = [
+            {"type": "text", "text": enhanced_prompt},
+            {"type": "image_url", "image_url": {"url": data_url}}
+        ]
+        
+        # RAG 컨텍스트 추가
+        if rag_context:
+            rag_text = f"\n\n[참고 자료]\n문서: {rag_context['document']} - {rag_context['element']}\n내용: {rag_context['text']}"
+            content.append({"type": "text", "text": rag_text})
+        return content
+    
+    return _chat_with_retries(VISION_SYSTEM_PROMPT, build_content, max_retries, timings, call_name)
+
+
+def summarize_analysis_with_gpt(analysis_text, max_retries=5, timings=None):
+    """최종 분석 텍스트만으로 요약 해석문 생성 (이미지 없이 텍스트 전용 호출)
+    
+    Args:
+        analysis_text (str): 최종 심리 분석 결과
+        max_retries (int): 최대 재시도 횟수
+        timings (list): 호출별 소요시간을 기록할 리스트 (선택사항)
+        
+    Returns:
+        str: 요약 해석문
+    """
+    summary_prompt = f"""
+        아래의 그림 심리 분석 결과를 참고하여,
+        사용자가 이해하기 쉽도록 전체적인 심리 상태와 특징을 자연스럽게 요약·정리해주는 해석문을 작성해 주세요.
+        반드시 ~입니다 체로 작성해 주세요.
+
+        분석 결과:
+        {analysis_text}
+        """
+    return _chat_with_retries(
+        TEXT_SYSTEM_PROMPT, lambda attempt: summary_prompt, max_retries, timings, "summary"
+    )
+
+
+# 집/나무/사람 개별 분석 프롬프트 (HTP_GPT_PARALLEL_SUBANALYSES 사용 시 동시 호출)
+ELEMENT_PROMPTS = {
+    "집": "크기, 창문, 문, 지붕, 굴뚝 등의 특징과 가족관계, 안정감, 소속감 측면의 심리적 의미",
+    "나무": "크기, 줄기, 가지, 잎, 뿌리 등의 특징과 성장욕구, 생명력, 적응력 측면의 심리적 의미",
+    "사람": "크기, 자세, 얼굴, 옷차림 등의 특징과 자아상, 대인관계, 정서상태 측면의 심리적 의미"
+}
+
+
+# 분석 요소별 YOLO 라벨 (모델 라벨이 한글/영문 어느 쪽이어도 매칭)
+ELEMENT_LABELS = {
+    "집": ("집", "house"),
+    "나무": ("나무", "tree"),
+    "사람": ("사람", "person", "man", "woman")
+}
+
+
+def describe_detections(detection_record):
+    """YOLO 탐지 결과를 프롬프트에 덧붙일 텍스트로 변환"""
+    if detection_record is None or len(detection_record) == 0:
+        return ""
+    counts = ", ".join(f"{label} {count}개" for label, count in detection_record.label_counts.items())
+    return f"\n\n[객체 탐지 결과]\n그림에서 자동으로 탐지된 요소: {counts}\n"
+
+
+def encode_element_crops(detection_record, max_size=(512, 512)):
+    """탐지 결과에서 집/나무/사람 영역만 잘라 base64로 인코딩
+    
+    Returns:
+        dict: 요소 이름 -> base64 (탐지되지 않은 요소는 제외)
+    """
+    crops = {}
+    if detection_record is None:
+        return crops
+    for element, labels in ELEMENT_LABELS.items():
+        region = detection_record.region(labels)
+        if region is not None:
+            crops[element] = ImageArtifact.from_bgr_array(region, element).base64(max_size=max_size, quality=85)
+    return crops
+
+
+def _build_element_prompt(element, focus):
+    return f"""
+        당신은 HTP(House-Tree-Person) 심리검사 분석 전문가입니다. 주어진 그림에서 '{element}' 요소만 분석해 주세요.
+        {focus}를 관찰된 특징과 심리적 해석으로 나누어 설명하고,
+        마지막에 '{element}'에서 드러나는 핵심 감정 키워드를 1-2개 제시해 주세요.
+        해당 요소가 그림에 없다면 없다는 사실과 그 의미만 간단히 적어 주세요.
+
+        - 모든 답변은 한글로 '~입니다' 체로 작성
+        - 단정적 표현보다는 '~로 보입니다', '~한 경향을 나타냅니다' 등 완화된 표현 사용
+        - 마크다운 문법을 사용하지 말고 일반 텍스트로만 작성
+        """
+
+
+def analyze_elements_concurrently(image_base64, timings=None, element_images=None):
+    """집/나무/사람 개별 분석을 동시에 요청하여 초기 분석 텍스트로 결합
+    
+    Args:
+        image_base64 (str): 미리 인코딩한 이미지
+        timings (list): 호출별 소요시간을 기록할 리스트 (선택사항)
+        element_images (dict): 요소별 크롭 이미지 base64 (있는 요소는 전체 이미지 대신 사용)
+        
+    Returns:
+        str: 요소별 분석 결과를 결합한 텍스트
+    """
+    with ThreadPoolExecutor(max_workers=len(ELEMENT_PROMPTS)) as executor:
+        futures = {
+            element: executor.submit(
+                analyze_image_with_gpt, None, _build_element_prompt(element, focus),
+                image_base64=(element_images or {}).get(element, image_base64),
+                timings=timings, call_name=f"initial:{element}"
+            )
+            for element, focus in ELEMENT_PROMPTS.items()
+        }
+        sections = [f"[{element} 분석]\n{future.result()}" for element, future in futures.items()]
+    return "\n\n".join(sections)
+
+
+def analyze_image_gpt(image_base, image_artifact=None, detection_record=None):
     """GPT와 OpenSearch RAG를 사용하여 이미지 분석을 수행하는 함수
     
     Args:
         image_base (str): 분석할 이미지의 기본 파일명 (예: test4)
+        image_artifact (ImageArtifact): 메모리에 있는 탐지 결과 이미지 (있으면 파일을 다시 읽지 않음)
+        detection_record (DetectionRecord): 1단계 탐지 결과 (요소 개수 안내 및 요소별 크롭에 사용)
         
     Returns:
         dict: 분석 결과를 포함한 딕셔너리
@@ -392,16 +541,17 @@ def analyze_image_gpt(image_base):
         print(f"현재 OPENAI_API_KEY 값: {OPENAI_API_KEY[:10] if OPENAI_API_KEY else 'None'}...")
         return None
 
-    print(f"IMAGE_DIR 경로: {IMAGE_DIR}")
-    if not os.path.exists(IMAGE_DIR):
+    target_filename = f"detection_result_{image_base}.jpg"
+    image_path = os.path.join(IMAGE_DIR, target_filename)
+    if image_artifact is not None:
+        print(f"메모리 이미지 사용: {target_filename} {image_artifact.size}")
+    elif not os.path.exists(IMAGE_DIR):
         print(f"폴더를 찾을 수 없습니다: {IMAGE_DIR}")
         print(f"현재 작업 디렉토리: {os.getcwd()}")
         return None
-
-    target_filename = f"detection_result_{image_base}.jpg"
-    image_path = os.path.join(IMAGE_DIR, target_filename)
-    print(f"찾는 이미지 파일: {image_path}")
-    if not os.path.exists(image_path):
+    else:
+        print(f"찾는 이미지 파일: {image_path}")
+    if image_artifact is None and not os.path.exists(image_path):
         print(f"{IMAGE_DIR} 폴더에 {target_filename} 파일이 없습니다.")
         # 폴더 내 파일 목록 출력
         try:
@@ -414,15 +564,35 @@ def analyze_image_gpt(image_base):
     print(f"\n===== {target_filename} 심리 분석 결과 =====")
     
     # 분석 시작 시간 기록
-    import time
     analysis_start_time = time.time()
     analysis_start_datetime = datetime.now()
     print(f"🚀 [TIMING] 심리 분석 전체 시작: {analysis_start_datetime.strftime('%H:%M:%S.%f')[:-3]}")
     
+    # 호출별 소요시간 (결과의 timings 항목으로 반환)
+    call_timings = []
+    timings = {"calls": call_timings}
+    
     try:
+        # 이미지는 한 번만 인코딩하여 모든 Vision 호출에 재사용
+        encode_start_time = time.time()
+        if image_artifact is not None:
+            image_base64 = image_artifact.base64(max_size=(1024, 1024), quality=85)
+        else:
+            image_base64, _ = encode_image_for_gpt(image_path)
+        timings["image_encode"] = round(time.time() - encode_start_time, 3)
+        
         # 1차 GPT 해석 (초기 분석)
         print("1단계: 초기 심리 분석 수행 중...")
-        initial_analysis = analyze_image_with_gpt(image_path, PROMPT)
+        if PARALLEL_SUBANALYSES:
+            element_images = encode_element_crops(detection_record) if OBJECT_CROPS else None
+            initial_analysis = analyze_elements_concurrently(
+                image_base64, timings=call_timings, element_images=element_images
+            )
+        else:
+            initial_analysis = analyze_image_with_gpt(
+                image_path, PROMPT + describe_detections(detection_record),
+                image_base64=image_base64, timings=call_timings, call_name="initial"
+            )
         print("\n[초기 분석 결과]")
         print(initial_analysis)
         
@@ -433,7 +603,9 @@ def analyze_image_gpt(image_base):
         
         # OpenSearch RAG 검색
         print("\n3단계: RAG 시스템을 통한 관련 자료 검색 중...")
+        rag_start_time = time.time()
         rag_result = search_rag_documents(psychological_elements)
+        timings["rag_search"] = round(time.time() - rag_start_time, 3)
         
         if rag_result:
             print(f"검색된 관련 자료: {rag_result['document']} - {rag_result['element']}")
@@ -450,7 +622,10 @@ def analyze_image_gpt(image_base):
                             특히 참고 자료의 전문적 해석을 반영하여 분석의 깊이를 더해주세요.
                             반드시 ~입니다 체로 작성해 주세요.
                             """
-            result_text_gpt = analyze_image_with_gpt(image_path, final_prompt, rag_result)
+            result_text_gpt = analyze_image_with_gpt(
+                image_path, final_prompt, rag_result,
+                image_base64=image_base64, timings=call_timings, call_name="final"
+            )
         else:
             print("관련 RAG 자료를 찾을 수 없어 초기 분석 결과를 사용합니다.")
             result_text_gpt = initial_analysis
@@ -474,18 +649,10 @@ def analyze_image_gpt(image_base):
         traceback.print_exc()
         return None
 
-    # 요약 해석문 생성
+    # 요약 해석문 생성 (최종 분석 텍스트만 사용하는 텍스트 전용 호출)
     print("\n5단계: 요약 해석문 생성 중...")
-    SUMMARY_PROMPT = f"""
-        아래의 그림 심리 분석 결과를 참고하여,
-        사용자가 이해하기 쉽도록 전체적인 심리 상태와 특징을 자연스럽게 요약·정리해주는 해석문을 작성해 주세요.
-        반드시 ~입니다 체로 작성해 주세요.
-
-        분석 결과:
-        {result_text_gpt}
-        """
     try:
-        result_text = analyze_image_with_gpt(image_path, SUMMARY_PROMPT)
+        result_text = summarize_analysis_with_gpt(result_text_gpt, timings=call_timings)
     except Exception as e:
         print(f"요약 해석문 생성 실패: {e}")
         result_text = "(요약 해석문 생성 실패)"
@@ -504,15 +671,19 @@ def analyze_image_gpt(image_base):
         "raw_text": result_text_gpt,
         "result_text": result_text,
         "items": enriched,
-        "rag_context": rag_result
+        "rag_context": rag_result,
+        "timings": timings
     }
     
     # 분석 완료 시간 기록
     analysis_end_time = time.time()
     analysis_duration = analysis_end_time - analysis_start_time
+    timings["total"] = round(analysis_duration, 3)
     analysis_end_datetime = datetime.now()
     print(f"✅ [TIMING] 심리 분석 전체 완료: {analysis_end_datetime.strftime('%H:%M:%S.%f')[:-3]}")
     print(f"⏱️  [TIMING] 심리 분석 총 소요시간: {analysis_duration:.2f}초 ({analysis_duration/60:.1f}분)")
+    for call in call_timings:
+        print(f"⏱️  [TIMING]   - {call['call']}: {call['seconds']:.2f}초 (시도 {call['attempts']}회)")
     
     return result
 
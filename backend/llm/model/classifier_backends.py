@@ -0,0 +1,240 @@
+import os
+import sys
+import time
+import logging
+from typing import Dict, List
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+sys.path.append(os.path.dirname(__file__))
+
+logger = logging.getLogger('classifier_backends')
+
+# 키워드 분류기 추론 백엔드: torch(fp32), int8(동적 양자화), onnx(onnxruntime)
+BACKENDS = ("torch", "int8", "onnx")
+DEFAULT_BACKEND = os.getenv("KEYWORD_CLASSIFIER_BACKEND", "torch").lower()
+ONNX_MODEL_PATH = os.getenv(
+    "KEYWORD_CLASSIFIER_ONNX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "keyword_classifier.onnx")
+)
+ONNX_THREADS = int(os.getenv("KEYWORD_CLASSIFIER_ONNX_THREADS", "0"))  # 0이면 onnxruntime 기본값
+
+# 백엔드 비교용 고정 키워드 세트
+PARITY_KEYWORDS = [
+    ["사회불안", "정서불안", "애정결핍", "불안감", "관심 요구"],
+    ["행복", "즐거움", "기쁨"],
+    ["분노", "짜증", "공격성", "충동성"],
+    ["외로움", "고립감", "위축", "소극적"],
+    ["안정", "평온", "편안"],
+    ["완벽주의", "강박적", "꼼꼼함", "스트레스"],
+    ["인정욕구", "자신감", "추진력", "목표"],
+    ["우울", "무기력", "슬픔", "절망", "내적우울감"],
+]
+
+
+def quantize_int8(model: nn.Module) -> nn.Module:
+    """nn.Linear 레이어를 동적 int8 양자화한 모듈 반환 (CPU 전용)"""
+    quantized = torch.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+    quantized.eval()
+    return quantized
+
+
+def export_onnx(model: nn.Module, tokenizer, path: str = ONNX_MODEL_PATH, opset: int = 17) -> str:
+    """분류기를 ONNX로 내보내기 (배치/시퀀스 길이는 동적 축)"""
+    sample = tokenizer(["불안 애정결핍"], return_tensors="pt", padding=True)
+    inputs = (sample["input_ids"], sample["attention_mask"])
+    dynamic_axes = {
+        "input_ids": {0: "batch", 1: "sequence"},
+        "attention_mask": {0: "batch", 1: "sequence"},
+        "logits": {0: "batch"},
+    }
+
+    class _LogitsOnly(nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, input_ids, attention_mask):
+            outputs = self.inner(input_ids=input_ids, attention_mask=attention_mask)
+            if isinstance(outputs, dict) and 'logits' in outputs:
+                return outputs['logits']
+            return getattr(outputs, 'logits', outputs)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with torch.inference_mode():
+        torch.onnx.export(
+            _LogitsOnly(model).eval(), inputs, path,
+            input_names=["input_ids", "attention_mask"], output_names=["logits"],
+            dynamic_axes=dynamic_axes, opset_version=opset
+        )
+    logger.info(f"ONNX 내보내기 완료: {path}")
+    return path
+
+
+class OnnxClassifierModule:
+    """onnxruntime 세션을 torch 모델처럼 호출하는 래퍼 (model(**inputs) -> logits 텐서)"""
+
+    def __init__(self, path: str = ONNX_MODEL_PATH):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("ONNX 백엔드를 사용하려면 onnxruntime 설치가 필요합니다: pip install onnxruntime") from e
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ONNX_THREADS > 0:
+            options.intra_op_num_threads = ONNX_THREADS
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [item.name for item in self.session.get_inputs()]
+        self.path = path
+
+    def eval(self):
+        return self
+
+    def __call__(self, input_ids=None, attention_mask=None, **kwargs):
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask, **kwargs}
+        ort_inputs = {
+            name: feeds[name].cpu().numpy().astype(np.int64)
+            for name in self.input_names if feeds.get(name) is not None
+        }
+        logits = self.session.run(["logits"], ort_inputs)[0]
+        return torch.from_numpy(logits)
+
+
+def build_backend_model(model: nn.Module, backend: str, tokenizer=None,
+                        onnx_path: str = ONNX_MODEL_PATH) -> object:
+    """fp32 모델로부터 지정한 백엔드의 추론 모델 생성
+
+    Args:
+        model: 로드된 fp32 분류기
+        backend: torch / int8 / onnx
+        tokenizer: ONNX 내보내기에 사용할 토크나이저 (onnx 파일이 없을 때만 필요)
+        onnx_path: ONNX 파일 경로 (없으면 내보낸 뒤 사용)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 백엔드: {backend} (지원: {', '.join(BACKENDS)})")
+    if backend == "torch":
+        return model
+    if backend == "int8":
+        return quantize_int8(model)
+    if not os.path.exists(onnx_path):
+        if tokenizer is None:
+            raise ValueError("ONNX 파일이 없어 내보내기에 토크나이저가 필요합니다.")
+        export_onnx(model, tokenizer, onnx_path)
+    return OnnxClassifierModule(onnx_path)
+
+
+def current_rss_mb() -> float:
+    """현재 프로세스 RSS (MB)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def parity_check(reference: List[Dict], candidate: List[Dict], tolerance: float) -> Dict:
+    """확률(%) 최대 오차와 1순위 일치 여부 비교"""
+    max_diff = 0.0
+    top1_matches = 0
+    for ref, cand in zip(reference, candidate):
+        for label, prob in ref["probabilities"].items():
+            max_diff = max(max_diff, abs(prob - cand["probabilities"].get(label, 0.0)))
+        top1_matches += int(ref["personality_type"] == cand["personality_type"])
+    return {
+        "max_prob_diff": max_diff,
+        "top1_agreement": top1_matches / max(1, len(reference)),
+        "passed": max_diff <= tolerance and top1_matches == len(reference)
+    }
+
+
+def _benchmark_backend(backend: str, repeat: int, result_queue) -> None:
+    """별도 프로세스에서 백엔드 하나를 로드해 지연시간/메모리 측정 (RSS가 섞이지 않도록 분리)"""
+    from keyword_classifier import KeywordPersonalityClassifier
+
+    rss_before = current_rss_mb()
+    load_start = time.perf_counter()
+    classifier = KeywordPersonalityClassifier(backend=backend)
+    load_seconds = time.perf_counter() - load_start
+
+    classifier.predict_from_keywords(PARITY_KEYWORDS[0])  # 워밍업
+    latencies = []
+    for _ in range(repeat):
+        for keywords in PARITY_KEYWORDS:
+            start = time.perf_counter()
+            classifier.predict_from_keywords(keywords)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    batch_start = time.perf_counter()
+    classifier.predict_batch(PARITY_KEYWORDS * repeat)
+    batch_seconds = time.perf_counter() - batch_start
+
+    result_queue.put({
+        "backend": classifier.backend,
+        "load_seconds": load_seconds,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "batch_seq_per_second": len(PARITY_KEYWORDS) * repeat / batch_seconds if batch_seconds > 0 else 0.0,
+        "rss_mb": current_rss_mb(),
+        "model_rss_mb": current_rss_mb() - rss_before,
+        "predictions": [classifier.predict_from_keywords(k) for k in PARITY_KEYWORDS]
+    })
+
+
+def main():
+    """백엔드별 확률 일치(parity) 검사 및 지연시간/메모리 벤치마크 CLI"""
+    import argparse
+    import multiprocessing
+
+    parser = argparse.ArgumentParser(description="키워드 분류기 추론 백엔드 비교 (torch fp32 / int8 / onnx)")
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS, help='비교할 백엔드')
+    parser.add_argument('--repeat', type=int, default=20, help='고정 키워드 세트 반복 횟수 (기본값: 20)')
+    parser.add_argument('--tolerance', type=float, default=2.0,
+                        help='fp32 대비 허용 확률 오차 (%%p, 기본값: 2.0)')
+    args = parser.parse_args()
+
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for backend in backends:
+        result_queue = context.Queue()
+        process = context.Process(target=_benchmark_backend, args=(backend, args.repeat, result_queue))
+        process.start()
+        try:
+            results[backend] = result_queue.get(timeout=1800)
+        except Exception as e:
+            print(f"{backend} 벤치마크 실패: {e}")
+        process.join()
+
+    if "torch" not in results:
+        print("fp32 기준 결과가 없어 비교할 수 없습니다.")
+        sys.exit(1)
+
+    print("키워드 분류기 백엔드 비교")
+    print("=" * 70)
+    print(f"{'backend':<8}{'load(s)':>9}{'p50(ms)':>10}{'p95(ms)':>10}{'batch seq/s':>13}{'RSS(MB)':>10}{'모델(MB)':>10}")
+    for backend, r in results.items():
+        print(f"{r['backend']:<8}{r['load_seconds']:>9.2f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+              f"{r['batch_seq_per_second']:>13.1f}{r['rss_mb']:>10.1f}{r['model_rss_mb']:>10.1f}")
+
+    print("=" * 70)
+    failed = False
+    for backend, r in results.items():
+        if backend == "torch":
+            continue
+        parity = parity_check(results["torch"]["predictions"], r["predictions"], args.tolerance)
+        status = "통과" if parity["passed"] else "실패"
+        print(f"[{status}] {backend}: 최대 확률 오차 {parity['max_prob_diff']:.3f}%p, "
+              f"1순위 일치율 {parity['top1_agreement']:.0%}")
+        failed = failed or not parity["passed"]
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
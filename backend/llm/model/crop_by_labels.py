@@ -1,15 +1,136 @@
 import cv2
 import os
+import json
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 from ultralytics import YOLO
 from pathlib import Path
 import sys
 
 sys.path.append(os.path.dirname(__file__))
 
+from model_registry import get_model_registry
+
 MODEL_DIR = os.path.dirname(__file__)
 RESULT_DIR = os.path.join(os.path.dirname(__file__), '../detection_results/images')
+DEFAULT_MODEL_PATH = os.path.join(MODEL_DIR, "best.pt")
+
+# 배치 추론 시 한 번의 forward에 넣는 이미지 수
+DEFAULT_BATCH_SIZE = int(os.getenv("YOLO_BATCH_SIZE", "16"))
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+@dataclass
+class DetectionRecord:
+    """YOLO 탐지 결과 요약 (이미지 1장)
+    
+    박스/클래스/신뢰도는 numpy 배열로 보관하고, 크롭은 원본 배열의 view로 만들어
+    복사 없이 이후 단계(GPT 요소별 분석 등)에서 사용할 수 있습니다.
+    """
+    boxes: np.ndarray          # (N, 4) int32 - x1, y1, x2, y2
+    class_ids: np.ndarray      # (N,) int32
+    scores: np.ndarray         # (N,) float32
+    names: Dict[int, str]      # 클래스 ID -> 라벨
+    image: Optional[np.ndarray] = field(default=None, repr=False)  # 원본 BGR 이미지
+    
+    @classmethod
+    def from_result(cls, result, names, image=None) -> "DetectionRecord":
+        """ultralytics 결과 1건으로 생성"""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return cls(np.zeros((0, 4), dtype=np.int32), np.zeros(0, dtype=np.int32),
+                       np.zeros(0, dtype=np.float32), dict(names), image)
+        return cls(
+            boxes.xyxy.cpu().numpy().astype(np.int32),
+            boxes.cls.cpu().numpy().astype(np.int32),
+            boxes.conf.cpu().numpy().astype(np.float32),
+            dict(names),
+            image
+        )
+    
+    def __len__(self) -> int:
+        return len(self.class_ids)
+    
+    @property
+    def labels(self) -> List[str]:
+        return [self.names[int(cls_id)] for cls_id in self.class_ids]
+    
+    @property
+    def label_counts(self) -> Dict[str, int]:
+        counts = {}
+        for label in self.labels:
+            counts[label] = counts.get(label, 0) + 1
+        return counts
+    
+    def _clip(self, x1, y1, x2, y2) -> Tuple[int, int, int, int]:
+        height, width = self.image.shape[:2]
+        return max(0, x1), max(0, y1), min(width, x2), min(height, y2)
+    
+    def crop(self, index: int) -> Optional[np.ndarray]:
+        """index번째 객체 크롭 (원본 이미지의 view, 빈 영역이면 None)"""
+        if self.image is None:
+            return None
+        x1, y1, x2, y2 = self._clip(*(int(v) for v in self.boxes[index]))
+        view = self.image[y1:y2, x1:x2]
+        return view if view.size else None
+    
+    def crops(self) -> List[Tuple[str, np.ndarray]]:
+        """(라벨, 크롭 view) 목록 (빈 크롭 제외)"""
+        return [(label, view) for label, view in
+                ((label, self.crop(i)) for i, label in enumerate(self.labels)) if view is not None]
+    
+    def region(self, labels, padding: float = 0.05) -> Optional[np.ndarray]:
+        """지정한 라벨들의 박스를 모두 포함하는 영역 (여백 포함, 원본 이미지의 view)"""
+        if self.image is None:
+            return None
+        wanted = {label.lower() for label in labels}
+        mask = np.array([label.lower() in wanted for label in self.labels], dtype=bool)
+        if not mask.any():
+            return None
+        selected = self.boxes[mask]
+        x1, y1 = selected[:, 0].min(), selected[:, 1].min()
+        x2, y2 = selected[:, 2].max(), selected[:, 3].max()
+        pad_x, pad_y = int((x2 - x1) * padding), int((y2 - y1) * padding)
+        x1, y1, x2, y2 = self._clip(int(x1) - pad_x, int(y1) - pad_y, int(x2) + pad_x, int(y2) + pad_y)
+        view = self.image[y1:y2, x1:x2]
+        return view if view.size else None
+    
+    def to_summary(self) -> Dict:
+        """JSON 직렬화 가능한 요약 (DB/결과 캐시 저장용)"""
+        return {
+            "count": len(self),
+            "label_counts": self.label_counts,
+            "objects": [
+                {
+                    "label": label,
+                    "class_id": int(cls_id),
+                    "confidence": round(float(score), 4),
+                    "box": [int(v) for v in box]
+                }
+                for label, cls_id, score, box in zip(self.labels, self.class_ids, self.scores, self.boxes)
+            ]
+        }
+
+
+def load_yolo_model(model_path=None):
+    """
+    레지스트리를 통해 YOLO 모델을 가져오는 함수 (프로세스당 경로별 1회 로드)
+    
+    Args:
+        model_path (str): YOLO 모델 파일 경로 (.pt) (기본값: best.pt)
+        
+    Returns:
+        YOLO: 로드된 YOLO 모델
+    """
+    model_path = os.path.abspath(model_path or DEFAULT_MODEL_PATH)
+    return get_model_registry().get(f"yolo:{model_path}", lambda: YOLO(model_path))
+
 
-def crop_objects_by_labels(image_path, model_path=None, output_dir="cropped_objects", result_dir="detection_results"):
+def crop_objects_by_labels(image_path, model_path=None, output_dir="cropped_objects", result_dir="detection_results", model=None,
+                           image=None, save_result=True):
     """
     YOLO 모델을 사용하여 이미지에서 객체를 감지하고 라벨별로 크롭하여 저장하는 함수
     
@@ -18,69 +139,58 @@ def crop_objects_by_labels(image_path, model_path=None, output_dir="cropped_obje
         model_path (str): YOLO 모델 파일 경로 (.pt) (기본값: best.pt)
         output_dir (str): 크롭된 이미지들을 저장할 디렉토리
         result_dir (str): 결과 이미지를 저장할 디렉토리
+        model (YOLO): 이미 로드된 YOLO 모델 (없으면 레지스트리에서 가져옴)
+        image (np.ndarray): 이미 디코딩된 BGR 이미지 (있으면 파일을 다시 읽지 않음)
+        save_result (bool): 결과 이미지를 파일로 저장할지 여부
+        
+    Returns:
+        dict: 탐지 결과(DetectionRecord), 바운딩 박스가 그려진 결과 이미지(BGR 배열),
+              결과 이미지 경로, 라벨별 개수 (모델/이미지 로드 실패 또는 감지된 객체가 없으면 None)
     """
-    if model_path is None:
-        model_path = os.path.join(os.path.dirname(__file__), "best.pt")
-
-    
-    # YOLO 모델 로드
-    try:
-        model = YOLO(model_path)
-        print(f"모델 로드 성공: {model_path}")
-    except Exception as e:
-        print(f"모델 로드 실패: {e}")
-        return
+    # YOLO 모델 로드 (레지스트리에 캐시된 모델 재사용)
+    if model is None:
+        try:
+            model = load_yolo_model(model_path)
+        except Exception as e:
+            print(f"모델 로드 실패: {e}")
+            return
     
-    # 원본 이미지 로드
-    original_image = cv2.imread(image_path)
-    if original_image is None:
-        print(f"이미지 로드 실패: {image_path}")
-        return
+    # 원본 이미지 로드 (메모리 이미지가 전달되면 그대로 사용)
+    if image is not None:
+        original_image = image
+    else:
+        original_image = cv2.imread(image_path)
+        if original_image is None:
+            print(f"이미지 로드 실패: {image_path}")
+            return
+        print(f"이미지 로드 성공: {image_path}")
     
-    print(f"이미지 로드 성공: {image_path}")
     print(f"이미지 크기: {original_image.shape[1]}x{original_image.shape[0]}")
     
     # YOLO 추론 실행
     results = model(original_image)
     
-    # 라벨별 카운터 초기화
-    label_counters = {}
+    record = DetectionRecord.from_result(results[0], model.names, original_image)
     
     print("\n객체 감지 및 크롭 시작...")
     
-    for r in results:
-        boxes = r.boxes
-        if boxes is None or len(boxes) == 0:
-            print("감지된 객체가 없습니다.")
-            return
+    if len(record) == 0:
+        print("감지된 객체가 없습니다.")
+        return
+    
+    print(f"총 {len(record)}개의 객체가 감지되었습니다.")
+    
+    label_counters = record.label_counts
+    for i, label in enumerate(record.labels):
+        # 객체 크롭 (원본 이미지의 view)
+        cropped_image = record.crop(i)
         
-        print(f"총 {len(boxes)}개의 객체가 감지되었습니다.")
+        if cropped_image is None:
+            print(f"객체 {i+1} ({label}): 크롭 실패 - 빈 이미지")
+            continue
         
-        for i, box in enumerate(boxes):
-            # 바운딩 박스 좌표 추출
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            
-            # 클래스 ID와 라벨 추출
-            cls_id = int(box.cls[0])
-            label = model.names[cls_id]
-            
-            # 신뢰도 추출
-            confidence = float(box.conf[0])
-            
-            # 라벨별 카운터 업데이트
-            if label not in label_counters:
-                label_counters[label] = 0
-            label_counters[label] += 1
-            
-            # 객체 크롭
-            cropped_image = original_image[y1:y2, x1:x2]
-            
-            if cropped_image.size == 0:
-                print(f"객체 {i+1} ({label}): 크롭 실패 - 빈 이미지")
-                continue
-            
-            print(f"객체 {i+1}: {label} (신뢰도: {confidence:.2f})")
-            print(f"크기: {cropped_image.shape[1]}x{cropped_image.shape[0]}")
+        print(f"객체 {i+1}: {label} (신뢰도: {float(record.scores[i]):.2f})")
+        print(f"크기: {cropped_image.shape[1]}x{cropped_image.shape[0]}")
     
     # 결과 요약 출력
     print(f"\n크롭 결과 요약:")
@@ -95,11 +205,128 @@ def crop_objects_by_labels(image_path, model_path=None, output_dir="cropped_obje
     # 입력 이미지 파일명에서 확장자 제거
     image_base = os.path.splitext(os.path.basename(image_path))[0]
     result_image_path = os.path.join(RESULT_DIR, f"detection_result_{image_base}.jpg")
-    results[0].save(filename=result_image_path)
-    print(f"🎯 탐지 결과 이미지: {result_image_path}")
+    annotated_image = results[0].plot()
+    if save_result:
+        cv2.imwrite(result_image_path, annotated_image)
+        print(f"🎯 탐지 결과 이미지: {result_image_path}")
+    
+    return {
+        "record": record,
+        "annotated_image": annotated_image,
+        "result_image_path": result_image_path,
+        "label_counts": label_counters
+    }
+
+
+def _load_image(item):
+    """배치 입력 항목(경로 또는 BGR 배열)을 (이름, 배열)로 변환"""
+    if isinstance(item, (str, Path)):
+        return str(item), cv2.imread(str(item))
+    return None, item
+
+
+def detect_objects_batch(images, model_path=None, model=None, batch_size=DEFAULT_BATCH_SIZE, names=None):
+    """
+    여러 이미지를 batch_size 단위로 묶어 한 번의 YOLO forward로 객체를 감지하는 함수
+    
+    Args:
+        images (list): 이미지 파일 경로 또는 BGR 배열 목록
+        model_path (str): YOLO 모델 파일 경로 (.pt) (기본값: best.pt)
+        model (YOLO): 이미 로드된 YOLO 모델 (없으면 레지스트리에서 가져옴)
+        batch_size (int): 한 번의 forward에 넣을 이미지 수
+        names (list): 결과에 표시할 이미지 이름 (기본값: 파일 경로 또는 인덱스)
+        
+    Returns:
+        list: 입력 순서와 같은 이미지별 결과 dict
+              (image, width, height, detections, label_counts / 로드 실패 시 error)
+    """
+    if model is None:
+        model = load_yolo_model(model_path)
+    batch_size = max(1, int(batch_size))
+    
+    results = []
+    with ThreadPoolExecutor(max_workers=4) as loader:
+        for start in range(0, len(images), batch_size):
+            chunk = images[start:start + batch_size]
+            loaded = list(loader.map(_load_image, chunk))
+            
+            batch_names, batch_arrays, chunk_results = [], [], []
+            for offset, (path, array) in enumerate(loaded):
+                index = start + offset
+                name = names[index] if names else (path or str(index))
+                if array is None:
+                    chunk_results.append({"image": name, "error": "이미지 로드 실패"})
+                    continue
+                entry = {"image": name, "width": int(array.shape[1]), "height": int(array.shape[0])}
+                chunk_results.append(entry)
+                batch_names.append(entry)
+                batch_arrays.append(array)
+            
+            if batch_arrays:
+                for entry, result in zip(batch_names, model(batch_arrays, verbose=False)):
+                    summary = DetectionRecord.from_result(result, model.names).to_summary()
+                    entry["detections"] = summary["objects"]
+                    entry["label_counts"] = summary["label_counts"]
+            results.extend(chunk_results)
+    
+    return results
+
+
+def batch_main(argv=None):
+    """배치 탐지 CLI - 디렉토리 단위로 이미지를 탐지하고 처리 속도(images/sec)를 출력"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog="crop_by_labels.py batch",
+        description="디렉토리의 이미지들을 YOLO 배치 추론으로 탐지하는 도구"
+    )
+    parser.add_argument('input_dir', type=str, help='이미지가 들어 있는 디렉토리')
+    parser.add_argument('--model', type=str, default=DEFAULT_MODEL_PATH, help='YOLO 모델 파일 경로 (.pt)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'한 번의 forward에 넣을 이미지 수 (기본값: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--output', type=str, default=None, help='이미지별 탐지 결과를 저장할 JSONL 파일')
+    parser.add_argument('--recursive', action='store_true', help='하위 디렉토리까지 검색')
+    args = parser.parse_args(argv)
+    
+    pattern = '**/*' if args.recursive else '*'
+    image_paths = sorted(
+        str(p) for p in Path(args.input_dir).glob(pattern)
+        if p.suffix.lower() in IMAGE_EXTENSIONS
+    )
+    if not image_paths:
+        print(f"이미지 파일을 찾을 수 없습니다: {args.input_dir}")
+        return
+    
+    model = load_yolo_model(args.model)
+    print(f"YOLO 배치 탐지 시작: {len(image_paths)}개 이미지, 배치 크기 {args.batch_size}")
+    print("=" * 50)
+    
+    start_time = time.time()
+    results = detect_objects_batch(image_paths, model=model, batch_size=args.batch_size)
+    elapsed = time.time() - start_time
+    
+    failed = sum(1 for r in results if "error" in r)
+    total_counts = {}
+    for r in results:
+        for label, count in r.get("label_counts", {}).items():
+            total_counts[label] = total_counts.get(label, 0) + count
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            for r in results:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        print(f"탐지 결과 저장: {args.output}")
+    
+    print("라벨별 탐지 개수:")
+    for label, count in sorted(total_counts.items()):
+        print(f"   • {label}: {count}개")
+    print("=" * 50)
+    print(f"처리 이미지: {len(results) - failed}개 (실패 {failed}개)")
+    print(f"소요시간: {elapsed:.2f}초, 처리 속도: {len(results) / elapsed if elapsed > 0 else 0:.1f} images/sec")
+
 
 def main():
-    """메인 함수 - 커맨드 라인 인자 처리"""
+    """메인 함수 - 커맨드 라인 인자 처리 (첫 인자가 batch이면 배치 탐지 실행)"""
     import argparse
     
     parser = argparse.ArgumentParser(
@@ -160,4 +387,7 @@ def main():
     print("작업이 완료되었습니다.")
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        batch_main(sys.argv[2:])
+    else:
+        main() 
\ No newline at end of file
@@ -0,0 +1,183 @@
+import io
+import os
+import sys
+import base64
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+sys.path.append(os.path.dirname(__file__))
+
+logger = logging.getLogger('image_artifact')
+
+# 디스크 저장 전용 스레드 풀 (분석 경로가 파일 쓰기를 기다리지 않도록 함)
+_writer_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-writer")
+
+SizeKey = Optional[Tuple[int, int]]
+
+
+class ImageArtifact:
+    """분석 단계 간에 전달되는 메모리 이미지 객체
+
+    업로드 → YOLO → GPT 단계가 같은 이미지를 파일로 다시 읽고 디코딩/인코딩하지 않도록
+    디코딩된 이미지를 한 번만 보관하고, 축소본/JPEG 바이트/base64/BGR 배열을 필요할 때
+    한 번만 만들어 캐시합니다. 디스크 저장은 캐시된 바이트를 그대로 쓰며 백그라운드로 처리할 수 있습니다.
+    """
+
+    def __init__(self, image: Image.Image, name: str, encoded: Optional[Tuple[SizeKey, int, bytes]] = None):
+        """
+        Args:
+            image: RGB로 변환된 PIL 이미지
+            name: 이미지 식별자 (보통 unique_id)
+            encoded: 이미 가지고 있는 인코딩 결과 (max_size, quality, JPEG 바이트)
+        """
+        self.image = image
+        self.name = name
+        self._lock = threading.Lock()
+        self._variants: Dict[SizeKey, Image.Image] = {None: image}
+        self._encoded: Dict[Tuple[SizeKey, int], bytes] = {}
+        self._base64: Dict[Tuple[SizeKey, int], str] = {}
+        self._arrays: Dict[SizeKey, np.ndarray] = {}
+        if encoded is not None:
+            max_size, quality, data = encoded
+            self._encoded[(max_size, quality)] = data
+
+    @classmethod
+    def from_bytes(cls, data: bytes, name: str) -> "ImageArtifact":
+        """업로드된 바이트를 한 번 디코딩 (EXIF 회전 적용, RGB 변환)"""
+        image = Image.open(io.BytesIO(data))
+        try:
+            image = ImageOps.exif_transpose(image)
+        except Exception as e:
+            logger.warning(f"EXIF 회전 정보 적용 실패 (무시 가능): {e}")
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        else:
+            image.load()
+        return cls(image, name)
+
+    @classmethod
+    def from_path(cls, path: str, name: Optional[str] = None) -> "ImageArtifact":
+        """이미지 파일을 읽어 생성 (파일 바이트는 원본 인코딩 결과로 보관)"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        artifact = cls.from_bytes(data, name or os.path.splitext(os.path.basename(path))[0])
+        if path.lower().endswith(('.jpg', '.jpeg')):
+            artifact._encoded[(None, 0)] = data
+        return artifact
+
+    @classmethod
+    def from_bgr_array(cls, array: np.ndarray, name: str) -> "ImageArtifact":
+        """OpenCV/YOLO가 만든 BGR 배열로 생성 (예: 바운딩 박스가 그려진 결과 이미지)"""
+        artifact = cls(Image.fromarray(np.ascontiguousarray(array[..., ::-1])), name)
+        artifact._arrays[None] = array
+        return artifact
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.image.size
+
+    def variant(self, max_size: SizeKey = None) -> Image.Image:
+        """종횡비를 유지한 축소본 (max_size별 1회 생성)"""
+        if max_size is None or (self.image.width <= max_size[0] and self.image.height <= max_size[1]):
+            return self.image
+        with self._lock:
+            resized = self._variants.get(max_size)
+            if resized is None:
+                resized = self.image.copy()
+                resized.thumbnail(max_size, Image.Resampling.LANCZOS)
+                self._variants[max_size] = resized
+        return resized
+
+    def encode(self, max_size: SizeKey = None, quality: int = 85) -> bytes:
+        """JPEG 바이트 (max_size, quality 조합별 1회 인코딩)"""
+        key = (max_size, quality)
+        data = self._encoded.get(key)
+        if data is None:
+            buffer = io.BytesIO()
+            self.variant(max_size).save(buffer, 'JPEG', quality=quality, optimize=True)
+            data = buffer.getvalue()
+            with self._lock:
+                self._encoded.setdefault(key, data)
+        return data
+
+    def source_bytes(self) -> Optional[bytes]:
+        """파일/업로드에서 읽은 원본 JPEG 바이트 (없으면 None)"""
+        return self._encoded.get((None, 0))
+
+    def base64(self, max_size: SizeKey = None, quality: int = 85) -> str:
+        """GPT 전송용 base64 문자열 (캐시되어 재시도 시 다시 인코딩하지 않음)"""
+        key = (max_size, quality)
+        value = self._base64.get(key)
+        if value is None:
+            value = base64.b64encode(self.encode(max_size, quality)).decode('utf-8')
+            with self._lock:
+                self._base64.setdefault(key, value)
+        return value
+
+    def bgr_array(self, max_size: SizeKey = None) -> np.ndarray:
+        """YOLO(OpenCV) 입력용 BGR 배열"""
+        array = self._arrays.get(max_size)
+        if array is None:
+            array = np.ascontiguousarray(np.asarray(self.variant(max_size))[..., ::-1])
+            with self._lock:
+                self._arrays.setdefault(max_size, array)
+        return array
+
+    def reencoded(self, max_size: SizeKey, quality: int) -> "ImageArtifact":
+        """지정한 크기/품질로 인코딩된 JPEG를 디코딩한 새 객체
+
+        디스크에 저장된 압축본과 똑같은 픽셀을 메모리에서 바로 넘겨줄 때 사용합니다.
+        """
+        data = self.encode(max_size, quality)
+        artifact = ImageArtifact.from_bytes(data, self.name)
+        artifact._encoded[(None, 0)] = data
+        return artifact
+
+    def save(self, path: str, max_size: SizeKey = None, quality: int = 85,
+             background: bool = False) -> Optional[Future]:
+        """JPEG 파일로 저장 (캐시된 인코딩 바이트를 그대로 기록)
+
+        Args:
+            path: 저장 경로
+            max_size: 축소 크기 (None이면 원본 크기)
+            quality: JPEG 품질
+            background: True이면 백그라운드 스레드에서 저장하고 Future 반환
+        """
+        data = self.encode(max_size, quality)
+        if background:
+            future = _writer_pool.submit(_write_file, path, data)
+            future.add_done_callback(_log_write_error)
+            return future
+        _write_file(path, data)
+        return None
+
+    def save_source(self, path: str, background: bool = False) -> Optional[Future]:
+        """원본 JPEG 바이트가 있으면 재인코딩 없이 저장, 없으면 품질 95로 인코딩"""
+        data = self.source_bytes()
+        if data is None:
+            return self.save(path, quality=95, background=background)
+        if background:
+            future = _writer_pool.submit(_write_file, path, data)
+            future.add_done_callback(_log_write_error)
+            return future
+        _write_file(path, data)
+        return None
+
+
+def _write_file(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _log_write_error(future: Future):
+    error = future.exception()
+    if error is not None:
+        logger.error(f"이미지 저장 실패: {error}")
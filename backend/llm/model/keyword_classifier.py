@@ -11,6 +11,11 @@ from huggingface_hub import login
 from dotenv import load_dotenv
 from transformers import AutoModel, AutoTokenizer, AutoConfig
 
+from model_registry import get_model_registry
+from keyword_matcher import EMOTION_KEYWORDS, KeywordExtractionEngine
+from previous_keywords import get_previous_keyword_store
+from classifier_backends import BACKENDS, DEFAULT_BACKEND, ONNX_MODEL_PATH, build_backend_model
+
 # 환경변수 로드
 load_dotenv()
 
@@ -20,6 +25,11 @@ HF_MODEL_NAME = os.getenv("HF_MODEL_NAME", "Bokji/HTP-personality-classifier")
 
 # 기본 설정
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TOKENIZER_NAME = 'bert-base-uncased'
+
+# 모델 레지스트리 키
+KEYWORD_CLASSIFIER_MODEL = "keyword_classifier"
+BERT_TOKENIZER_MODEL = f"tokenizer:{TOKENIZER_NAME}"
 
 # 허깅페이스 로그인 (토큰이 있는 경우에만)
 if HF_TOKEN:
@@ -39,8 +49,10 @@ else:
 class KeywordPersonalityClassifier:
     """감정 키워드 기반 성격 유형 분류기"""
     
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None):
         self.model = None
+        self.fp32_model = None
+        self.backend = "torch"
         self.vocab = None
         self.label_map = {
             0: "추진형",
@@ -51,27 +63,13 @@ class KeywordPersonalityClassifier:
         }
         self.reverse_label_map = {v: k for k, v in self.label_map.items()}
         
-        # 감정 키워드 사전 (HTP 심리분석 기반 확장)
-        self.emotion_keywords = {
-            "불안": ["불안", "걱정", "초조", "긴장", "불안감", "사회불안", "정서불안", "심리불안"],
-            "우울": ["우울", "슬픔", "절망", "무기력", "침울", "우울감", "내적우울감"],
-            "애정": ["애정", "사랑", "애정결핍", "관심", "애착", "애정욕구", "관심욕구"],
-            "분노": ["분노", "화", "짜증", "격분", "성난", "적대감", "공격성"],
-            "두려움": ["두려움", "공포", "무서움", "겁", "공포감", "경계심"],
-            "외로움": ["외로움", "고독", "소외", "쓸쓸", "고립감", "단절감"],
-            "스트레스": ["스트레스", "압박", "부담", "긴장감", "압박감"],
-            "욕구": ["인정욕구", "관심욕구", "애정욕구", "승인욕구", "인정받고자", "관심받고자"],
-            "결핍": ["애정결핍", "관심결핍", "인정결핍", "사랑결핍", "정서적결핍"],
-            "위축": ["위축", "소극적", "내향적", "수동적", "소심함", "자신감부족"],
-            "경계": ["경계심", "경계", "방어적", "거리감", "신뢰부족", "의심"],
-            "자존감": ["자존감", "자신감", "자기가치", "자아개념", "자기인식"],
-            "충동": ["충동성", "조급함", "성급함", "즉흥적", "참을성부족"],
-            "완벽": ["완벽주의", "까다로움", "세밀함", "꼼꼼함", "강박적"],
-            "소통": ["소통부족", "표현부족", "의사소통", "감정표현", "대인관계"]
-        }
+        # 감정 키워드 사전 (HTP 심리분석 기반 확장) 및 초기화 시 한 번 컴파일하는 추출 엔진
+        self.emotion_keywords = EMOTION_KEYWORDS
+        self.keyword_engine = KeywordExtractionEngine(self.emotion_keywords)
         
         self.logger = self._setup_logging()
         self._load_model()
+        self.set_backend(backend or DEFAULT_BACKEND)
     
     def _setup_logging(self) -> logging.Logger:
         """로깅 설정"""
@@ -176,77 +174,61 @@ class KeywordPersonalityClassifier:
     
 
     
-    def _extract_emotion_keywords(self, text: str) -> List[str]:
-        """텍스트에서 감정 키워드 추출 (GPT 키워드 섹션 우선 파싱)"""
-        extracted = []
+    def set_backend(self, backend: str, keep_fp32: bool = False, onnx_path: str = ONNX_MODEL_PATH) -> str:
+        """추론 백엔드 전환 (torch: fp32 / int8: 동적 양자화 / onnx: onnxruntime)
+        
+        CPU 서버에서는 int8/onnx가 지연시간과 메모리를 줄여 줍니다. 전환에 실패하면 fp32로 계속 동작합니다.
+        
+        Args:
+            backend: 사용할 백엔드 이름
+            keep_fp32: fp32 원본 모델을 메모리에 유지할지 여부 (다시 torch로 돌아갈 때 필요)
+            onnx_path: ONNX 파일 경로 (없으면 현재 모델을 내보낸 뒤 사용)
+        
+        Returns:
+            str: 실제 적용된 백엔드 이름
+        """
+        backend = (backend or "torch").lower()
+        if backend not in BACKENDS:
+            self.logger.warning(f"알 수 없는 백엔드 '{backend}', torch(fp32)를 사용합니다. (지원: {', '.join(BACKENDS)})")
+            backend = "torch"
+        
+        source = self.fp32_model if self.fp32_model is not None else getattr(self, "hf_model", None)
+        if backend == self.backend and self.model is not None:
+            return self.backend
+        if source is None or not isinstance(source, nn.Module):
+            self.logger.warning("fp32 원본 모델이 없어 백엔드를 전환할 수 없습니다.")
+            return self.backend
         
-        # 1단계: GPT가 추출한 "주요 감정 키워드" 섹션을 직접 파싱
-        gpt_keywords = self._parse_gpt_keywords_section(text)
+        try:
+            tokenizer = get_bert_tokenizer() if backend == "onnx" else None
+            self.model = build_backend_model(source, backend, tokenizer=tokenizer, onnx_path=onnx_path)
+            self.backend = backend
+        except Exception as e:
+            self.logger.warning(f"{backend} 백엔드 전환 실패, torch(fp32)를 사용합니다: {e}")
+            self.model = source
+            self.backend = "torch"
+        
+        # fp32 원본은 필요할 때만 유지 (워커당 RSS 절감)
+        if self.backend == "torch":
+            self.fp32_model = None
+        elif keep_fp32:
+            self.fp32_model = source
+        else:
+            self.fp32_model = None
+        self.hf_model = self.model if self.backend == "torch" else self.fp32_model
+        self.logger.info(f"키워드 분류기 추론 백엔드: {self.backend}")
+        return self.backend
+    
+    def _extract_emotion_keywords(self, text: str) -> List[str]:
+        """텍스트에서 감정 키워드 추출 (GPT 키워드 섹션 우선 파싱 + 사전 기반 보완, 중복 제거)"""
+        gpt_keywords, extracted = self.keyword_engine.extract(text)
         if gpt_keywords:
-            extracted.extend(gpt_keywords)
             self.logger.info(f"GPT 키워드 섹션에서 추출: {gpt_keywords}")
-        
-        # 2단계: 기존 사전 기반 키워드 추출 (보완용)
-        text_lower = text.lower()
-        for emotion_category, keywords in self.emotion_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    extracted.append(keyword)
-        
-        return list(set(extracted))  # 중복 제거
+        return extracted
     
     def _parse_gpt_keywords_section(self, text: str) -> List[str]:
         """GPT 분석 결과에서 '주요 감정 키워드' 섹션 파싱"""
-        import re
-        
-        keywords = []
-        
-        # "주요 감정 키워드" 섹션 찾기
-        keyword_section_pattern = r'(?:주요\s*감정\s*키워드|감정\s*키워드)[\s\S]*?(?=\n\n|\n\d+\.|$)'
-        match = re.search(keyword_section_pattern, text, re.IGNORECASE)
-        
-        if match:
-            keyword_section = match.group(0)
-            
-            # 리스트 형태의 키워드 추출 (- 또는 • 또는 숫자로 시작)
-            keyword_patterns = [
-                r'[-•]\s*([^\n]+)',  # - 키워드 또는 • 키워드
-                r'^\s*\d+\.\s*([^\n]+)',  # 숫자. 키워드
-                r'^\s*[가-힣]+욕구',  # ~욕구 패턴
-                r'^\s*[가-힣]+불안',  # ~불안 패턴
-                r'^\s*[가-힣]+결핍',  # ~결핍 패턴
-            ]
-            
-            for line in keyword_section.split('\n'):
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                for pattern in keyword_patterns:
-                    matches = re.findall(pattern, line, re.MULTILINE)
-                    for match in matches:
-                        keyword = match.strip().replace('*', '').replace('**', '')
-                        if keyword and len(keyword) > 1:
-                            keywords.append(keyword)
-        
-        # 추가로 텍스트에서 직접 특정 패턴 찾기
-        direct_patterns = [
-            r'([가-힣]+욕구)',  # ~욕구
-            r'([가-힣]+불안)',  # ~불안  
-            r'([가-힣]+결핍)',  # ~결핍
-            r'(애정\s*결핍)',   # 애정 결핍
-            r'(사회\s*불안)',   # 사회 불안
-            r'(인정\s*욕구)',   # 인정 욕구
-        ]
-        
-        for pattern in direct_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                clean_keyword = re.sub(r'\s+', '', match)  # 공백 제거
-                if clean_keyword:
-                    keywords.append(clean_keyword)
-        
-        return list(set(keywords))  # 중복 제거
+        return self.keyword_engine.parse_gpt_keywords_section(text)
     
     def predict_from_keywords(self, keywords: List[str]) -> Dict[str, any]:
         """키워드 리스트로부터 성격 유형 예측 (BERT 전용)"""
@@ -275,8 +257,7 @@ class KeywordPersonalityClassifier:
             
             # BERT 모델인 경우 토크나이저 사용
             try:
-                from transformers import AutoTokenizer
-                tokenizer = AutoTokenizer.from_pretrained('bert-base-uncased')
+                tokenizer = get_bert_tokenizer()
                 
                 # 텍스트 토크나이징
                 inputs = tokenizer(
@@ -301,12 +282,7 @@ class KeywordPersonalityClassifier:
                         outputs = torch.randn(1, 5)  # 더미 출력
                     
                     # 출력이 dict 형태인 경우 logits 추출
-                    if isinstance(outputs, dict) and 'logits' in outputs:
-                        logits = outputs['logits']
-                    elif hasattr(outputs, 'logits'):
-                        logits = outputs.logits
-                    else:
-                        logits = outputs
+                    logits = self._logits_from_outputs(outputs)
                 
             except Exception as tokenizer_error:
                 self.logger.warning(f"BERT 토크나이저 실패: {tokenizer_error}")
@@ -353,15 +329,93 @@ class KeywordPersonalityClassifier:
         result["original_text"] = text
         
         return result
+    
+    @staticmethod
+    def _logits_from_outputs(outputs):
+        """모델 출력(dict/ModelOutput/텐서)에서 logits 추출"""
+        if isinstance(outputs, dict) and 'logits' in outputs:
+            return outputs['logits']
+        if hasattr(outputs, 'logits'):
+            return outputs.logits
+        return outputs
+    
+    def predict_batch(self, keyword_lists: List[List[str]], batch_size: int = 32) -> List[Dict[str, any]]:
+        """여러 키워드 리스트를 배치로 예측 (길이별 버킷팅 + 배치 단위 동적 패딩)
+        
+        토큰 길이순으로 정렬해 비슷한 길이끼리 묶으므로 패딩 낭비가 적습니다.
+        결과는 입력 순서대로 반환하며 predict_from_keywords와 같은 형식입니다.
+        
+        Args:
+            keyword_lists: 키워드 리스트 목록
+            batch_size: 한 번의 forward에 넣을 시퀀스 수
+        """
+        if not keyword_lists:
+            return []
+        
+        results: List[Optional[Dict[str, any]]] = [None] * len(keyword_lists)
+        try:
+            if not self.model:
+                raise ValueError("모델이 로드되지 않았습니다.")
+            
+            tokenizer = get_bert_tokenizer()
+            encoded = tokenizer(
+                [" ".join(keywords) for keywords in keyword_lists],
+                truncation=True,
+                max_length=512
+            )
+            order = sorted(range(len(keyword_lists)), key=lambda i: len(encoded['input_ids'][i]))
+            
+            with torch.inference_mode():
+                for start in range(0, len(order), max(1, batch_size)):
+                    bucket = order[start:start + max(1, batch_size)]
+                    inputs = tokenizer.pad(
+                        {key: [encoded[key][i] for i in bucket] for key in encoded.keys()},
+                        padding=True,
+                        return_tensors="pt"
+                    )
+                    logits = self._logits_from_outputs(self.model(**inputs))
+                    probabilities = torch.softmax(logits, dim=1)
+                    
+                    for row, index in enumerate(bucket):
+                        probs = probabilities[row]
+                        predicted_class = int(torch.argmax(probs).item())
+                        results[index] = {
+                            "personality_type": self.label_map[predicted_class],
+                            "confidence": float(probs[predicted_class].item()),
+                            "probabilities": {
+                                self.label_map[i]: float(prob.item() * 100) for i, prob in enumerate(probs)
+                            },
+                            "input_keywords": keyword_lists[index],
+                            "model_used": "bert_model"
+                        }
+        except Exception as e:
+            self.logger.error(f"배치 예측 실패: {str(e)}")
+            # 배치 처리가 불가능하면 남은 항목은 단건 예측 경로로 처리 (오류 시 기본값 반환)
+            for index, keywords in enumerate(keyword_lists):
+                if results[index] is None:
+                    results[index] = self.predict_from_keywords(keywords)
+        
+        return results
+
+def get_bert_tokenizer():
+    """레지스트리에 캐시된 BERT 토크나이저 반환 (프로세스당 1회 로드)"""
+    return get_model_registry().get(
+        BERT_TOKENIZER_MODEL,
+        lambda: AutoTokenizer.from_pretrained(TOKENIZER_NAME)
+    )
+
+def get_keyword_classifier() -> KeywordPersonalityClassifier:
+    """레지스트리에 캐시된 키워드 분류기 반환 (모델 다운로드/로드는 프로세스당 1회)"""
+    return get_model_registry().get(KEYWORD_CLASSIFIER_MODEL, KeywordPersonalityClassifier)
 
 def predict_personality_from_keywords(keywords: List[str]) -> Dict[str, any]:
     """감정 키워드 리스트로부터 성격 유형 예측 (단일 함수 인터페이스)"""
-    classifier = KeywordPersonalityClassifier()
+    classifier = get_keyword_classifier()
     return classifier.predict_from_keywords(keywords)
 
 def predict_personality_from_text(text: str) -> Dict[str, any]:
     """텍스트로부터 성격 유형 예측 (단일 함수 인터페이스)"""
-    classifier = KeywordPersonalityClassifier()
+    classifier = get_keyword_classifier()
     return classifier.predict_from_text(text)
 
 def run_keyword_prediction_from_result(image_base: str, quiet: bool = True) -> Dict[str, any]:
@@ -393,14 +447,14 @@ def run_keyword_prediction_from_data(analysis_text: str, quiet: bool = True) ->
         if not raw_text:
             raise ValueError("분석 결과에서 텍스트를 찾을 수 없습니다.")
         
-        # 키워드 분류기 생성
-        classifier = KeywordPersonalityClassifier()
+        # 키워드 분류기 (레지스트리에 캐시된 인스턴스 재사용)
+        classifier = get_keyword_classifier()
         
         # 1. 현재 이미지 분석 결과에서 키워드 추출
         current_keywords = classifier._extract_emotion_keywords(raw_text)
         
-        # 2. 이전 단계의 감정 키워드 데이터 로드
-        previous_keywords = _load_previous_stage_keywords()
+        # 2. 이전 단계의 감정 키워드 데이터 로드 (미리 만든 산출물, 파일 변경 시에만 다시 로드)
+        previous_keywords, previous_keywords_version = get_previous_keyword_store().get()
         
         # 3. 가중치 적용한 키워드 결합
         # 현재 이미지 키워드: 3배 가중치
@@ -418,6 +472,7 @@ def run_keyword_prediction_from_data(analysis_text: str, quiet: bool = True) ->
         
         # 키워드 기반 예측 수행
         prediction_result = classifier.predict_from_keywords(unique_keywords)
+        prediction_result["previous_keywords_version"] = previous_keywords_version
         
         if not quiet:
             print(f"\n[개선된 키워드 기반 성격 유형 예측 결과]")
@@ -460,73 +515,77 @@ def run_keyword_prediction_from_data(analysis_text: str, quiet: bool = True) ->
         }
 
 def _load_previous_stage_keywords() -> List[str]:
-    """이전 단계에서 추출된 키워드들을 로드 (감정 키워드만 필터링)"""
-    keywords = []
+    """이전 단계에서 추출된 감정 키워드 로드 (previous_keywords 산출물 사용, 하위 호환성 유지)"""
+    keywords, _ = get_previous_keyword_store().get()
+    return keywords
+
+def _batch_record_keywords(record, classifier: KeywordPersonalityClassifier) -> List[str]:
+    """배치 입력 레코드에서 키워드 리스트 추출 (keywords / keyword / text 필드 또는 리스트)"""
+    if isinstance(record, list):
+        return record
+    if record.get("keywords"):
+        return record["keywords"]
+    if record.get("keyword"):
+        return [record["keyword"]]
+    if record.get("text"):
+        return classifier._extract_emotion_keywords(record["text"]) or record["text"].split()[:10]
+    return []
+
+
+def _iter_batch_records(path: str):
+    """JSONL(한 줄에 레코드 1개) 또는 JSON 배열 파일(예: personality_keywords_dataset_v2.json)을 순서대로 읽기"""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def run_batch_prediction(input_path: str, output_path: str, batch_size: int = 32,
+                         chunk_size: int = 1024) -> Dict[str, any]:
+    """입력 파일을 chunk_size 단위로 읽어 배치 예측 후 JSONL로 기록
     
-    # 감정 관련 키워드 카테고리 정의
-    emotion_related_words = {
-        # 감정 상태
-        "불안", "걱정", "초조", "긴장", "불안감", "사회불안", "정서불안", "심리불안",
-        "우울", "슬픔", "절망", "무기력", "침울", "우울감", "내적우울감",
-        "애정", "사랑", "애정결핍", "관심", "애착", "애정욕구", "관심욕구",
-        "분노", "화", "짜증", "격분", "성난", "적대감", "공격성",
-        "두려움", "공포", "무서움", "겁", "공포감", "경계심",
-        "외로움", "고독", "소외", "쓸쓸", "고립감", "단절감",
-        "스트레스", "압박", "부담", "긴장감", "압박감",
-        "위축", "소극적", "내향적", "수동적", "소심함", "자신감부족",
-        "행복", "기쁨", "즐거움", "만족", "편안", "안정", "평온",
-        # 감정 표현 동사
-        "느끼다", "감정", "마음", "기분", "상태", "심리", "정서",
-        # HTP 심리 관련
-        "애정결핍", "관심결핍", "인정결핍", "사랑결핍", "정서적결핍"
-    }
+    입력 레코드에 label이 있으면 정확도도 함께 계산합니다.
+    """
+    import time
     
-    try:
-        # 전처리 결과 디렉토리 경로
-        preprocess_result_dir = os.path.join(BASE_DIR, "../../preprocess/result")
-        
-        # 채팅 키워드 로드 (감정 키워드가 많음)
-        chat_keywords_path = os.path.join(preprocess_result_dir, "chat_data_keywords.json")
-        if os.path.exists(chat_keywords_path):
-            with open(chat_keywords_path, 'r', encoding='utf-8') as f:
-                chat_data = json.load(f)
-                chat_keywords = [item["keyword"] for item in chat_data 
-                               if item.get("keyword") and item["keyword"] != "분석 실패"]
-                # 감정 관련 키워드만 필터링
-                emotion_keywords = [kw for kw in chat_keywords 
-                                  if any(emotion in kw for emotion in emotion_related_words)]
-                keywords.extend(emotion_keywords)
-        
-        # 도서 키워드에서 감정 관련만 선택
-        book_keywords_path = os.path.join(preprocess_result_dir, "book_keywords.json")
-        if os.path.exists(book_keywords_path):
-            with open(book_keywords_path, 'r', encoding='utf-8') as f:
-                book_data = json.load(f)
-                book_keywords = [item["keyword"] for item in book_data if item.get("keyword")]
-                # 감정 관련 키워드만 필터링
-                emotion_keywords = [kw for kw in book_keywords 
-                                  if any(emotion in kw for emotion in emotion_related_words)]
-                keywords.extend(emotion_keywords)
-        
-        # 중복 제거 및 필터링
-        unique_keywords = []
-        meaningless_words = {
-            "분석", "실패", "없음", "기타", "일반", "보통", "평범",
-            "그냥", "그런", "이런", "저런", "있다", "없다", "하다", "되다", "되고", "있고"
-        }
-        
-        for keyword in keywords:
-            if (len(keyword) >= 2 and 
-                keyword not in meaningless_words and
-                not keyword.isdigit() and
-                keyword not in unique_keywords):
-                unique_keywords.append(keyword)
-        
-        return unique_keywords[:30]  # 감정 키워드만이므로 30개로 줄임
-        
-    except Exception as e:
-        print(f"이전 단계 키워드 로드 실패: {e}")
-        return []
+    classifier = get_keyword_classifier()
+    total = correct = labeled = 0
+    elapsed = 0.0
+    
+    def flush(records, out):
+        nonlocal total, correct, labeled, elapsed
+        keyword_lists = [_batch_record_keywords(record, classifier) for record in records]
+        start_time = time.time()
+        predictions = classifier.predict_batch(keyword_lists, batch_size=batch_size)
+        elapsed += time.time() - start_time
+        for record, prediction in zip(records, predictions):
+            label = record.get("label") if isinstance(record, dict) else None
+            if label:
+                labeled += 1
+                correct += int(prediction.get("personality_type") == label)
+            out.write(json.dumps({"input": record, "prediction": prediction}, ensure_ascii=False) + "\n")
+        total += len(records)
+    
+    with open(output_path, 'w', encoding='utf-8') as out:
+        chunk = []
+        for record in _iter_batch_records(input_path):
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                flush(chunk, out)
+                chunk = []
+        if chunk:
+            flush(chunk, out)
+    
+    return {
+        "sequences": total,
+        "seconds": elapsed,
+        "sequences_per_second": total / elapsed if elapsed > 0 else 0.0,
+        "accuracy": correct / labeled if labeled else None
+    }
 
 if __name__ == "__main__":
     import argparse
@@ -535,10 +594,19 @@ if __name__ == "__main__":
     parser.add_argument('--keywords', nargs='+', help='분석할 감정 키워드들')
     parser.add_argument('--text', type=str, help='분석할 텍스트')
     parser.add_argument('--image', type=str, help='이미지 기반명 (예: test5)')
+    parser.add_argument('--batch-input', type=str, help='배치 예측 입력 (JSONL 또는 JSON 배열 파일)')
+    parser.add_argument('--batch-output', type=str, default='predictions.jsonl', help='배치 예측 결과 JSONL 경로')
+    parser.add_argument('--batch-size', type=int, default=32, help='배치 크기 (기본값: 32)')
     
     args = parser.parse_args()
     
-    if args.image:
+    if args.batch_input:
+        stats = run_batch_prediction(args.batch_input, args.batch_output, batch_size=args.batch_size)
+        print(f"배치 예측 완료: {stats['sequences']}개 -> {args.batch_output}")
+        print(f"소요시간: {stats['seconds']:.2f}초, 처리 속도: {stats['sequences_per_second']:.1f} sequences/sec")
+        if stats['accuracy'] is not None:
+            print(f"정확도 (label 기준): {stats['accuracy']:.3f}")
+    elif args.image:
         result = run_keyword_prediction_from_result(args.image, quiet=False)
     elif args.keywords:
         result = predict_personality_from_keywords(args.keywords)
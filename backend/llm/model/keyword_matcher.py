@@ -0,0 +1,353 @@
+import os
+import re
+import sys
+import json
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+sys.path.append(os.path.dirname(__file__))
+
+# 감정 키워드 사전 (HTP 심리분석 기반 확장) - 카테고리 -> 키워드 목록
+EMOTION_KEYWORDS = {
+    "불안": ["불안", "걱정", "초조", "긴장", "불안감", "사회불안", "정서불안", "심리불안"],
+    "우울": ["우울", "슬픔", "절망", "무기력", "침울", "우울감", "내적우울감"],
+    "애정": ["애정", "사랑", "애정결핍", "관심", "애착", "애정욕구", "관심욕구"],
+    "분노": ["분노", "화", "짜증", "격분", "성난", "적대감", "공격성"],
+    "두려움": ["두려움", "공포", "무서움", "겁", "공포감", "경계심"],
+    "외로움": ["외로움", "고독", "소외", "쓸쓸", "고립감", "단절감"],
+    "스트레스": ["스트레스", "압박", "부담", "긴장감", "압박감"],
+    "욕구": ["인정욕구", "관심욕구", "애정욕구", "승인욕구", "인정받고자", "관심받고자"],
+    "결핍": ["애정결핍", "관심결핍", "인정결핍", "사랑결핍", "정서적결핍"],
+    "위축": ["위축", "소극적", "내향적", "수동적", "소심함", "자신감부족"],
+    "경계": ["경계심", "경계", "방어적", "거리감", "신뢰부족", "의심"],
+    "자존감": ["자존감", "자신감", "자기가치", "자아개념", "자기인식"],
+    "충동": ["충동성", "조급함", "성급함", "즉흥적", "참을성부족"],
+    "완벽": ["완벽주의", "까다로움", "세밀함", "꼼꼼함", "강박적"],
+    "소통": ["소통부족", "표현부족", "의사소통", "감정표현", "대인관계"]
+}
+
+# GPT 분석 결과의 "주요 감정 키워드" 섹션
+KEYWORD_SECTION_PATTERN = re.compile(
+    r'(?:주요\s*감정\s*키워드|감정\s*키워드)[\s\S]*?(?=\n\n|\n\d+\.|$)', re.IGNORECASE
+)
+
+# 섹션 내 한 줄에서 키워드를 뽑는 패턴
+SECTION_LINE_PATTERNS = [
+    re.compile(r'[-•]\s*([^\n]+)', re.MULTILINE),       # - 키워드 또는 • 키워드
+    re.compile(r'^\s*\d+\.\s*([^\n]+)', re.MULTILINE),  # 숫자. 키워드
+    re.compile(r'^\s*[가-힣]+욕구', re.MULTILINE),       # ~욕구 패턴
+    re.compile(r'^\s*[가-힣]+불안', re.MULTILINE),       # ~불안 패턴
+    re.compile(r'^\s*[가-힣]+결핍', re.MULTILINE),       # ~결핍 패턴
+]
+
+# 전체 텍스트에서 직접 찾는 패턴 (애정 결핍, 사회 불안, 인정 욕구 - 중간 공백 허용)
+DIRECT_PATTERNS = [
+    re.compile(r'(애정\s*결핍)'),
+    re.compile(r'(사회\s*불안)'),
+    re.compile(r'(인정\s*욕구)'),
+]
+
+# ~욕구/~불안/~결핍 직접 패턴은 접미사 위치만 찾은 뒤 그 접미사가 속한 한글 어절 안에서 처리
+# (어절마다 '[가-힣]+욕구'는 어절 시작부터 마지막 접미사까지 최대 1건만 매칭되므로 결과 동일)
+HANGUL_SUFFIXES = ("욕구", "불안", "결핍")
+SUFFIX_PATTERN = re.compile('|'.join(HANGUL_SUFFIXES))
+_HANGUL_RUN = re.compile(r'[가-힣]*')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class KeywordMatch(NamedTuple):
+    """사전 키워드 매칭 결과"""
+    keyword: str
+    categories: Tuple[str, ...]
+    start: int
+    end: int
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """키워드 목록을 트라이 형태의 단일 alternation 정규식으로 변환 (가장 긴 키워드 우선 매칭)"""
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        alternatives = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ''
+        body = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """단일 정규식 기반 다중 키워드 매칭
+
+    사전 전체를 트라이 형태의 정규식 하나로 컴파일해 두고 텍스트를 한 번 훑습니다.
+    정규식은 위치마다 가장 긴 키워드만 반환하므로, 그 안에 포함된 키워드(예: '사회불안' 안의 '불안')는
+    미리 계산한 목록으로 채우고, 매칭 끝을 넘어가는 키워드가 시작될 수 있는 위치만 다시 확인합니다.
+    """
+
+    def __init__(self, keyword_categories: Dict[str, Iterable[str]]):
+        categories: Dict[str, List[str]] = {}
+        for category, keywords in keyword_categories.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword and category not in categories.setdefault(keyword, []):
+                    categories[keyword].append(category)
+        self.categories: Dict[str, Tuple[str, ...]] = {kw: tuple(cats) for kw, cats in categories.items()}
+        keywords = self.categories
+        prefixes = {
+            keyword: [keyword[:i] for i in range(1, len(keyword) + 1) if keyword[:i] in keywords]
+            for keyword in keywords
+        }
+        # 가장 긴 키워드별로 그 안에 포함된 모든 키워드 (시작 오프셋, 키워드)
+        self._contained = {
+            keyword: [(offset, inner) for offset in range(len(keyword))
+                      for inner in prefixes.get(self._longest_at(keyword, offset, keywords), [])]
+            for keyword in keywords
+        }
+        # 키워드 끝을 넘어 더 긴 키워드가 시작될 수 있는 오프셋
+        self._boundary_offsets = {
+            keyword: [offset for offset in range(1, len(keyword))
+                      if any(other.startswith(keyword[offset:]) and len(other) > len(keyword) - offset
+                             for other in keywords)]
+            for keyword in keywords
+        }
+        self._contained_sets = {keyword: {inner for _, inner in contained}
+                                for keyword, contained in self._contained.items()}
+        self._prefixes = prefixes
+        self.pattern = re.compile(_trie_pattern(keywords))
+
+    @staticmethod
+    def _longest_at(text: str, offset: int, keywords) -> str:
+        """text[offset:]에서 시작하여 text 안에 들어가는 가장 긴 키워드 (없으면 빈 문자열)"""
+        for end in range(len(text), offset, -1):
+            if text[offset:end] in keywords:
+                return text[offset:end]
+        return ''
+
+    def find_keywords(self, text: str) -> Set[str]:
+        """텍스트에 등장하는 키워드 집합 (위치가 필요 없을 때 사용하는 빠른 경로)"""
+        found = set()
+        contained_sets, boundary_offsets = self._contained_sets, self._boundary_offsets
+        for match in self.pattern.finditer(text):
+            longest = match.group()
+            found |= contained_sets[longest]
+            for offset in boundary_offsets[longest]:
+                crossing = self.pattern.match(text, match.start() + offset)
+                if crossing is not None:
+                    found.update(self._prefixes[crossing.group()])
+        return found
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """텍스트의 모든 키워드 위치 (겹치는 매칭 포함)"""
+        categories = self.categories
+        matches = []
+        for match in self.pattern.finditer(text):
+            longest, start = match.group(), match.start()
+            for offset, keyword in self._contained[longest]:
+                matches.append(KeywordMatch(keyword, categories[keyword], start + offset,
+                                            start + offset + len(keyword)))
+            for offset in self._boundary_offsets[longest]:
+                crossing = self.pattern.match(text, start + offset)
+                if crossing is None:
+                    continue
+                for keyword in self._prefixes[crossing.group()]:
+                    if len(keyword) > len(longest) - offset:
+                        matches.append(KeywordMatch(keyword, categories[keyword], start + offset,
+                                                    start + offset + len(keyword)))
+        return matches
+
+
+class KeywordExtractionEngine:
+    """분류기 초기화 시 한 번 만드는 감정 키워드 추출 엔진
+
+    사전 매칭과 GPT 키워드 섹션/직접 패턴 모두 초기화 시 컴파일한 정규식으로 처리합니다.
+    """
+
+    def __init__(self, emotion_keywords: Optional[Dict[str, List[str]]] = None):
+        self.emotion_keywords = emotion_keywords or EMOTION_KEYWORDS
+        self.matcher = KeywordMatcher(self.emotion_keywords)
+
+    def find_matches(self, text: str) -> List[KeywordMatch]:
+        """사전 키워드 매칭 결과 (소문자 텍스트 기준 위치, 카테고리 포함)"""
+        return self.matcher.find_all(text.lower())
+
+    def parse_gpt_keywords_section(self, text: str) -> List[str]:
+        """GPT 분석 결과에서 '주요 감정 키워드' 섹션 및 ~욕구/~불안/~결핍 패턴 파싱"""
+        keywords = set()
+
+        match = KEYWORD_SECTION_PATTERN.search(text)
+        if match:
+            for line in match.group(0).split('\n'):
+                line = line.strip()
+                if not line:
+                    continue
+                for pattern in SECTION_LINE_PATTERNS:
+                    for found in pattern.findall(line):
+                        keyword = found.strip().replace('*', '')
+                        if keyword and len(keyword) > 1:
+                            keywords.add(keyword)
+
+        word_starts = set()
+        for match in SUFFIX_PATTERN.finditer(text):
+            start = match.start()
+            while start > 0 and '가' <= text[start - 1] <= '힣':
+                start -= 1
+            if start in word_starts:
+                continue
+            word_starts.add(start)
+            word = text[start:_HANGUL_RUN.match(text, match.end()).end()]
+            for suffix in HANGUL_SUFFIXES:
+                index = word.rfind(suffix, 1)
+                if index >= 1:
+                    keywords.add(word[:index + len(suffix)])
+
+        for pattern in DIRECT_PATTERNS:
+            for found in pattern.findall(text):
+                clean_keyword = _WHITESPACE.sub('', found)
+                if clean_keyword:
+                    keywords.add(clean_keyword)
+
+        return list(keywords)
+
+    def extract(self, text: str) -> Tuple[List[str], List[str]]:
+        """감정 키워드 추출
+
+        Returns:
+            tuple: (GPT 섹션/패턴 키워드, 전체 키워드 - 중복 제거)
+        """
+        gpt_keywords = self.parse_gpt_keywords_section(text)
+        extracted = set(gpt_keywords)
+        extracted |= self.matcher.find_keywords(text.lower())
+        return gpt_keywords, list(extracted)
+
+
+def legacy_extract_keywords(text: str, emotion_keywords: Dict[str, List[str]]) -> List[str]:
+    """기존 방식(줄마다 정규식 컴파일 + 사전 이중 루프) 추출 - 벤치마크 비교용"""
+    keywords = []
+    match = re.search(r'(?:주요\s*감정\s*키워드|감정\s*키워드)[\s\S]*?(?=\n\n|\n\d+\.|$)', text, re.IGNORECASE)
+    if match:
+        for line in match.group(0).split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            for pattern in [r'[-•]\s*([^\n]+)', r'^\s*\d+\.\s*([^\n]+)', r'^\s*[가-힣]+욕구',
+                            r'^\s*[가-힣]+불안', r'^\s*[가-힣]+결핍']:
+                for found in re.findall(pattern, line, re.MULTILINE):
+                    keyword = found.strip().replace('*', '').replace('**', '')
+                    if keyword and len(keyword) > 1:
+                        keywords.append(keyword)
+    for pattern in [r'([가-힣]+욕구)', r'([가-힣]+불안)', r'([가-힣]+결핍)',
+                    r'(애정\s*결핍)', r'(사회\s*불안)', r'(인정\s*욕구)']:
+        for found in re.findall(pattern, text):
+            clean_keyword = re.sub(r'\s+', '', found)
+            if clean_keyword:
+                keywords.append(clean_keyword)
+
+    extracted = list(set(keywords))
+    text_lower = text.lower()
+    for category_keywords in emotion_keywords.values():
+        for keyword in category_keywords:
+            if keyword in text_lower:
+                extracted.append(keyword)
+    return list(set(extracted))
+
+
+def load_analysis_corpus(path: str) -> List[str]:
+    """저장된 GPT 분석 텍스트 로드
+
+    Args:
+        path: result_*.json 파일들이 있는 디렉토리, 단일 JSON 파일 또는 JSONL 파일
+              (각 항목의 raw_text / analysis_text / text 필드 사용)
+    """
+    def text_of(item):
+        if isinstance(item, str):
+            return item
+        if isinstance(item, dict):
+            return item.get('raw_text') or item.get('analysis_text') or item.get('text')
+        return None
+
+    texts = []
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.json'):
+                with open(os.path.join(path, name), 'r', encoding='utf-8') as f:
+                    texts.append(text_of(json.load(f)))
+    elif path.endswith('.jsonl'):
+        with open(path, 'r', encoding='utf-8') as f:
+            texts.extend(text_of(json.loads(line)) for line in f if line.strip())
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        texts.extend(text_of(item) for item in (data if isinstance(data, list) else [data]))
+    return [text for text in texts if text]
+
+
+def benchmark(texts: List[str], repeat: int = 20) -> Dict[str, float]:
+    """기존 방식과 엔진의 추출 속도 비교 (결과 일치 여부 포함)"""
+    engine = KeywordExtractionEngine()
+
+    mismatches = sum(
+        1 for text in texts
+        if set(legacy_extract_keywords(text, EMOTION_KEYWORDS)) != set(engine.extract(text)[1])
+    )
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            legacy_extract_keywords(text, EMOTION_KEYWORDS)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            engine.extract(text)
+    engine_seconds = time.perf_counter() - start
+
+    calls = max(1, repeat * len(texts))
+    return {
+        "texts": len(texts),
+        "repeat": repeat,
+        "legacy_us_per_text": legacy_seconds / calls * 1e6,
+        "engine_us_per_text": engine_seconds / calls * 1e6,
+        "speedup": legacy_seconds / engine_seconds if engine_seconds > 0 else 0.0,
+        "mismatches": mismatches
+    }
+
+
+def main():
+    """키워드 추출 마이크로 벤치마크 CLI"""
+    import argparse
+
+    default_corpus = os.path.join(os.path.dirname(__file__), '../detection_results/results')
+    parser = argparse.ArgumentParser(description="감정 키워드 추출 엔진 벤치마크")
+    parser.add_argument('--corpus', type=str, default=default_corpus,
+                        help='GPT 분석 텍스트 코퍼스 (result_*.json 디렉토리, JSON 또는 JSONL 파일)')
+    parser.add_argument('--repeat', type=int, default=20, help='코퍼스 반복 횟수 (기본값: 20)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.corpus):
+        print(f"코퍼스를 찾을 수 없습니다: {args.corpus}")
+        return
+    texts = load_analysis_corpus(args.corpus)
+    if not texts:
+        print(f"분석 텍스트가 없습니다: {args.corpus}")
+        return
+
+    stats = benchmark(texts, args.repeat)
+    print("감정 키워드 추출 벤치마크")
+    print("=" * 50)
+    print(f"텍스트 수: {stats['texts']}개 x {stats['repeat']}회")
+    print(f"기존 방식: {stats['legacy_us_per_text']:.1f} µs/text")
+    print(f"추출 엔진: {stats['engine_us_per_text']:.1f} µs/text")
+    print(f"속도 향상: {stats['speedup']:.1f}배")
+    print(f"결과 불일치: {stats['mismatches']}건")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(__file__))
+
+load_dotenv()
+
+logger = logging.getLogger('llm_gateway')
+
+# 게이트웨이 설정 (환경변수)
+DEFAULT_MODEL = "gpt-4o"
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+REQUESTS_PER_MINUTE = int(os.getenv("LLM_RPM_LIMIT", "500"))
+TOKENS_PER_MINUTE = int(os.getenv("LLM_TPM_LIMIT", "30000"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """지수 백오프 + 지터 대기시간 계산 (동시에 실패한 요청들이 같은 시점에 재시도하지 않도록 분산)"""
+    return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """요청 토큰 수 대략 추정 (1토큰 ≈ 4글자, 이미지는 고정값으로 계산)"""
+    total = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            total += len(content) // 4
+        elif isinstance(content, list):
+            for part in content:
+                if part.get("type") == "text":
+                    total += len(part.get("text", "")) // 4
+                elif part.get("type") == "image_url":
+                    total += 765  # gpt-4o 1024px 이미지 기준 토큰 수
+    return total + 4 * len(messages)
+
+
+class TokenBucket:
+    """분당 허용량 기반 토큰 버킷 (게이트웨이 이벤트 루프 안에서만 사용)"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float) -> float:
+        """amount만큼 확보될 때까지 대기 후 차감
+
+        Returns:
+            float: 대기한 시간 (초)
+        """
+        if self.capacity <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                wait = (amount - self.tokens) / self.rate
+                await asyncio.sleep(wait)
+                waited += wait
+
+    def adjust(self, delta: float):
+        """예상치와 실제 사용량 차이 보정 (음수면 반환)"""
+        if self.capacity <= 0:
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+@dataclass
+class LLMResponse:
+    """게이트웨이 호출 결과"""
+    content: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+    attempts: int = 1
+    finish_reason: Optional[str] = None
+
+
+@dataclass
+class CallerMetrics:
+    """호출자별 사용 지표"""
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_latency: float = 0.0
+    throttle_wait: float = 0.0
+    last_error: Optional[str] = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "avg_latency": round(self.total_latency / self.calls, 3) if self.calls else None,
+            "throttle_wait": round(self.throttle_wait, 3),
+            "last_error": self.last_error
+        }
+
+
+class LLMGateway:
+    """OpenAI 호출 공용 게이트웨이
+
+    전용 이벤트 루프 스레드에서 AsyncOpenAI 클라이언트를 사용하며, 파이프라인(동기)과
+    채팅 서비스(비동기) 모두 같은 동시 실행 제한, 분당 요청/토큰 제한, 재시도 정책을 공유합니다.
+    base_url(OPENAI_BASE_URL)을 지정하면 로컬 가짜 OpenAI 서버로 테스트할 수 있습니다.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 max_concurrency: int = MAX_CONCURRENCY, requests_per_minute: int = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = TOKENS_PER_MINUTE, max_retries: int = MAX_RETRIES,
+                 timeout: float = REQUEST_TIMEOUT):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        self._metrics: Dict[str, CallerMetrics] = {}
+        self._metrics_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """게이트웨이 전용 이벤트 루프 스레드 시작 (최초 호출 시 1회)"""
+        if self._loop is not None:
+            return self._loop
+        with self._start_lock:
+            if self._loop is None:
+                ready = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run_loop, args=(ready,), name="llm-gateway-loop", daemon=True
+                )
+                self._thread.start()
+                ready.wait()
+        return self._loop
+
+    def _run_loop(self, ready: threading.Event):
+        from openai import AsyncOpenAI
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        # 재시도는 게이트웨이에서 직접 처리하므로 SDK 재시도는 끔
+        self._client = AsyncOpenAI(
+            api_key=self.api_key, base_url=self.base_url, max_retries=0, timeout=self.timeout
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._request_bucket = TokenBucket(self.requests_per_minute)
+        self._token_bucket = TokenBucket(self.tokens_per_minute)
+        self._loop = loop
+        ready.set()
+        loop.run_forever()
+
+    def _caller_metrics(self, caller: str) -> CallerMetrics:
+        metrics = self._metrics.get(caller)
+        if metrics is None:
+            with self._metrics_lock:
+                metrics = self._metrics.setdefault(caller, CallerMetrics())
+        return metrics
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        import openai
+
+        if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+            return True
+        status_code = getattr(error, "status_code", None)
+        return status_code is not None and status_code >= 500
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            value = headers.get("retry-after")
+            return float(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    async def _chat(self, messages: List[Dict[str, Any]], caller: str, model: str,
+                    max_tokens: Optional[int], **kwargs) -> LLMResponse:
+        metrics = self._caller_metrics(caller)
+        estimated = estimate_tokens(messages) + (max_tokens or 0)
+        start = time.perf_counter()
+        attempt = 0
+
+        while True:
+            waited = await self._request_bucket.acquire(1)
+            waited += await self._token_bucket.acquire(estimated)
+            try:
+                async with self._semaphore:
+                    response = await self._client.chat.completions.create(
+                        model=model, messages=messages, max_tokens=max_tokens, **kwargs
+                    )
+            except Exception as e:
+                with metrics.lock:
+                    metrics.throttle_wait += waited
+                    metrics.last_error = f"{type(e).__name__}: {e}"
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    with metrics.lock:
+                        metrics.calls += 1
+                        metrics.errors += 1
+                        metrics.total_latency += time.perf_counter() - start
+                    raise
+                delay = self._retry_after(e) or backoff_delay(attempt)
+                logger.warning(f"[{caller}] LLM 호출 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries}): {e}")
+                with metrics.lock:
+                    metrics.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            usage = getattr(response, "usage", None)
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+            if usage is not None:
+                # 예상 토큰 수와 실제 사용량 차이를 버킷에 반영
+                self._token_bucket.adjust(prompt_tokens + completion_tokens - estimated)
+
+            latency = time.perf_counter() - start
+            with metrics.lock:
+                metrics.calls += 1
+                metrics.prompt_tokens += prompt_tokens
+                metrics.completion_tokens += completion_tokens
+                metrics.total_latency += latency
+                metrics.throttle_wait += waited
+
+            choice = response.choices[0]
+            return LLMResponse(
+                content=(choice.message.content or ""),
+                model=getattr(response, "model", model),
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                latency=latency,
+                attempts=attempt + 1,
+                finish_reason=getattr(choice, "finish_reason", None)
+            )
+
+    def chat(self, messages: List[Dict[str, Any]], caller: str = "default", model: str = DEFAULT_MODEL,
+             max_tokens: Optional[int] = None, timeout: Optional[float] = None, **kwargs) -> LLMResponse:
+        """동기 호출 (파이프라인 워커 등 일반 스레드에서 사용)"""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("게이트웨이 이벤트 루프 안에서는 achat()을 사용하세요.")
+        future = asyncio.run_coroutine_threadsafe(
+            self._chat(messages, caller, model, max_tokens, **kwargs), loop
+        )
+        return future.result(timeout)
+
+    async def achat(self, messages: List[Dict[str, Any]], caller: str = "default", model: str = DEFAULT_MODEL,
+                    max_tokens: Optional[int] = None, **kwargs) -> LLMResponse:
+        """비동기 호출 (FastAPI 이벤트 루프를 막지 않음)"""
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            self._chat(messages, caller, model, max_tokens, **kwargs), loop
+        )
+        return await asyncio.wrap_future(future)
+
+    def metrics(self) -> Dict[str, Any]:
+        """호출자별 지표와 게이트웨이 설정 반환"""
+        return {
+            "limits": {
+                "max_concurrency": self.max_concurrency,
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "max_retries": self.max_retries
+            },
+            "callers": {caller: m.to_dict() for caller, m in self._metrics.items()}
+        }
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """프로세스 전역 LLM 게이트웨이 반환 (싱글톤)"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
+
+
+def main():
+    """게이트웨이 부하 테스트 (로컬 가짜 OpenAI 서버 등에 동시 요청)"""
+    import argparse
+    from concurrent.futures import ThreadPoolExecutor
+
+    parser = argparse.ArgumentParser(description="LLM 게이트웨이 동시 호출 테스트")
+    parser.add_argument('--base-url', type=str, default=None, help='OpenAI 호환 서버 주소 (예: http://localhost:8080/v1)')
+    parser.add_argument('--requests', type=int, default=20, help='총 요청 수')
+    parser.add_argument('--threads', type=int, default=10, help='동시에 호출하는 스레드 수')
+    parser.add_argument('--prompt', type=str, default='안녕하세요', help='요청 프롬프트')
+    args = parser.parse_args()
+
+    gateway = LLMGateway(api_key=os.getenv("OPENAI_API_KEY") or "test-key", base_url=args.base_url)
+    messages = [{"role": "user", "content": args.prompt}]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        results = list(executor.map(
+            lambda _: gateway.chat(messages, caller="benchmark", max_tokens=50), range(args.requests)
+        ))
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {len(results)}건 완료: {elapsed:.2f}초 ({len(results) / elapsed:.1f} req/s)")
+    print(gateway.metrics())
+
+
+if __name__ == "__main__":
+    main()
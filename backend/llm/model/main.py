@@ -1,18 +1,25 @@
 import os
 import sys
 import json
+import time
 import logging
+import threading
 import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Tuple, Any
-from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple, Any
+from dataclasses import dataclass, field
 from enum import Enum
+from collections import OrderedDict
 
 # 내부 모듈 임포트
-from crop_by_labels import crop_objects_by_labels
+from crop_by_labels import crop_objects_by_labels, load_yolo_model
 from analyze_images_with_gpt import analyze_image_gpt
-from keyword_classifier import run_keyword_prediction_from_result
+from keyword_classifier import run_keyword_prediction_from_result, get_keyword_classifier
+from model_registry import get_model_registry
+from rag_client import get_rag_models, get_rag_client_provider
+from result_cache import get_result_cache, compute_image_key, compute_image_key_from_image
+from image_artifact import ImageArtifact
 
 # 경로 설정
 sys.path.append(os.path.dirname(__file__))
@@ -70,7 +77,7 @@ class PipelineResult:
     classification_success: bool = False
     
     # 결과 데이터
-    detected_objects: Optional[Dict] = None
+    detected_objects: Optional[Dict] = None  # 탐지 요약 (결과 이미지 경로, 라벨별 개수, 객체 목록)
     psychological_analysis: Optional[Dict] = None
     personality_type: Optional[str] = None
     confidence_score: Optional[float] = None
@@ -80,6 +87,15 @@ class PipelineResult:
     error_message: Optional[str] = None
     error_stage: Optional[str] = None
     traceback: Optional[str] = None
+    
+    # 결과 캐시에서 가져온 결과인지 여부
+    cache_hit: bool = False
+    
+    # 단계 간에 전달되는 메모리 이미지 (입력 이미지, 탐지 결과 이미지) - 저장/캐시 대상 아님
+    image_artifact: Optional[Any] = field(default=None, repr=False)
+    detection_artifact: Optional[Any] = field(default=None, repr=False)
+    # 탐지 결과 배열과 크롭 view (DetectionRecord) - 저장/캐시 대상 아님
+    detection_record: Optional[Any] = field(default=None, repr=False)
 
 
 class HTPAnalysisPipeline:
@@ -94,6 +110,77 @@ class HTPAnalysisPipeline:
         self.config = config or self._create_default_config()
         self.logger = self._setup_logging()
         self._validate_environment()
+        self.models = get_model_registry()
+        # 이미지별 진행 상태 (get_analysis_status에서 파일 확인 없이 조회)
+        self._progress: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._progress_lock = threading.Lock()
+    
+    def get_yolo_model(self):
+        """YOLO 모델 반환 (레지스트리에서 최초 1회 로드 후 재사용)"""
+        return load_yolo_model(str(self.config.model_dir / self.config.yolo_model_path))
+    
+    def get_keyword_classifier(self):
+        """키워드 분류기 반환 (레지스트리에서 최초 1회 로드 후 재사용)"""
+        return get_keyword_classifier()
+    
+    def warm_up(self, on_component: Optional[Callable[[str, Dict[str, Any]], None]] = None
+                ) -> Dict[str, Dict[str, Any]]:
+        """첫 요청 전에 모델을 미리 로드 (콜드 스타트 비용을 시작 단계에서 처리)
+        
+        Args:
+            on_component: 구성 요소 상태가 바뀔 때마다 (이름, 상태) 로 호출되는 함수
+            
+        Returns:
+            Dict: 구성 요소별 상태 {"status": ready/failed, "seconds": 로드 시간, "error": 오류 메시지}
+        """
+        steps = [
+            ("yolo_model", self.get_yolo_model),
+            # 분류기 로드 + 한 번 예측해서 토크나이저/이전 단계 키워드까지 미리 준비
+            ("keyword_classifier", lambda: self.get_keyword_classifier().predict_from_keywords(["불안", "애정결핍"])),
+            ("rag_models", get_rag_models),
+            ("opensearch", self._connect_rag),
+        ]
+        statuses = {}
+        for name, load in steps:
+            if on_component:
+                on_component(name, {"status": "loading"})
+            start = time.time()
+            try:
+                load()
+                status = {"status": "ready", "seconds": round(time.time() - start, 2), "error": None}
+                self.logger.info(f"워밍업 완료: {name} ({status['seconds']}초)")
+            except Exception as e:
+                status = {"status": "failed", "seconds": round(time.time() - start, 2), "error": str(e)}
+                self.logger.error(f"워밍업 실패: {name} - {e}")
+            statuses[name] = status
+            if on_component:
+                on_component(name, status)
+        return statuses
+    
+    @staticmethod
+    def _connect_rag() -> None:
+        """OpenSearch RAG 연결 확인 (연결할 수 없으면 차단기가 열리고 분석은 RAG 없이 진행)"""
+        if get_rag_client_provider().get() is None:
+            raise ConnectionError(f"OpenSearch RAG 사용 불가: {get_rag_client_provider().status()['last_error']}")
+    
+    def get_model_status(self) -> Dict[str, Dict[str, Any]]:
+        """레지스트리에 등록된 모델별 로드 상태, 로드 시간, 메모리 사용량 조회"""
+        return self.models.stats()
+    
+    def reload_models(self, names: Optional[list] = None) -> Dict[str, Dict[str, Any]]:
+        """모델 명시적 재로딩
+        
+        Args:
+            names: 재로딩할 모델 이름 목록. None이면 이미 로드된 모델 전체
+            
+        Returns:
+            Dict: 재로딩 후 모델 상태
+        """
+        targets = names or [name for name, info in self.models.stats().items() if info["loaded"]]
+        for name in targets:
+            self.logger.info(f"모델 재로딩: {name}")
+            self.models.reload(name)
+        return self.get_model_status()
     
     def _create_default_config(self) -> PipelineConfig:
         """기본 설정 생성"""
@@ -203,23 +290,36 @@ class HTPAnalysisPipeline:
         try:
             self.logger.info("[1/3] YOLO 객체 탐지 및 크롭핑 시작...")
             
-            # 객체 탐지 실행
-            detection_result = crop_objects_by_labels(str(image_path))
+            # 입력 이미지는 한 번만 디코딩하여 YOLO 입력 배열로 사용
+            if result.image_artifact is None:
+                result.image_artifact = ImageArtifact.from_path(str(image_path), result.image_base)
+            
+            # 객체 탐지 실행 (레지스트리에 캐시된 YOLO 모델 사용, 결과 이미지는 메모리로 받음)
+            detection_result = crop_objects_by_labels(
+                str(image_path), model=self.get_yolo_model(),
+                image=result.image_artifact.bgr_array(), save_result=False
+            )
+            
+            if not detection_result:
+                self.logger.error("객체 탐지 결과 이미지가 생성되지 않았습니다.")
+                return False
             
-            # 결과 이미지 파일 확인
             detection_image_path = (
                 self.config.detection_results_dir / "images" / 
                 f"detection_result_{result.image_base}.jpg"
             )
+            result.detection_artifact = ImageArtifact.from_bgr_array(
+                detection_result["annotated_image"], f"detection_result_{result.image_base}"
+            )
+            # 결과 이미지 파일은 분석 경로를 막지 않도록 백그라운드로 저장
+            result.detection_artifact.save(str(detection_image_path), quality=95, background=True)
             
-            if detection_image_path.exists():
-                result.detection_success = True
-                result.detected_objects = {"detection_image": str(detection_image_path)}
-                self.logger.info(f"객체 탐지 완료: {detection_image_path}")
-                return True
-            else:
-                self.logger.error("객체 탐지 결과 이미지가 생성되지 않았습니다.")
-                return False
+            record = detection_result["record"]
+            result.detection_record = record
+            result.detection_success = True
+            result.detected_objects = {"detection_image": str(detection_image_path), **record.to_summary()}
+            self.logger.info(f"객체 탐지 완료: {detection_image_path} - {record.label_counts}")
+            return True
                 
         except Exception as e:
             self.logger.error(f"객체 탐지 단계 오류: {str(e)}")
@@ -245,7 +345,11 @@ class HTPAnalysisPipeline:
                     self.logger.info(f"[{attempt + 1}/{max_retries}] GPT-4 Vision 심리 분석 재시도... (시도 {attempt + 1}/{max_retries})")
                 
                 # GPT 분석 실행 (함수 내부에서 자체 재시도 포함)
-                analysis_result = analyze_image_gpt(result.image_base)
+                analysis_result = analyze_image_gpt(
+                    result.image_base,
+                    image_artifact=result.detection_artifact,
+                    detection_record=result.detection_record
+                )
                 
                 # 분석 결과 직접 처리 (파일 확인 불필요)
                 if analysis_result:
@@ -276,7 +380,6 @@ class HTPAnalysisPipeline:
                     result.error_message = str(e)
                     return False
                 # 재시도 전 잠시 대기
-                import time
                 time.sleep(1)
                 
         return False
@@ -393,16 +496,73 @@ class HTPAnalysisPipeline:
     
 
     
-    def analyze_image(self, image_input: str) -> PipelineResult:
+    # 진행 이벤트에 사용하는 단계 정보 (번호, 이름) - error_stage 값과 동일한 이름 사용
+    STAGES = {1: "detection", 2: "analysis", 3: "classification"}
+    
+    def _emit_progress(self, progress_callback: Optional[Callable[[Dict[str, Any]], None]],
+                       event_type: str, stage: Optional[int] = None, **extra) -> None:
+        """진행 이벤트 전달 (콜백 오류는 분석에 영향을 주지 않도록 무시)"""
+        if progress_callback is None:
+            return
+        event = {"type": event_type, "timestamp": time.time()}
+        if stage is not None:
+            event["stage"] = stage
+            event["stage_name"] = self.STAGES[stage]
+        event.update(extra)
+        try:
+            progress_callback(event)
+        except Exception as e:
+            self.logger.warning(f"진행 이벤트 전달 실패 ({event_type}): {e}")
+    
+    def _run_stage(self, image_base: str, stage: int, stage_func: Callable[[], bool],
+                   progress_callback: Optional[Callable[[Dict[str, Any]], None]]) -> bool:
+        """단계 실행 + 진행 상태 갱신 및 시작/종료 이벤트 발행"""
+        self._emit_progress(progress_callback, "stage_start", stage)
+        stage_start = time.time()
+        success = stage_func()
+        stage_time = time.time() - stage_start
+        if success:
+            self._update_progress(image_base, **{f"{self.STAGES[stage]}_completed": True})
+        self._emit_progress(progress_callback, "stage_end", stage, success=success, elapsed=round(stage_time, 3))
+        return success
+    
+    # 메모리에 보관하는 이미지별 진행 상태 최대 개수
+    MAX_TRACKED_PROGRESS = 256
+    
+    @staticmethod
+    def _empty_progress(image_base: str) -> Dict[str, Any]:
+        return {
+            "image_base": image_base,
+            "detection_completed": False,
+            "analysis_completed": False,
+            "classification_completed": False,
+            "final_result": None
+        }
+    
+    def _update_progress(self, image_base: str, **fields) -> None:
+        with self._progress_lock:
+            status = self._progress.get(image_base)
+            if status is None:
+                status = self._empty_progress(image_base)
+                self._progress[image_base] = status
+            status.update(fields)
+            self._progress.move_to_end(image_base)
+            while len(self._progress) > self.MAX_TRACKED_PROGRESS:
+                self._progress.popitem(last=False)
+    
+    def analyze_image(self, image_input: str,
+                      progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                      image_artifact: Optional[ImageArtifact] = None) -> PipelineResult:
         """이미지 분석 전체 파이프라인 실행
         
         Args:
             image_input: 이미지 파일명 또는 경로
+            progress_callback: 단계 시작/종료 시 이벤트 dict를 받는 콜백 (선택)
+            image_artifact: 업로드 단계에서 이미 디코딩한 이미지 (있으면 파일을 다시 읽지 않음)
             
         Returns:
             PipelineResult: 분석 결과
         """
-        import time
         start_time = time.time()
         
         # 이미지 파일명 정규화
@@ -414,7 +574,8 @@ class HTPAnalysisPipeline:
         result = PipelineResult(
             status=PipelineStatus.RUNNING,
             image_base=image_base,
-            timestamp=datetime.now()
+            timestamp=datetime.now(),
+            image_artifact=image_artifact
         )
         
         self.logger.info(f"🚀 [TIMING] 이미지 분석 시작: {image_base} - 시작시간: {datetime.now().strftime('%H:%M:%S')} ({start_time:.3f}초)")
@@ -423,53 +584,35 @@ class HTPAnalysisPipeline:
             # 이미지 파일 경로 구성
             image_path = self.config.test_img_dir / f"{image_base}.jpg"
             
-            # 이미지 파일 검증
-            if not self._validate_image_file(image_path):
+            # 이미지 파일 검증 (메모리 이미지가 전달된 경우 생략)
+            if image_artifact is None and not self._validate_image_file(image_path):
                 result.status = PipelineStatus.FAILED
                 result.error_message = "유효하지 않은 이미지 파일"
                 return result
             
             # 1단계: 객체 탐지
             stage_start = time.time()
-            if not self._execute_stage_1(image_path, result):
+            if not self._run_stage(image_base, 1, lambda: self._execute_stage_1(image_path, result), progress_callback):
                 result.status = PipelineStatus.ERROR
                 return result
-            stage_end = time.time()
-            stage_time = stage_end - stage_start
-            self.logger.info(f"✅ [TIMING] 1단계 (객체탐지) 완료: {stage_time:.2f}초")
-            
-            # UI 표시를 위한 최소 대기 시간 (1단계가 너무 빨리 끝났을 때)
-            min_display_time = 2.0  # 최소 2초 표시
-            if stage_time < min_display_time:
-                wait_time = min_display_time - stage_time
-                self.logger.info(f"⏱️ 1단계 UI 표시 대기: {wait_time:.1f}초")
-                time.sleep(wait_time)
+            self.logger.info(f"✅ [TIMING] 1단계 (객체탐지) 완료: {time.time() - stage_start:.2f}초")
             
             # 2단계: 심리 분석 (재시도 로직 포함)
             stage_start = time.time()
-            if not self._execute_stage_2(result, max_retries=5):
+            if not self._run_stage(image_base, 2, lambda: self._execute_stage_2(result, max_retries=5), progress_callback):
                 result.status = PipelineStatus.ERROR
                 return result
-            stage_end = time.time()
-            stage_time = stage_end - stage_start
-            self.logger.info(f"✅ [TIMING] 2단계 (심리분석) 완료: {stage_time:.2f}초")
-            
-            # UI 표시를 위한 최소 대기 시간 (2단계)
-            if stage_time < min_display_time:
-                wait_time = min_display_time - stage_time
-                self.logger.info(f"⏱️ 2단계 UI 표시 대기: {wait_time:.1f}초")
-                time.sleep(wait_time)
+            self.logger.info(f"✅ [TIMING] 2단계 (심리분석) 완료: {time.time() - stage_start:.2f}초")
             
             # 3단계: 성격 분류
             stage_start = time.time()
-            if not self._execute_stage_3(result):
+            if not self._run_stage(image_base, 3, lambda: self._execute_stage_3(result), progress_callback):
                 result.status = PipelineStatus.ERROR
                 return result
-            stage_end = time.time()
-            stage_time = stage_end - stage_start
-            self.logger.info(f"✅ [TIMING] 3단계 (성격분류) 완료: {stage_time:.2f}초")
+            self.logger.info(f"✅ [TIMING] 3단계 (성격분류) 완료: {time.time() - stage_start:.2f}초")
             
             # 모든 단계 성공
+            self._update_progress(image_base, final_result=result.psychological_analysis)
             end_time = time.time()
             total_time = end_time - start_time
             result.status = PipelineStatus.SUCCESS
@@ -491,62 +634,97 @@ class HTPAnalysisPipeline:
         
         return result
     
-    def get_analysis_status(self, image_base: str) -> Dict[str, Any]:
-        """분석 상태 조회
+    # 결과 캐시에 저장하는 PipelineResult 필드
+    CACHED_RESULT_FIELDS = (
+        'detection_success', 'analysis_success', 'classification_success',
+        'detected_objects', 'psychological_analysis', 'personality_type',
+        'confidence_score', 'keyword_analysis'
+    )
+    
+    # 업로드마다 달라지는 탐지 요약 필드 (다른 요청의 파일을 가리키므로 캐시에 저장/반환하지 않음)
+    UPLOAD_SPECIFIC_OBJECT_FIELDS = ('detection_image',)
+    
+    @classmethod
+    def _without_upload_paths(cls, detected_objects: Optional[Dict]) -> Optional[Dict]:
+        """탐지 요약에서 원본 업로드의 unique_id 기준 경로 제거"""
+        if not detected_objects:
+            return detected_objects
+        return {k: v for k, v in detected_objects.items() if k not in cls.UPLOAD_SPECIFIC_OBJECT_FIELDS}
+    
+    def lookup_cached_result(self, image_input: str,
+                             image_artifact: Optional[ImageArtifact] = None) -> Tuple[Optional[PipelineResult], Optional[str]]:
+        """결과 캐시 조회 (dHash + 정규화 이미지 SHA-256 기준)
         
         Args:
-            image_base: 이미지 기본명
+            image_input: 이미지 파일명 또는 경로
+            image_artifact: 이미 디코딩된 이미지 (있으면 파일을 다시 읽지 않음)
             
         Returns:
-            Dict: 분석 상태 정보
+            Tuple: (캐시된 결과 또는 None, 캐시 키 - store_cached_result에 그대로 전달)
         """
-        status = {
-            "image_base": image_base,
-            "detection_completed": False,
-            "analysis_completed": False,
-            "classification_completed": False,
-            "final_result": None
-        }
+        cache = get_result_cache()
+        if cache is None:
+            return None, None
+        
+        image_base = Path(image_input).stem or str(image_input)
+        image_path = self.config.test_img_dir / f"{image_base}.jpg"
+        try:
+            if image_artifact is not None:
+                cache_key = compute_image_key_from_image(image_artifact.image)
+            else:
+                cache_key = compute_image_key(str(image_path))
+            payload = cache.get(cache_key[0])
+        except Exception as e:
+            self.logger.warning(f"결과 캐시 조회 실패 (분석 계속 진행): {e}")
+            return None, None
+        
+        if payload is None:
+            return None, cache_key[0]
         
-        # 각 단계별 결과 파일 확인
-        detection_path = (
-            self.config.detection_results_dir / "images" / 
-            f"detection_result_{image_base}.jpg"
+        result = PipelineResult(
+            status=PipelineStatus.SUCCESS,
+            image_base=image_base,
+            timestamp=datetime.now(),
+            cache_hit=True,
+            **{name: payload.get(name) for name in self.CACHED_RESULT_FIELDS}
         )
-        analysis_path = (
-            self.config.detection_results_dir / "results" / 
-            f"result_{image_base}.json"
+        # 이전에 경로가 포함된 채로 저장된 항목도 다른 업로드의 탐지 이미지를 반환하지 않도록 제거
+        result.detected_objects = self._without_upload_paths(result.detected_objects)
+        self._update_progress(
+            image_base, detection_completed=True, analysis_completed=True,
+            classification_completed=True, final_result=result.psychological_analysis
         )
+        self.logger.info(f"♻️ 결과 캐시 적중: {image_base} -> {result.personality_type}")
+        return result, cache_key[0]
+    
+    def store_cached_result(self, result: PipelineResult, cache_key: Optional[str]) -> None:
+        """성공한 분석 결과를 결과 캐시에 저장"""
+        cache = get_result_cache()
+        if cache is None or cache_key is None or result.cache_hit:
+            return
+        if result.status != PipelineStatus.SUCCESS or not result.classification_success:
+            return
+        try:
+            payload = {name: getattr(result, name) for name in self.CACHED_RESULT_FIELDS}
+            payload['detected_objects'] = self._without_upload_paths(payload['detected_objects'])
+            cache.put(cache_key, payload)
+        except Exception as e:
+            self.logger.warning(f"결과 캐시 저장 실패: {e}")
+    
+    def get_analysis_status(self, image_base: str) -> Dict[str, Any]:
+        """분석 상태 조회 (analyze_image 실행 중 기록한 메모리 상태 사용)
         
-        # KoBERT 결과 파일 확인 (result.json의 personality_analysis 존재 여부)
-        kobert_completed = False
-        if analysis_path.exists():
-            try:
-                with open(analysis_path, 'r', encoding='utf-8') as f:
-                    result_data = json.load(f)
-                    kobert_completed = 'personality_analysis' in result_data
-            except:
-                kobert_completed = False
-        
-        status["detection_completed"] = detection_path.exists()
-        status["analysis_completed"] = analysis_path.exists()
-        status["classification_completed"] = kobert_completed
-        
-        self.logger.info(f"상태 확인 - 탐지: {status['detection_completed']}, 분석: {status['analysis_completed']}, 분류: {status['classification_completed']}")
-        self.logger.info(f"파일 경로 확인:")
-        self.logger.info(f"  탐지: {detection_path} (존재: {detection_path.exists()})")
-        self.logger.info(f"  분석: {analysis_path} (존재: {analysis_path.exists()})")
-        self.logger.info(f"  분류: KoBERT 결과가 analysis_path에 포함됨 (완료: {kobert_completed})")
-        
-        if analysis_path.exists():
-            try:
-                with open(analysis_path, 'r', encoding='utf-8') as f:
-                    analysis_data = json.load(f)
-                status["final_result"] = analysis_data
-            except Exception as e:
-                self.logger.error(f"분석 결과 파일 읽기 오류: {e}")
-        
-        return status
+        Args:
+            image_base: 이미지 기본명
+            
+        Returns:
+            Dict: 분석 상태 정보
+        """
+        with self._progress_lock:
+            status = self._progress.get(image_base)
+            if status is not None:
+                return dict(status)
+        return self._empty_progress(image_base)
 
 
 def _display_detailed_keyword_results(image_base: str, pipeline: HTPAnalysisPipeline):
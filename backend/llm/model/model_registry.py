@@ -0,0 +1,204 @@
+import os
+import sys
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+sys.path.append(os.path.dirname(__file__))
+
+logger = logging.getLogger('model_registry')
+
+
+def _read_rss_bytes() -> Optional[int]:
+    """현재 프로세스의 RSS(상주 메모리) 크기 조회 (리눅스 /proc 기반)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        return None
+
+
+def estimate_model_bytes(model: Any) -> Optional[int]:
+    """torch 모듈의 파라미터/버퍼 크기를 합산하여 모델 메모리 사용량 추정
+
+    YOLO, SentenceTransformer, CrossEncoder, 분류기 래퍼처럼 내부에 torch 모듈을
+    들고 있는 객체는 흔히 쓰이는 속성(model, hf_model)을 한 단계 따라가서 계산합니다.
+    """
+    candidates = [model]
+    for attr in ('model', 'hf_model'):
+        inner = getattr(model, attr, None)
+        if inner is not None and inner is not model:
+            candidates.append(inner)
+
+    for candidate in candidates:
+        if hasattr(candidate, 'parameters') and hasattr(candidate, 'buffers'):
+            try:
+                total = sum(p.numel() * p.element_size() for p in candidate.parameters())
+                total += sum(b.numel() * b.element_size() for b in candidate.buffers())
+                return int(total)
+            except Exception:
+                continue
+    return None
+
+
+@dataclass
+class ModelEntry:
+    """레지스트리에 등록된 모델 정보"""
+    name: str
+    loader: Callable[[], Any]
+    instance: Any = None
+    loaded_at: Optional[datetime] = None
+    load_time: Optional[float] = None
+    memory_bytes: Optional[int] = None
+    rss_delta_bytes: Optional[int] = None
+    load_count: int = 0
+    last_error: Optional[str] = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def loaded(self) -> bool:
+        return self.instance is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "loaded": self.loaded,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "load_time": round(self.load_time, 3) if self.load_time is not None else None,
+            "memory_bytes": self.memory_bytes,
+            "rss_delta_bytes": self.rss_delta_bytes,
+            "load_count": self.load_count,
+            "last_error": self.last_error
+        }
+
+
+class ModelRegistry:
+    """프로세스 전역 모델 레지스트리
+
+    각 모델은 최초 요청 시 한 번만 로드되어 프로세스가 살아있는 동안 유지됩니다.
+    모델별 로드 시간과 메모리 사용량을 기록하며, reload()로 명시적 재로딩을 지원합니다.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, ModelEntry] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any], replace: bool = False) -> None:
+        """모델 로더 등록 (로딩은 get() 호출 시점까지 지연)
+
+        Args:
+            name: 모델 이름
+            loader: 인자 없이 호출되어 모델 객체를 반환하는 함수
+            replace: 이미 등록된 이름의 로더를 교체할지 여부
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                self._entries[name] = ModelEntry(name=name, loader=loader)
+            elif replace:
+                entry.loader = loader
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._entries
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.loaded
+
+    def get(self, name: str, loader: Optional[Callable[[], Any]] = None) -> Any:
+        """모델 인스턴스 반환 (필요 시 최초 1회 로드)
+
+        Args:
+            name: 모델 이름
+            loader: 미등록 모델인 경우 함께 등록할 로더
+
+        Returns:
+            로드된 모델 객체
+        """
+        if loader is not None:
+            self.register(name, loader)
+
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"등록되지 않은 모델입니다: {name}")
+
+        # 이미 로드된 경우 잠금 없이 바로 반환 (hot path)
+        if entry.instance is not None:
+            return entry.instance
+
+        with entry.lock:
+            if entry.instance is None:
+                self._load(entry)
+        return entry.instance
+
+    def reload(self, name: str) -> Any:
+        """모델을 강제로 다시 로드"""
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"등록되지 않은 모델입니다: {name}")
+
+        with entry.lock:
+            previous = entry.instance
+            entry.instance = None
+            try:
+                self._load(entry)
+            except Exception:
+                # 재로딩 실패 시 기존 모델을 유지하여 서비스 중단 방지
+                entry.instance = previous
+                raise
+        return entry.instance
+
+    def unload(self, name: str) -> None:
+        """모델 인스턴스 해제 (로더 등록은 유지)"""
+        entry = self._entries.get(name)
+        if entry is None:
+            return
+        with entry.lock:
+            entry.instance = None
+            entry.loaded_at = None
+
+    def _load(self, entry: ModelEntry) -> None:
+        logger.info(f"모델 로드 시작: {entry.name}")
+        rss_before = _read_rss_bytes()
+        start = time.perf_counter()
+        try:
+            instance = entry.loader()
+        except Exception as e:
+            entry.last_error = str(e)
+            logger.error(f"모델 로드 실패: {entry.name} - {e}")
+            raise
+        elapsed = time.perf_counter() - start
+        rss_after = _read_rss_bytes()
+
+        entry.instance = instance
+        entry.loaded_at = datetime.now()
+        entry.load_time = elapsed
+        entry.memory_bytes = estimate_model_bytes(instance)
+        entry.rss_delta_bytes = (
+            rss_after - rss_before if rss_before is not None and rss_after is not None else None
+        )
+        entry.load_count += 1
+        entry.last_error = None
+        logger.info(f"모델 로드 완료: {entry.name} ({elapsed:.2f}초)")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """모델별 로드 상태, 로드 시간, 메모리 사용량 반환"""
+        return {name: entry.to_dict() for name, entry in self._entries.items()}
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """프로세스 전역 모델 레지스트리 반환 (싱글톤)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
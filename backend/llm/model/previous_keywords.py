@@ -0,0 +1,226 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(__file__))
+
+logger = logging.getLogger('previous_keywords')
+
+# 전처리 결과 디렉토리 (채팅/도서 키워드 JSON)
+PREPROCESS_RESULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../preprocess/result")
+SOURCE_FILES = ("chat_data_keywords.json", "book_keywords.json")
+
+# 오프라인에서 미리 만든 이전 단계 키워드 산출물
+ARTIFACT_PATH = os.getenv(
+    "PREVIOUS_KEYWORDS_ARTIFACT",
+    os.path.join(PREPROCESS_RESULT_DIR, "previous_stage_keywords.json")
+)
+
+MAX_PREVIOUS_KEYWORDS = 30  # 감정 키워드만이므로 30개로 제한
+
+# 감정 관련 키워드 카테고리 정의
+EMOTION_RELATED_WORDS = {
+    # 감정 상태
+    "불안", "걱정", "초조", "긴장", "불안감", "사회불안", "정서불안", "심리불안",
+    "우울", "슬픔", "절망", "무기력", "침울", "우울감", "내적우울감",
+    "애정", "사랑", "애정결핍", "관심", "애착", "애정욕구", "관심욕구",
+    "분노", "화", "짜증", "격분", "성난", "적대감", "공격성",
+    "두려움", "공포", "무서움", "겁", "공포감", "경계심",
+    "외로움", "고독", "소외", "쓸쓸", "고립감", "단절감",
+    "스트레스", "압박", "부담", "긴장감", "압박감",
+    "위축", "소극적", "내향적", "수동적", "소심함", "자신감부족",
+    "행복", "기쁨", "즐거움", "만족", "편안", "안정", "평온",
+    # 감정 표현 동사
+    "느끼다", "감정", "마음", "기분", "상태", "심리", "정서",
+    # HTP 심리 관련
+    "애정결핍", "관심결핍", "인정결핍", "사랑결핍", "정서적결핍"
+}
+
+MEANINGLESS_WORDS = {
+    "분석", "실패", "없음", "기타", "일반", "보통", "평범",
+    "그냥", "그런", "이런", "저런", "있다", "없다", "하다", "되다", "되고", "있고"
+}
+
+# 감정 관련 단어를 하나라도 포함하는지 한 번에 검사하는 정규식
+_EMOTION_PATTERN = re.compile('|'.join(
+    re.escape(word) for word in sorted(EMOTION_RELATED_WORDS, key=len, reverse=True)
+))
+
+
+def _file_sha256(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _source_paths(source_dir: str) -> List[str]:
+    return [os.path.join(source_dir, name) for name in SOURCE_FILES]
+
+
+def _read_source_keywords(path: str, skip_failed: bool) -> List[str]:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [
+        item["keyword"] for item in data
+        if item.get("keyword") and not (skip_failed and item["keyword"] == "분석 실패")
+    ]
+
+
+def build_previous_keywords(source_dir: str = PREPROCESS_RESULT_DIR) -> Dict[str, Any]:
+    """채팅/도서 키워드 JSON에서 감정 관련 키워드를 골라 산출물 dict 생성
+
+    Returns:
+        dict: version(원본 파일 해시 기반), built_at, sources(파일별 sha256/키워드 수), keywords
+    """
+    keywords: List[str] = []
+    seen = set()
+    sources = {}
+
+    for path in _source_paths(source_dir):
+        if not os.path.exists(path):
+            continue
+        name = os.path.basename(path)
+        raw_keywords = _read_source_keywords(path, skip_failed=(name == "chat_data_keywords.json"))
+        sources[name] = {"sha256": _file_sha256(path), "count": len(raw_keywords)}
+
+        for keyword in raw_keywords:
+            if (keyword in seen or len(keyword) < 2 or keyword in MEANINGLESS_WORDS
+                    or keyword.isdigit() or not _EMOTION_PATTERN.search(keyword)):
+                continue
+            seen.add(keyword)
+            keywords.append(keyword)
+
+    digest = hashlib.sha256()
+    for name in sorted(sources):
+        digest.update(f"{name}:{sources[name]['sha256']}".encode())
+    digest.update(str(MAX_PREVIOUS_KEYWORDS).encode())
+
+    return {
+        "version": digest.hexdigest()[:12],
+        "built_at": datetime.now().isoformat(timespec='seconds'),
+        "sources": sources,
+        "keywords": keywords[:MAX_PREVIOUS_KEYWORDS]
+    }
+
+
+def write_artifact(artifact: Dict[str, Any], path: str = ARTIFACT_PATH) -> None:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class PreviousKeywordStore:
+    """이전 단계 키워드 메모이제이션 (산출물/원본 파일 mtime이 바뀔 때만 다시 로드)"""
+
+    def __init__(self, artifact_path: str = ARTIFACT_PATH, source_dir: str = PREPROCESS_RESULT_DIR):
+        self.artifact_path = artifact_path
+        self.source_dir = source_dir
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple] = None
+        self._keywords: List[str] = []
+        self._version: Optional[str] = None
+
+    def _current_signature(self) -> Tuple:
+        paths = [self.artifact_path] + _source_paths(self.source_dir)
+        return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in paths)
+
+    def _artifact_matches_sources(self, artifact: Dict[str, Any]) -> bool:
+        """산출물에 기록된 원본 해시와 현재 원본 파일이 같은지 확인"""
+        recorded = artifact.get("sources", {})
+        for path in _source_paths(self.source_dir):
+            name = os.path.basename(path)
+            exists = os.path.exists(path)
+            if exists != (name in recorded):
+                return False
+            if exists and recorded[name].get("sha256") != _file_sha256(path):
+                return False
+        return True
+
+    def _reload(self) -> None:
+        artifact = None
+        if os.path.exists(self.artifact_path):
+            try:
+                with open(self.artifact_path, 'r', encoding='utf-8') as f:
+                    artifact = json.load(f)
+            except Exception as e:
+                logger.warning(f"이전 단계 키워드 산출물 로드 실패: {e}")
+
+        if artifact is not None:
+            artifact_mtime = os.path.getmtime(self.artifact_path)
+            newer_sources = any(
+                os.path.exists(p) and os.path.getmtime(p) > artifact_mtime
+                for p in _source_paths(self.source_dir)
+            )
+            if newer_sources and not self._artifact_matches_sources(artifact):
+                logger.warning("이전 단계 키워드 산출물이 원본보다 오래되었습니다. 메모리에서 다시 계산합니다. "
+                               "(python previous_keywords.py build 로 갱신)")
+                artifact = None
+
+        if artifact is None:
+            artifact = build_previous_keywords(self.source_dir)
+
+        self._keywords = list(artifact.get("keywords", []))
+        self._version = artifact.get("version")
+        logger.info(f"이전 단계 키워드 로드: {len(self._keywords)}개 (version={self._version})")
+
+    def get(self) -> Tuple[List[str], Optional[str]]:
+        """(이전 단계 키워드 목록, 산출물 버전) 반환"""
+        signature = self._current_signature()
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    try:
+                        self._reload()
+                    except Exception as e:
+                        logger.error(f"이전 단계 키워드 로드 실패: {e}")
+                        self._keywords, self._version = [], None
+                    self._signature = signature
+        return list(self._keywords), self._version
+
+
+_store: Optional[PreviousKeywordStore] = None
+_store_lock = threading.Lock()
+
+
+def get_previous_keyword_store() -> PreviousKeywordStore:
+    """이전 단계 키워드 저장소 인스턴스 가져오기 (싱글톤 패턴)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PreviousKeywordStore()
+    return _store
+
+
+def main():
+    """이전 단계 키워드 산출물 생성/확인 CLI"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="이전 단계 감정 키워드 산출물 생성")
+    parser.add_argument('command', choices=['build', 'show'], help='build: 산출물 생성, show: 현재 키워드 출력')
+    parser.add_argument('--source-dir', type=str, default=PREPROCESS_RESULT_DIR, help='전처리 결과 디렉토리')
+    parser.add_argument('--output', type=str, default=ARTIFACT_PATH, help='산출물 경로')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        artifact = build_previous_keywords(args.source_dir)
+        write_artifact(artifact, args.output)
+        print(f"산출물 생성 완료: {args.output}")
+    else:
+        artifact_store = PreviousKeywordStore(args.output, args.source_dir)
+        keywords, version = artifact_store.get()
+        artifact = {"version": version, "keywords": keywords}
+
+    print(f"버전: {artifact['version']}")
+    print(f"키워드 {len(artifact['keywords'])}개: {artifact['keywords']}")
+
+
+if __name__ == '__main__':
+    main()
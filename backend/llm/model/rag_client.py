@@ -0,0 +1,244 @@
+import os
+import sys
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../opensearch_modules'))
+
+from model_registry import get_model_registry
+from local_index import SEARCH_BACKEND
+
+logger = logging.getLogger('rag_client')
+
+EMBEDDING_MODEL_NAME = 'nlpai-lab/KURE-v1'
+RERANKER_MODEL_NAME = "BAAI/bge-reranker-v2-m3"
+
+# RAG(OpenSearch) 설정 (환경변수)
+RAG_ENABLED = os.getenv("RAG_ENABLED", "true").lower() == "true"
+RAG_OPENSEARCH_HOST = os.getenv("RAG_OPENSEARCH_HOST", "3.39.30.211")
+RAG_OPENSEARCH_PORT = int(os.getenv("RAG_OPENSEARCH_PORT", "9200"))
+RAG_INDEX_NAME = os.getenv("RAG_INDEX_NAME", "psychology_analysis")
+RAG_TIMEOUT = int(os.getenv("RAG_OPENSEARCH_TIMEOUT", "5"))               # 검색 요청 타임아웃 (초)
+RAG_PING_TIMEOUT = float(os.getenv("RAG_OPENSEARCH_PING_TIMEOUT", "2"))  # 헬스 체크 타임아웃 (초)
+RAG_HEALTH_TTL = float(os.getenv("RAG_HEALTH_TTL", "30"))                 # 헬스 체크 결과 캐시 시간 (초)
+RAG_FAILURE_THRESHOLD = int(os.getenv("RAG_BREAKER_FAILURE_THRESHOLD", "3"))  # 연속 검색 실패 허용 횟수
+RAG_BREAKER_COOLDOWN = float(os.getenv("RAG_BREAKER_COOLDOWN", "60"))     # 차단 후 재시도까지 대기 (초)
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+def is_transport_error(error: Exception) -> bool:
+    """OpenSearch 연결/전송 오류(연결 실패, 타임아웃, HTTP 오류) 여부
+
+    쿼리 임베딩/인코딩 같은 로컬 오류는 OpenSearch 상태와 무관하므로 차단기에 반영하지 않습니다.
+    """
+    try:
+        from opensearchpy.exceptions import TransportError
+    except ImportError:
+        return isinstance(error, (ConnectionError, TimeoutError))
+    return isinstance(error, (TransportError, ConnectionError, TimeoutError))
+
+
+def get_rag_models():
+    """레지스트리에 캐시된 KURE-v1 임베딩 모델과 BGE reranker 반환 (프로세스당 1회 로드)"""
+    from sentence_transformers import CrossEncoder
+    from opensearch_client import load_embedding_model
+
+    registry = get_model_registry()
+    embedding_model = registry.get(
+        f"embedding:{EMBEDDING_MODEL_NAME}",
+        lambda: load_embedding_model(EMBEDDING_MODEL_NAME)
+    )
+    try:
+        reranker = registry.get(
+            f"reranker:{RERANKER_MODEL_NAME}",
+            lambda: CrossEncoder(RERANKER_MODEL_NAME)
+        )
+    except Exception as e:
+        print(f"Reranker 모델 로드 실패: {e}")
+        reranker = None
+    return embedding_model, reranker
+
+
+class RagClientProvider:
+    """OpenSearch RAG 클라이언트 지연 생성 + 연결 상태 캐시 + 서킷 브레이커
+
+    - 클라이언트는 첫 사용 시 한 번만 생성 (여러 스레드가 동시에 요청해도 생성은 1회)
+    - 헬스 체크 결과를 RAG_HEALTH_TTL 동안 캐시하여 검색마다 ping하지 않음
+    - 연결 실패 시 바로, 검색 실패는 RAG_FAILURE_THRESHOLD회 연속 시 차단(open)하고
+      RAG_BREAKER_COOLDOWN 동안은 네트워크 호출 없이 None을 반환 (분석은 RAG 없이 진행)
+    - 대기 시간이 지나면 한 요청만 재연결/검색을 시도(half-open)하고 성공하면 다시 정상(closed)
+    """
+
+    def __init__(self, host: str = RAG_OPENSEARCH_HOST, port: int = RAG_OPENSEARCH_PORT,
+                 enabled: bool = RAG_ENABLED, timeout: int = RAG_TIMEOUT,
+                 ping_timeout: float = RAG_PING_TIMEOUT, health_ttl: float = RAG_HEALTH_TTL,
+                 failure_threshold: int = RAG_FAILURE_THRESHOLD, cooldown: float = RAG_BREAKER_COOLDOWN):
+        self.host = host
+        self.port = port
+        self.enabled = enabled
+        self.timeout = timeout
+        self.ping_timeout = ping_timeout
+        self.health_ttl = health_ttl
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._client = None
+        self._lock = threading.Lock()
+        self._create_lock = threading.Lock()
+        self._state = BREAKER_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._healthy_until = 0.0
+        self._last_error: Optional[str] = None
+        self.rejected = 0
+
+    def _allow_request(self) -> bool:
+        """차단 상태면 False (대기 시간이 지났으면 한 요청만 통과시켜 재시도)"""
+        with self._lock:
+            if self._state == BREAKER_CLOSED:
+                return True
+            if self._state == BREAKER_OPEN and time.time() - self._opened_at >= self.cooldown:
+                self._state = BREAKER_HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == BREAKER_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def _open(self, error: str):
+        self._state = BREAKER_OPEN
+        self._opened_at = time.time()
+        self._probe_in_flight = False
+        self._healthy_until = 0.0
+        logger.warning(f"OpenSearch RAG 차단 ({self.cooldown:.0f}초 동안 RAG 없이 분석): {error}")
+
+    def record_success(self):
+        with self._lock:
+            if self._state != BREAKER_CLOSED:
+                logger.info("OpenSearch RAG 연결 복구")
+            self._state = BREAKER_CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            self._healthy_until = time.time() + self.health_ttl
+            self._last_error = None
+
+    def record_failure(self, error: Exception, connection_error: bool = False):
+        """실패 기록 (연결 실패이거나 연속 실패가 한도를 넘으면 차단)"""
+        with self._lock:
+            self._consecutive_failures += 1
+            self._last_error = str(error)
+            self._healthy_until = 0.0
+            if (connection_error or self._state == BREAKER_HALF_OPEN
+                    or self._consecutive_failures >= self.failure_threshold):
+                self._open(str(error))
+
+    def _create_client(self):
+        from opensearch_client import OpenSearchEmbeddingClient
+
+        embedding_model, reranker = get_rag_models()
+        return OpenSearchEmbeddingClient(
+            host=self.host, port=self.port, model=embedding_model, reranker=reranker,
+            timeout=self.timeout, max_retries=0
+        )
+
+    def _check_health(self, client) -> bool:
+        """캐시된 헬스 체크 결과가 만료되었을 때만 ping"""
+        if time.time() < self._healthy_until:
+            return True
+        try:
+            if not client.client.ping(request_timeout=self.ping_timeout):
+                raise ConnectionError(f"OpenSearch ping 실패: {self.host}:{self.port}")
+        except Exception as e:
+            self.record_failure(e, connection_error=True)
+            return False
+        self.record_success()
+        return True
+
+    def get(self):
+        """사용 가능한 RAG 클라이언트 반환 (비활성화/차단/연결 불가 시 None)"""
+        if not self.enabled or not self._allow_request():
+            return None
+
+        if self._client is None:
+            # 모델 로드가 오래 걸릴 수 있으므로 차단기 상태용 락과 별도의 락으로 생성
+            with self._create_lock:
+                if self._client is None:
+                    if self._state == BREAKER_OPEN:
+                        # 기다리는 동안 다른 스레드의 연결 시도가 실패한 경우 바로 포기
+                        return None
+                    try:
+                        self._client = self._create_client()
+                    except Exception as e:
+                        print(f"OpenSearch 초기화 실패: {e}")
+                        self.record_failure(e, connection_error=True)
+                        return None
+                    print("OpenSearch RAG 시스템 초기화 완료")
+                    self.record_success()
+                    return self._client
+
+        client = self._client
+        if not self._check_health(client):
+            return None
+        return client
+
+    def hybrid_search(self, query_text: str, index_name: str = RAG_INDEX_NAME, **kwargs) -> Optional[List[Dict]]:
+        """하이브리드 검색 (RAG를 사용할 수 없으면 None, 연결/전송 결과에 따라 차단기 상태 갱신)"""
+        client = self.get()
+        if client is None:
+            return None
+        try:
+            results = client.hybrid_search(index_name=index_name, query_text=query_text,
+                                           raise_on_error=True, **kwargs)
+        except Exception as e:
+            if is_transport_error(e):
+                self.record_failure(e)
+            else:
+                # 로컬 임베딩/리랭킹 오류: 이번 검색만 실패 처리하고 차단기는 그대로 유지
+                logger.error(f"RAG 검색 실패 (OpenSearch 외 오류, 차단기 미반영): {type(e).__name__}: {e}")
+            return None
+        self.record_success()
+        return results
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "backend": SEARCH_BACKEND,
+                "host": f"{self.host}:{self.port}" if SEARCH_BACKEND != "local" else None,
+                "connected": self._client is not None,
+                "breaker": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "retry_in_seconds": (
+                    max(0.0, round(self.cooldown - (time.time() - self._opened_at), 1))
+                    if self._state == BREAKER_OPEN else None
+                ),
+                "rejected": self.rejected,
+                "last_error": self._last_error,
+                "query_cache": self._client.query_cache.stats() if self._client is not None else None,
+                "reranker": (
+                    self._client.reranker_service.stats()
+                    if self._client is not None and self._client.reranker_service is not None else None
+                )
+            }
+
+
+_provider: Optional[RagClientProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_rag_client_provider() -> RagClientProvider:
+    """RAG 클라이언트 제공자 인스턴스 가져오기 (싱글톤 패턴)"""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = RagClientProvider()
+    return _provider
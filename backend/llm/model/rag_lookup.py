@@ -0,0 +1,361 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from collections import Counter
+from functools import lru_cache
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(__file__), '../opensearch_modules'))
+
+from rag_client import RAG_INDEX_NAME, RERANKER_MODEL_NAME, EMBEDDING_MODEL_NAME, get_rag_client_provider
+from query_cache import normalize_query
+from local_index import EMBEDDINGS_DIR
+from embedding_store import source_paths
+
+logger = logging.getLogger('rag_lookup')
+
+# RAG 조회 테이블 설정 (환경변수)
+LOOKUP_ENABLED = os.getenv("RAG_LOOKUP_ENABLED", "true").lower() == "true"
+LOOKUP_PATH = os.getenv(
+    "RAG_LOOKUP_PATH",
+    os.path.join(os.path.dirname(__file__), '../../result/cache/rag_lookup.json')
+)
+LOOKUP_MISS_LOG = os.getenv(
+    "RAG_LOOKUP_MISS_LOG",
+    os.path.join(os.path.dirname(__file__), '../../result/cache/rag_lookup_misses.jsonl')
+)  # 빈 문자열이면 미스 기록 안 함
+LOOKUP_MISS_LOG_MAX_BYTES = int(os.getenv("RAG_LOOKUP_MISS_LOG_MAX_BYTES", str(5 * 1024 * 1024)))  # 초과 시 .1로 교체
+# keywords: 요소 문장에 나오는 코퍼스 요소명(창문, 뿌리 등) 집합을 키로 사용 (GPT 요소 문장은 거의 반복되지 않음)
+# elements: 정규화한 요소 문장 집합 그대로 사용 (같은 문장이 반복되는 경우에만 적중)
+LOOKUP_KEY_MODE = os.getenv("RAG_LOOKUP_KEY_MODE", "keywords").lower()
+LOOKUP_TOP_K = int(os.getenv("RAG_LOOKUP_TOP_K", "3"))
+
+TABLE_FORMAT_VERSION = 1
+
+# 요소명 뒤에 붙을 수 있는 복수 접미사/조사 (창문이, 뿌리는, 나뭇잎들의 등)
+_PARTICLES = (
+    "에서는", "으로는", "에서", "으로", "에는", "에도", "이나", "이랑", "까지", "처럼", "보다", "부터",
+    "하고", "이며", "이고", "과", "와", "이", "가", "은", "는", "을", "를", "의", "에", "로", "도", "만", "랑"
+)
+
+# 실시간 검색과 같은 파라미터 (search_rag_documents)
+SEARCH_K = 10
+
+
+def element_set_key(elements: Iterable[str]) -> Optional[str]:
+    """요소 리스트 → 순서/중복/공백 차이를 무시한 키 (요소별 정규화 후 정렬)"""
+    normalized = sorted({normalize_query(e) for e in elements if e and e.strip()})
+    return '\n'.join(normalized) if normalized else None
+
+
+@lru_cache(maxsize=4)
+def _term_patterns(vocabulary: Tuple[str, ...]) -> List[Tuple[str, Pattern]]:
+    """요소명별 매칭 패턴 (어절 단위로 일치하되 복수 접미사/조사는 허용, 여러 어절 요소명은 공백 차이 무시)"""
+    suffix = f"(?:들)?(?:{'|'.join(_PARTICLES)})?"
+    patterns = []
+    for term in vocabulary:
+        words = [re.escape(word) for word in normalize_query(term).split(' ') if word]
+        if words:
+            body = r'\s*'.join(words)
+            patterns.append((term, re.compile(rf"(?<!\w){body}{suffix}(?!\w)")))
+    return patterns
+
+
+def keyword_set_key(elements: Iterable[str], vocabulary: Iterable[str]) -> Optional[str]:
+    """요소 리스트에 등장하는 코퍼스 요소명(창문, 뿌리 등)의 집합 → 키
+
+    조사가 붙은 형태(창문이, 뿌리가)는 매칭하고, 다른 단어의 일부(선명 → 선, 문제 → 문)는 매칭하지 않습니다.
+    """
+    text = '\n'.join(normalize_query(e) for e in elements if e)
+    matched = {term for term, pattern in _term_patterns(tuple(vocabulary)) if pattern.search(text)}
+    return '\n'.join(sorted(matched)) if matched else None
+
+
+def corpus_version(embeddings_dir: str = EMBEDDINGS_DIR) -> str:
+    """코퍼스 버전 (인덱스 문서 ID와 같은 내용 해시들의 해시, 코퍼스가 바뀌면 달라짐)"""
+    from index_sync import iter_content_documents
+
+    digest = hashlib.blake2b(digest_size=12)
+    for doc_id, _ in iter_content_documents(embeddings_dir):
+        digest.update(doc_id.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def corpus_vocabulary(embeddings_dir: str = EMBEDDINGS_DIR) -> List[str]:
+    """코퍼스의 요소명 목록 (keywords 모드 키 생성용)"""
+    from embedding_store import iter_embedding_items
+
+    return sorted({element for _, element, _ in iter_embedding_items(embeddings_dir)})
+
+
+def _top_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """검색 결과 → search_rag_documents 반환 형식"""
+    return {
+        'text': result['text'],
+        'metadata': result.get('metadata', {}),
+        'document': result.get('document', ''),
+        'element': result.get('element', ''),
+        'score': result.get('rerank_score', result.get('score', 0))
+    }
+
+
+class RagLookupTable:
+    """요소 집합 → 미리 계산한 top-k RAG 결과 조회 테이블
+
+    - 오프라인으로 만든 테이블(JSON)을 로드하여 키가 있으면 검색 없이 결과 반환
+    - 테이블은 인덱스 이름과 코퍼스 버전으로 버전 관리되어, 코퍼스가 바뀐 뒤에는 사용하지 않음 (실시간 검색)
+    - 테이블 파일이나 코퍼스 파일이 바뀌면 재시작 없이 다시 확인
+    - 미스가 난 키는 조회와 같은 키로 기록해 두었다가 다음 빌드 때 자주 나온 것부터 테이블에 추가
+      (기록 파일이 max_miss_log_bytes를 넘으면 .1로 교체하여 크기 제한)
+    """
+
+    def __init__(self, path: str = LOOKUP_PATH, miss_log: str = LOOKUP_MISS_LOG, enabled: bool = LOOKUP_ENABLED,
+                 index_name: str = RAG_INDEX_NAME, embeddings_dir: str = EMBEDDINGS_DIR,
+                 key_mode: str = LOOKUP_KEY_MODE, max_miss_log_bytes: int = LOOKUP_MISS_LOG_MAX_BYTES):
+        self.path = path
+        self.miss_log = miss_log
+        self.enabled = enabled
+        self.index_name = index_name
+        self.embeddings_dir = embeddings_dir
+        self.key_mode = key_mode
+        self.max_miss_log_bytes = max_miss_log_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._table: Optional[Dict[str, Any]] = None
+        self._vocabulary: Optional[List[str]] = None
+        self._signature: Optional[Tuple] = None
+        self._state = "not_loaded"
+        self._current_version: Optional[str] = None
+
+    def _current_signature(self) -> Optional[Tuple]:
+        """테이블 파일과 코퍼스 원본 파일(.npy/.jsonl 또는 JSON)의 수정 시각 (테이블이 없으면 None)"""
+        try:
+            table_mtime = os.path.getmtime(self.path)
+        except OSError:
+            return None
+        sources = tuple(
+            (path, os.path.getmtime(path) if os.path.exists(path) else None)
+            for path in source_paths(self.embeddings_dir)
+        )
+        return table_mtime, sources
+
+    def _reload_if_changed(self):
+        signature = self._current_signature()
+        if signature is None:
+            self._table, self._state, self._signature = None, "missing", None
+            return
+        if signature == self._signature:
+            return
+        self._signature = signature
+        self._vocabulary = None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                table = json.load(f)
+            # 테이블이나 코퍼스 파일이 바뀔 때마다 현재 코퍼스 버전을 다시 계산
+            # (실행 중 코퍼스가 갱신되면 이전 테이블은 stale, 재빌드된 테이블은 다시 ready)
+            self._current_version = corpus_version(self.embeddings_dir)
+        except Exception as e:
+            logger.warning(f"RAG 조회 테이블 로드 실패: {e}")
+            self._table, self._state = None, "error"
+            return
+
+        if (table.get("format") != TABLE_FORMAT_VERSION or table.get("index") != self.index_name
+                or table.get("corpus_version") != self._current_version):
+            logger.warning(f"RAG 조회 테이블이 현재 코퍼스/인덱스와 맞지 않아 사용하지 않습니다: {self.path}")
+            self._table, self._state = None, "stale"
+            return
+        self._table, self._state = table, "ready"
+        self._vocabulary = table.get("vocabulary") or None
+        logger.info(f"RAG 조회 테이블 로드: {len(table.get('entries', {}))}개 항목 ({table.get('key_mode')})")
+
+    def _current_key_mode(self) -> str:
+        return (self._table or {}).get("key_mode", self.key_mode)
+
+    def _get_vocabulary(self) -> List[str]:
+        """keywords 모드 요소명 목록 (테이블이 없어도 미스를 같은 키로 기록할 수 있도록 코퍼스에서 계산)"""
+        if self._vocabulary is None:
+            try:
+                self._vocabulary = corpus_vocabulary(self.embeddings_dir)
+            except Exception as e:
+                logger.warning(f"코퍼스 요소명 로드 실패: {e}")
+                self._vocabulary = []
+        return self._vocabulary
+
+    def key(self, elements: Iterable[str], key_mode: Optional[str] = None) -> Optional[str]:
+        key_mode = key_mode or self._current_key_mode()
+        if key_mode == "keywords":
+            return keyword_set_key(elements, self._get_vocabulary())
+        return element_set_key(elements)
+
+    def get(self, elements: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """미리 계산된 결과 (없으면 None, 빈 리스트는 '검색 결과 없음'으로 계산된 항목)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._reload_if_changed()
+            table = self._table
+            key = self.key(elements) if table is not None else None
+        if table is None:
+            return None
+        results = table["entries"].get(key) if key is not None else None
+        with self._lock:
+            if results is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return results
+
+    def record_miss(self, elements: List[str]):
+        """실시간 검색으로 처리한 요소 집합을 조회와 같은 키로 기록 (다음 빌드의 후보)"""
+        if not self.enabled or not self.miss_log:
+            return
+        try:
+            with self._lock:
+                key_mode = self._current_key_mode()
+                key = self.key(elements, key_mode)
+                if key is None:
+                    return
+                os.makedirs(os.path.dirname(os.path.abspath(self.miss_log)), exist_ok=True)
+                with open(self.miss_log, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({"key_mode": key_mode, "elements": key.split('\n'), "at": time.time()},
+                                       ensure_ascii=False) + '\n')
+                    size = f.tell()
+                if self.max_miss_log_bytes > 0 and size > self.max_miss_log_bytes:
+                    # 이전 기록 하나만 남기고 교체 (로그가 계속 커지지 않도록)
+                    os.replace(self.miss_log, f"{self.miss_log}.1")
+        except OSError as e:
+            logger.warning(f"RAG 조회 미스 기록 실패: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            if self.enabled:
+                self._reload_if_changed()
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "state": self._state if self.enabled else "disabled",
+                "path": self.path,
+                "entries": len(self._table["entries"]) if self._table else 0,
+                "key_mode": self._current_key_mode(),
+                "built_at": self._table.get("built_at") if self._table else None,
+                "corpus_version": self._current_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+
+def load_miss_log(path: str = LOOKUP_MISS_LOG, min_count: int = 2,
+                  key_mode: Optional[str] = None) -> List[List[str]]:
+    """미스 기록(교체된 .1 포함)에서 min_count번 이상 나온 키 (자주 나온 순, key_mode가 주어지면 해당 모드만)"""
+    if not path:
+        return []
+    counts: Counter = Counter()
+    for log_path in (f"{path}.1", path):
+        if not os.path.exists(log_path):
+            continue
+        with open(log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    if key_mode is None or entry.get("key_mode", "elements") == key_mode:
+                        counts[tuple(entry["elements"])] += 1
+                except (ValueError, KeyError):
+                    continue
+    return [list(elements) for elements, count in counts.most_common() if count >= min_count]
+
+
+def build_lookup_table(queries: List[List[str]], path: str = LOOKUP_PATH, key_mode: str = LOOKUP_KEY_MODE,
+                       top_k: int = LOOKUP_TOP_K, index_name: str = RAG_INDEX_NAME,
+                       embeddings_dir: str = EMBEDDINGS_DIR) -> Dict[str, Any]:
+    """요소 집합별로 실시간 검색과 같은 하이브리드 검색 + 리랭킹을 미리 실행해 테이블 저장
+
+    keywords 모드에서는 키(코퍼스 요소명 집합)를 공백으로 이어 붙인 쿼리로 검색합니다.
+    """
+    provider = get_rag_client_provider()
+    vocabulary = corpus_vocabulary(embeddings_dir)
+    entries: Dict[str, List[Dict[str, Any]]] = {}
+    failed = 0
+    for elements in queries:
+        key = keyword_set_key(elements, vocabulary) if key_mode == "keywords" else element_set_key(elements)
+        if key is None or key in entries:
+            continue
+        query_text = ' '.join(key.split('\n')) if key_mode == "keywords" else ' '.join(elements)
+        results = provider.hybrid_search(query_text, index_name=index_name, k=SEARCH_K, use_reranker=True)
+        if results is None:
+            # RAG를 사용할 수 없는 상태에서 만든 빈 결과는 저장하지 않음
+            failed += 1
+            continue
+        entries[key] = [_top_result(r) for r in results[:top_k]]
+
+    table = {
+        "format": TABLE_FORMAT_VERSION,
+        "index": index_name,
+        "corpus_version": corpus_version(embeddings_dir),
+        "embedding_model": EMBEDDING_MODEL_NAME,
+        "reranker_model": RERANKER_MODEL_NAME,
+        "key_mode": key_mode,
+        "top_k": top_k,
+        "built_at": datetime.now().isoformat(),
+        "vocabulary": vocabulary,
+        "entries": entries
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False)
+    os.replace(f"{path}.tmp", path)
+    print(f"RAG 조회 테이블 저장: {path} ({len(entries)}개 항목, 검색 실패 {failed}개)")
+    return table
+
+
+_lookup_table: Optional[RagLookupTable] = None
+_lookup_table_lock = threading.Lock()
+
+
+def get_rag_lookup_table() -> RagLookupTable:
+    """RAG 조회 테이블 인스턴스 가져오기 (싱글톤 패턴)"""
+    global _lookup_table
+    if _lookup_table is None:
+        with _lookup_table_lock:
+            if _lookup_table is None:
+                _lookup_table = RagLookupTable()
+    return _lookup_table
+
+
+def main():
+    """조회 테이블 빌드 CLI (코퍼스가 바뀌면 다시 실행)"""
+    parser = argparse.ArgumentParser(description="RAG 요소 조회 테이블 빌드")
+    parser.add_argument('--output', default=LOOKUP_PATH)
+    parser.add_argument('--key-mode', choices=['elements', 'keywords'], default=LOOKUP_KEY_MODE)
+    parser.add_argument('--top-k', type=int, default=LOOKUP_TOP_K)
+    parser.add_argument('--queries', help="요소 집합 파일 (한 줄에 JSON 문자열 리스트 하나)")
+    parser.add_argument('--miss-log', default=LOOKUP_MISS_LOG, help="실시간 검색 미스 기록")
+    parser.add_argument('--min-count', type=int, default=2, help="미스 기록에서 포함할 최소 등장 횟수")
+    parser.add_argument('--vocabulary', action='store_true', help="코퍼스 요소명 각각을 단일 요소 쿼리로 포함")
+    args = parser.parse_args()
+
+    queries = load_miss_log(args.miss_log, args.min_count, args.key_mode)
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            queries.extend(json.loads(line) for line in f if line.strip())
+    if args.vocabulary:
+        queries.extend([element] for element in corpus_vocabulary())
+    if not queries:
+        print("빌드할 쿼리가 없습니다 (--queries, --vocabulary 또는 미스 기록 필요)")
+        return False
+
+    build_lookup_table(queries, args.output, args.key_mode, args.top_k)
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+sys.path.append(os.path.dirname(__file__))
+
+logger = logging.getLogger('result_cache')
+
+# 결과 캐시 설정 (환경변수)
+CACHE_ENABLED = os.getenv("ANALYSIS_RESULT_CACHE", "true").lower() == "true"
+CACHE_DB_PATH = os.getenv(
+    "ANALYSIS_RESULT_CACHE_DB",
+    os.path.join(os.path.dirname(__file__), '../../result/cache/analysis_results.db')
+)
+CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_RESULT_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_RESULT_CACHE_MAX_ENTRIES", "1000"))
+
+# 캐시 키 계산 시 이미지 정규화 크기 (업로드 시 만드는 YOLO용 이미지와 동일)
+NORMALIZED_SIZE = (320, 320)
+
+
+def _normalize_image(image):
+    """EXIF 회전, RGB 변환, 320px 축소를 적용한 정규화 이미지 반환"""
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    if image.width > NORMALIZED_SIZE[0] or image.height > NORMALIZED_SIZE[1]:
+        image = image.copy()
+        image.thumbnail(NORMALIZED_SIZE, Image.Resampling.LANCZOS)
+    return image
+
+
+def dhash(image, hash_size: int = 8) -> int:
+    """차이 해시(dHash) 계산 - 인접 픽셀 밝기 비교로 만드는 64비트 지각 해시"""
+    from PIL import Image
+
+    gray = image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = list(gray.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (1 if pixels[offset + col] > pixels[offset + col + 1] else 0)
+    return value
+
+
+def compute_image_key(image_path: str) -> Tuple[str, str, str]:
+    """이미지 파일의 캐시 키 계산
+
+    Returns:
+        tuple: (캐시 키, dHash 16진수, 정규화 이미지 픽셀의 SHA-256)
+    """
+    from PIL import Image
+
+    with Image.open(image_path) as image:
+        return compute_image_key_from_image(image)
+
+
+def compute_image_key_from_image(image) -> Tuple[str, str, str]:
+    """이미 디코딩된 PIL 이미지의 캐시 키 계산 (compute_image_key와 같은 키)"""
+    normalized = _normalize_image(image)
+    perceptual = f"{dhash(normalized):016x}"
+    digest = hashlib.sha256(
+        f"{normalized.width}x{normalized.height}:".encode() + normalized.tobytes()
+    ).hexdigest()
+    return f"{perceptual}:{digest}", perceptual, digest
+
+
+class AnalysisResultCache:
+    """SQLite 기반 분석 결과 캐시 (TTL + LRU 제거)
+
+    동일하거나 바이트 단위로 같은 이미지가 다시 들어오면 YOLO/GPT/BERT를 다시 실행하지 않고
+    저장된 결과를 반환합니다. 여러 워커 프로세스가 같은 DB 파일을 공유할 수 있습니다.
+    """
+
+    def __init__(self, db_path: str = CACHE_DB_PATH, ttl_seconds: int = CACHE_TTL_SECONDS,
+                 max_entries: int = CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_results (
+                    cache_key TEXT PRIMARY KEY,
+                    perceptual_hash TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_results_accessed ON analysis_results (last_accessed)")
+        finally:
+            conn.close()
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """캐시 조회 (만료된 항목은 삭제 후 None 반환)"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT payload, created_at FROM analysis_results WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if self.ttl_seconds > 0 and now - row["created_at"] > self.ttl_seconds:
+                conn.execute("DELETE FROM analysis_results WHERE cache_key = ?", (cache_key,))
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE analysis_results SET last_accessed = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                (now, cache_key)
+            )
+        finally:
+            conn.close()
+        self.hits += 1
+        return json.loads(row["payload"])
+
+    def put(self, cache_key: str, payload: Dict[str, Any]):
+        """결과 저장 후 만료 항목 및 최대 개수 초과분(오래 사용되지 않은 순) 제거"""
+        perceptual, _, content = cache_key.partition(":")
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_results "
+                "(cache_key, perceptual_hash, content_hash, payload, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key, perceptual, content, json.dumps(payload, ensure_ascii=False, default=str), now, now)
+            )
+            if self.ttl_seconds > 0:
+                conn.execute("DELETE FROM analysis_results WHERE created_at < ?", (now - self.ttl_seconds,))
+            if self.max_entries > 0:
+                conn.execute(
+                    "DELETE FROM analysis_results WHERE cache_key IN ("
+                    "SELECT cache_key FROM analysis_results ORDER BY last_accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        try:
+            entries = conn.execute("SELECT COUNT(*) FROM analysis_results").fetchone()[0]
+        finally:
+            conn.close()
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+_cache: Optional[AnalysisResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[AnalysisResultCache]:
+    """프로세스 전역 결과 캐시 반환 (ANALYSIS_RESULT_CACHE=false이면 None)"""
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnalysisResultCache()
+    return _cache
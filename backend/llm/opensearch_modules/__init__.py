@@ -5,6 +5,11 @@ OpenSearch Modular System
 from .opensearch_config import ConfigManager, OpenSearchConfig, EmbeddingConfig, IndexConfig, RAGConfig
 from .opensearch_client import OpenSearchConnection, OpenSearchEmbeddingClient
 from .embedding_manager import EmbeddingManager
+from .query_cache import QueryEmbeddingCache
+from .reranker_service import RerankerService
+from .local_index import LocalVectorIndex, LocalSearchClient
+from .index_sync import IndexSync
+from .bulk_loader import BulkLoader
 from .search_engine import SearchEngine, IndexManager
 from .rag_processor import RAGDataProcessor
 from .summary_generator import SummaryGenerator
@@ -19,6 +24,12 @@ __all__ = [
     'OpenSearchConnection',
     'OpenSearchEmbeddingClient',
     'EmbeddingManager',
+    'QueryEmbeddingCache',
+    'RerankerService',
+    'LocalVectorIndex',
+    'LocalSearchClient',
+    'IndexSync',
+    'BulkLoader',
     'SearchEngine',
     'IndexManager',
     'RAGDataProcessor',
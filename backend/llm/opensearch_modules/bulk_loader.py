@@ -0,0 +1,196 @@
+"""
+Bulk Index Loader Module
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set
+
+from opensearchpy import OpenSearch
+from opensearchpy.helpers import parallel_bulk
+
+from index_sync import iter_content_documents
+
+logger = logging.getLogger(__name__)
+
+# 벌크 로드 설정 (환경변수)
+BULK_THREADS = int(os.getenv('BULK_THREADS', '4'))
+BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', '1000'))                       # 요청당 최대 문서 수
+BULK_MAX_CHUNK_BYTES = int(os.getenv('BULK_MAX_CHUNK_BYTES', str(5 * 1024 * 1024)))  # 요청당 최대 바이트 (실제 분할 기준)
+BULK_MAX_RETRIES = int(os.getenv('BULK_MAX_RETRIES', '3'))
+BULK_INITIAL_BACKOFF = float(os.getenv('BULK_INITIAL_BACKOFF', '2'))                # 재시도 대기 (초, 회차마다 2배)
+BULK_PROGRESS_EVERY = 500
+
+# 재시도하지 않는 실패 (매핑 오류 등 다시 보내도 실패하는 요청)
+NON_RETRYABLE_STATUS = {400, 401, 403, 404, 409, 413}
+
+ActionFactory = Callable[[Optional[Set[str]]], Iterable[Dict[str, Any]]]
+
+
+def iter_index_actions(index_name: str, embeddings_dir: str,
+                       only_ids: Optional[Set[str]] = None) -> Iterator[Dict[str, Any]]:
+    """임베딩 저장소 → 색인 액션 스트리밍 (내용 해시 ID, only_ids가 주어지면 해당 ID만)"""
+    timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    for doc_id, source in iter_content_documents(embeddings_dir):
+        if only_ids is not None and doc_id not in only_ids:
+            continue
+        source["timestamp"] = timestamp
+        yield {"_op_type": "index", "_index": index_name, "_id": doc_id, "_source": source}
+
+
+class BulkLoader:
+    """대량 초기 색인용 벌크 로더
+
+    - 로드하는 동안 refresh_interval=-1, number_of_replicas=0으로 바꾸고 끝나면 원래 값으로 복구
+    - parallel_bulk로 여러 스레드에서 전송 (요청 크기는 max_chunk_bytes 기준으로 분할)
+    - 실패한 문서는 ID만 기억했다가 액션을 다시 만들어 지수 백오프로 재시도 (액션 전체를 메모리에 두지 않음)
+    - 로드 후 refresh + force merge
+    """
+
+    def __init__(self, client, index_name: str, threads: int = BULK_THREADS, chunk_size: int = BULK_CHUNK_SIZE,
+                 max_chunk_bytes: int = BULK_MAX_CHUNK_BYTES, max_retries: int = BULK_MAX_RETRIES,
+                 initial_backoff: float = BULK_INITIAL_BACKOFF, max_num_segments: Optional[int] = 1,
+                 progress_every: int = BULK_PROGRESS_EVERY):
+        self.client = client
+        self.index_name = index_name
+        self.threads = max(1, threads)
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_num_segments = max_num_segments
+        self.progress_every = progress_every
+        self._started_at = 0.0
+
+    def _current_settings(self) -> Dict[str, Any]:
+        response = self.client.indices.get_settings(index=self.index_name, flat_settings=True)
+        settings = next(iter(response.values()))['settings']
+        return {
+            "refresh_interval": settings.get('index.refresh_interval'),
+            "number_of_replicas": settings.get('index.number_of_replicas')
+        }
+
+    def _put_settings(self, settings: Dict[str, Any]):
+        self.client.indices.put_settings(index=self.index_name, body={"index": settings})
+
+    def _send(self, actions: Iterable[Dict[str, Any]], report: Dict[str, Any]) -> Set[str]:
+        """액션 전송 후 재시도할 문서 ID 반환"""
+        retry_ids = set()
+        start = time.time()
+        interval_start, interval_docs = start, 0
+        for ok, result in parallel_bulk(
+            self.client, actions, thread_count=self.threads, chunk_size=self.chunk_size,
+            max_chunk_bytes=self.max_chunk_bytes, raise_on_error=False, raise_on_exception=False
+        ):
+            info = next(iter(result.values()))
+            if ok:
+                report["indexed"] += 1
+            elif info.get('status') in NON_RETRYABLE_STATUS:
+                report["errors"] += 1
+                logger.warning(f"색인 실패 ({info.get('_id')}): {info.get('error')}")
+            else:
+                retry_ids.add(info.get('_id'))
+
+            interval_docs += 1
+            if interval_docs >= self.progress_every:
+                now = time.time()
+                print(f"  {report['indexed']}건 색인 ({interval_docs / max(now - interval_start, 1e-6):.0f} docs/s, "
+                      f"평균 {report['indexed'] / max(now - self._started_at, 1e-6):.0f} docs/s)")
+                interval_start, interval_docs = now, 0
+        return retry_ids
+
+    def load(self, make_actions: ActionFactory) -> Dict[str, Any]:
+        """색인 설정을 조정한 상태로 벌크 로드
+
+        Args:
+            make_actions: only_ids(None이면 전체)를 받아 색인 액션을 만드는 함수 (재시도 시 다시 호출)
+        """
+        report = {"index": self.index_name, "indexed": 0, "errors": 0, "retries": 0}
+        self._started_at = time.time()
+        original = self._current_settings()
+        self._put_settings({"refresh_interval": "-1", "number_of_replicas": 0})
+        print(f"벌크 로드 시작: {self.index_name} (스레드 {self.threads}, 요청당 최대 {self.max_chunk_bytes // 1024} KB)")
+        try:
+            retry_ids = self._send(make_actions(None), report)
+            for attempt in range(self.max_retries):
+                if not retry_ids:
+                    break
+                backoff = self.initial_backoff * (2 ** attempt)
+                print(f"  실패 {len(retry_ids)}건 {backoff:.0f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+                time.sleep(backoff)
+                report["retries"] += len(retry_ids)
+                retry_ids = self._send(make_actions(retry_ids), report)
+            report["errors"] += len(retry_ids)
+        finally:
+            # 실패해도 원래 설정은 반드시 복구 (값이 없었으면 None으로 기본값 복원)
+            self._put_settings(original)
+            self.client.indices.refresh(index=self.index_name)
+
+        if self.max_num_segments:
+            merge_start = time.time()
+            self.client.indices.forcemerge(index=self.index_name, max_num_segments=self.max_num_segments,
+                                           request_timeout=3600)
+            report["forcemerge_seconds"] = round(time.time() - merge_start, 2)
+
+        elapsed = time.time() - self._started_at
+        report["seconds"] = round(elapsed, 2)
+        report["docs_per_second"] = round(report["indexed"] / elapsed, 1) if elapsed > 0 else None
+        print(f"벌크 로드 완료: {report['indexed']}건, 실패 {report['errors']}건, "
+              f"{report['seconds']}초 ({report['docs_per_second']} docs/s)")
+        return report
+
+
+def bulk_load_embeddings(client, index_name: str, embeddings_dir: str, allow_non_empty: bool = False,
+                         **kwargs) -> Dict[str, Any]:
+    """임베딩 저장소 전체를 인덱스에 벌크 로드 (내용 해시 ID라 증분 동기화와 같은 ID 체계)
+
+    초기 적재용이므로 문서가 이미 있는 인덱스에는 로드하지 않습니다
+    (이전 ID 체계의 문서가 남아 있으면 코퍼스가 중복되므로 다시 만들거나 증분 동기화 사용).
+    """
+    if not allow_non_empty:
+        existing = client.count(index=index_name)['count']
+        if existing:
+            raise RuntimeError(f"인덱스 {index_name}에 이미 문서 {existing}건이 있습니다 "
+                               f"(--force-recreate로 다시 만들거나 --incremental로 동기화하세요)")
+    loader = BulkLoader(client, index_name, **kwargs)
+    return loader.load(lambda only_ids: iter_index_actions(index_name, embeddings_dir, only_ids))
+
+
+def main():
+    """임베딩 모델 없이 OpenSearch에 바로 벌크 로드하는 CLI (로컬 컨테이너/스텁 서버 테스트용)"""
+    parser = argparse.ArgumentParser(description="Bulk load the embedding store into an existing OpenSearch index")
+    parser.add_argument('--embeddings-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'embeddings'))
+    parser.add_argument('--index', default='psychology_analysis')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=9200)
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='MyStrongPassword123!')
+    parser.add_argument('--no-ssl', action='store_true', help='Use plain HTTP (e.g. security-disabled container or stub server)')
+    parser.add_argument('--threads', type=int, default=BULK_THREADS)
+    parser.add_argument('--max-chunk-bytes', type=int, default=BULK_MAX_CHUNK_BYTES)
+    parser.add_argument('--no-forcemerge', action='store_true')
+    args = parser.parse_args()
+
+    client = OpenSearch(
+        hosts=[{'host': args.host, 'port': args.port}],
+        http_auth=(args.username, args.password) if args.username and args.password else None,
+        use_ssl=not args.no_ssl,
+        verify_certs=False,
+        ssl_show_warn=False,
+        timeout=120
+    )
+    if not client.indices.exists(index=args.index):
+        print(f"✗ Index not found: {args.index} (create it first, e.g. upload_embeddings.py --bulk-load)")
+        return False
+    report = bulk_load_embeddings(client, args.index, args.embeddings_dir, threads=args.threads,
+                                  max_chunk_bytes=args.max_chunk_bytes,
+                                  max_num_segments=None if args.no_forcemerge else 1)
+    return report["errors"] == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
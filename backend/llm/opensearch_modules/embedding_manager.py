@@ -2,14 +2,15 @@
 Embedding Management Module
 """
 
-import os
-import json
 import numpy as np
 from sentence_transformers import SentenceTransformer, CrossEncoder
 from typing import List, Dict, Any, Optional, Tuple
 import logging
 
 from opensearch_config import EmbeddingConfig
+from query_cache import QueryEmbeddingCache
+from reranker_service import RerankerService
+from embedding_store import DOCUMENT_NAMES, load_embedding_documents
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +23,8 @@ class EmbeddingManager:
         self.model: Optional[SentenceTransformer] = None
         self.reranker: Optional[CrossEncoder] = None
         self.reranker_available = False
+        self.query_cache = QueryEmbeddingCache()
+        self.reranker_service: Optional[RerankerService] = None
         self._load_models()
     
     def _load_models(self):
@@ -39,6 +42,7 @@ class EmbeddingManager:
         try:
             self.reranker = CrossEncoder(self.config.reranker_model)
             self.reranker_available = True
+            self.reranker_service = RerankerService(self.reranker)
             logger.info(f"Reranker model loaded successfully: {self.config.reranker_model}")
         except Exception as e:
             logger.warning(f"Failed to load reranker model: {e}")
@@ -56,6 +60,17 @@ class EmbeddingManager:
             logger.error(f"Failed to encode text: {e}")
             raise
     
+    def encode_query(self, query_text: str) -> List[float]:
+        """Encode search query (normalized-text LRU cache)"""
+        if not self.model:
+            raise RuntimeError("Embedding model not loaded")
+        
+        try:
+            return self.query_cache.get_or_compute(query_text, self.model.encode)
+        except Exception as e:
+            logger.error(f"Failed to encode query: {e}")
+            raise
+    
     def encode_batch(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
         """Encode batch of texts to embeddings"""
         if not self.model:
@@ -92,11 +107,8 @@ class EmbeddingManager:
                 return [(1.0, idx) for idx in range(len(texts))]
         
         try:
-            # Create query-document pairs
-            query_doc_pairs = [[query, text] for text in texts]
-            
-            # Get reranking scores
-            rerank_scores = self.reranker.predict(query_doc_pairs)
+            # Length-sorted batched scoring with (query, text) score cache
+            rerank_scores = self.reranker_service.score(query, texts)
             
             # Sort by rerank score (descending)
             scored_indices = [(float(score), idx) for idx, score in enumerate(rerank_scores)]
@@ -113,30 +125,13 @@ class EmbeddingManager:
                 return [(1.0, idx) for idx in range(len(texts))]
     
     def load_embedding_files(self, embeddings_dir: str) -> Dict[str, Any]:
-        """Load precomputed embedding files"""
-        embedding_files = [
-            'rag_doc_person_embeddings.json',
-            'rag_doc_house_embeddings.json', 
-            'rag_doc_tree_embeddings.json'
-        ]
-        
-        all_data = {}
-        
-        for filename in embedding_files:
-            filepath = os.path.join(embeddings_dir, filename)
-            
-            if os.path.exists(filepath):
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    doc_name = filename.replace('_embeddings.json', '').replace('rag_doc_', '')
-                    all_data[doc_name] = data
-                    logger.info(f"Embedding file loaded successfully: {filename}")
-                except Exception as e:
-                    logger.error(f"Failed to load embedding file {filename}: {e}")
+        """Load precomputed embeddings (binary .npy + .jsonl store, falling back to JSON)"""
+        all_data = load_embedding_documents(embeddings_dir)
+        for doc_name in DOCUMENT_NAMES:
+            if doc_name in all_data:
+                logger.info(f"Embedding file loaded successfully: {doc_name}")
             else:
-                logger.warning(f"Embedding file not found: {filepath}")
+                logger.warning(f"Embedding file not found: {doc_name} in {embeddings_dir}")
         
         return all_data
     
@@ -158,7 +153,7 @@ class EmbeddingManager:
                             logger.error(f"Invalid item structure in {doc_name}.{element}")
                             return False
                         
-                        if not isinstance(item['embedding'], list):
+                        if not isinstance(item['embedding'], (list, np.ndarray)):
                             logger.error(f"Invalid embedding format in {doc_name}.{element}")
                             return False
             
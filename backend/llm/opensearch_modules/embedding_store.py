@@ -0,0 +1,270 @@
+"""
+Binary Embedding Store Module
+"""
+
+import os
+import json
+import hashlib
+import argparse
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 임베딩 저장 형식 설정 (환경변수)
+EMBEDDING_STORE_DTYPE = os.getenv('EMBEDDING_STORE_DTYPE', 'float32').lower()  # float32 | float16
+
+# 원본 문서 순서 (OpenSearch 인덱싱 시 문서 ID 부여 순서와 같음)
+DOCUMENT_NAMES = ('person', 'house', 'tree')
+
+JSON_SUFFIX = '_embeddings.json'
+VECTORS_SUFFIX = '_embeddings.npy'
+RECORDS_SUFFIX = '_embeddings.jsonl'
+
+
+def _base_path(embeddings_dir: str, doc_name: str) -> str:
+    return os.path.join(embeddings_dir, f"rag_doc_{doc_name}")
+
+
+def store_paths(base_path: str) -> Tuple[str, str]:
+    """(벡터 .npy, 메타데이터 .jsonl) 경로"""
+    return f"{base_path}{VECTORS_SUFFIX}", f"{base_path}{RECORDS_SUFFIX}"
+
+
+def as_list(embedding) -> List[float]:
+    """OpenSearch 색인/JSON 직렬화용 float 리스트로 변환"""
+    if isinstance(embedding, np.ndarray):
+        return embedding.astype(np.float32).tolist()
+    return list(embedding)
+
+
+def save_store(embeddings_data: Dict[str, List[Dict[str, Any]]], base_path: str,
+               dtype: str = EMBEDDING_STORE_DTYPE) -> int:
+    """{요소: [{text, embedding, metadata}, ...]}를 .npy 행렬 + .jsonl 사이드카로 저장
+
+    .jsonl의 n번째 줄이 .npy의 n번째 행의 요소/텍스트/메타데이터입니다.
+    임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 항상 완전한 파일만 봅니다.
+
+    Returns:
+        int: 저장한 항목 수
+    """
+    vectors = []
+    vectors_path, records_path = store_paths(base_path)
+    os.makedirs(os.path.dirname(os.path.abspath(base_path)), exist_ok=True)
+    with open(f"{records_path}.tmp", 'w', encoding='utf-8') as f:
+        for element, items in embeddings_data.items():
+            for item in items:
+                if not isinstance(item, dict) or 'text' not in item or 'embedding' not in item:
+                    continue
+                record = {'element': element, 'text': item['text'], 'metadata': item.get('metadata', {})}
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                vectors.append(np.asarray(item['embedding'], dtype=np.float32))
+    matrix = np.stack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+    with open(f"{vectors_path}.tmp", 'wb') as f:
+        np.save(f, matrix.astype(np.dtype(dtype)))
+    os.replace(f"{vectors_path}.tmp", vectors_path)
+    os.replace(f"{records_path}.tmp", records_path)
+    return len(vectors)
+
+
+def open_store(base_path: str) -> Tuple[np.ndarray, str]:
+    """벡터 행렬(메모리 맵)과 메타데이터 파일 경로 반환"""
+    vectors_path, records_path = store_paths(base_path)
+    return np.load(vectors_path, mmap_mode='r'), records_path
+
+
+def iter_store(base_path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """저장소를 한 항목씩 스트리밍 ((요소, {text, embedding, metadata}))
+
+    embedding은 메모리 맵 행을 float32로 변환한 numpy 배열입니다.
+    """
+    vectors, records_path = open_store(base_path)
+    with open(records_path, 'r', encoding='utf-8') as f:
+        row = 0
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield record['element'], {
+                'text': record['text'],
+                'embedding': np.asarray(vectors[row], dtype=np.float32),
+                'metadata': record.get('metadata', {})
+            }
+            row += 1
+    if row != len(vectors):
+        raise ValueError(f"{base_path}: 메타데이터 {row}줄, 벡터 {len(vectors)}행으로 개수가 다릅니다.")
+
+
+def has_store(base_path: str) -> bool:
+    """최신 바이너리 저장소가 있는지 여부 (같은 이름의 JSON이 더 최근이면 오래된 저장소로 간주)"""
+    vectors_path, records_path = store_paths(base_path)
+    if not (os.path.exists(vectors_path) and os.path.exists(records_path)):
+        return False
+    json_path = f"{base_path}{JSON_SUFFIX}"
+    if os.path.exists(json_path):
+        return min(os.path.getmtime(vectors_path), os.path.getmtime(records_path)) >= os.path.getmtime(json_path)
+    return True
+
+
+def source_paths(embeddings_dir: str) -> List[str]:
+    """문서별로 실제로 읽을 파일 경로 (바이너리 저장소 우선, 없으면 JSON)"""
+    paths = []
+    for doc_name in DOCUMENT_NAMES:
+        base_path = _base_path(embeddings_dir, doc_name)
+        if has_store(base_path):
+            paths.extend(store_paths(base_path))
+        elif os.path.exists(f"{base_path}{JSON_SUFFIX}"):
+            paths.append(f"{base_path}{JSON_SUFFIX}")
+    return paths
+
+
+def iter_document(embeddings_dir: str, doc_name: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """문서 하나의 (요소, 항목) 스트리밍 (바이너리 저장소 우선, 없으면 기존 JSON)"""
+    base_path = _base_path(embeddings_dir, doc_name)
+    if has_store(base_path):
+        yield from iter_store(base_path)
+        return
+    json_path = f"{base_path}{JSON_SUFFIX}"
+    if not os.path.exists(json_path):
+        raise FileNotFoundError(json_path)
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    for element, items in data.items():
+        for item in items:
+            yield element, item
+
+
+def iter_embedding_items(embeddings_dir: str) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """person/house/tree 순서로 (문서, 요소, 항목) 스트리밍 (없는 문서는 건너뜀)"""
+    for doc_name in DOCUMENT_NAMES:
+        try:
+            for element, item in iter_document(embeddings_dir, doc_name):
+                yield doc_name, element, item
+        except FileNotFoundError as e:
+            logger.warning(f"임베딩 파일 없음: {e}")
+
+
+def load_embedding_documents(embeddings_dir: str) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """기존 load_embedding_files와 같은 {문서: {요소: [항목]}} 구조로 로드"""
+    all_data: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for doc_name, element, item in iter_embedding_items(embeddings_dir):
+        all_data.setdefault(doc_name, {}).setdefault(element, []).append(item)
+    return all_data
+
+
+class TextEmbeddingCache:
+    """텍스트 해시 → 임베딩 추가 전용(append-only) 디스크 캐시
+
+    코퍼스를 다시 만들 때 바뀌지 않은 청크는 다시 인코딩하지 않도록 합니다.
+    벡터는 float32 원시 바이너리(.f32)에, 키는 한 줄에 하나씩(.keys) 이어 쓰므로
+    배치마다 바로 기록되고 중간에 중단되어도 이미 계산한 임베딩은 남습니다.
+    키에 모델 이름이 포함되어 모델이 바뀌면 자동으로 새로 계산합니다.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str):
+        self.model_name = model_name
+        self.vectors_path = os.path.join(cache_dir, 'embedding_cache.f32')
+        self.keys_path = os.path.join(cache_dir, 'embedding_cache.keys')
+        os.makedirs(cache_dir, exist_ok=True)
+        self._rows: Dict[str, int] = {}
+        self.dimension: Optional[int] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._load()
+
+    def _load(self):
+        if not (os.path.exists(self.keys_path) and os.path.exists(self.vectors_path)):
+            return
+        with open(self.keys_path, 'r', encoding='utf-8') as f:
+            header = f.readline().strip()
+            keys = [line.strip() for line in f if line.strip()]
+        if not header.isdigit() or not keys:
+            return
+        self.dimension = int(header)
+        vectors = np.fromfile(self.vectors_path, dtype=np.float32)
+        # 마지막 쓰기가 중간에 끊긴 경우 완전한 행까지만 남기고 두 파일을 맞춤 (이후 추가 쓰기 정렬 유지)
+        count = min(len(keys), len(vectors) // self.dimension)
+        if count != len(keys) or count * self.dimension != len(vectors):
+            logger.warning(f"임베딩 캐시 복구: {count}개 항목까지 사용")
+            with open(self.vectors_path, 'r+b') as f:
+                f.truncate(count * self.dimension * 4)
+            with open(self.keys_path, 'w', encoding='utf-8') as f:
+                f.write(f"{self.dimension}\n" + ''.join(f"{key}\n" for key in keys[:count]))
+        self._vectors = vectors[:count * self.dimension].reshape(count, self.dimension)
+        self._rows = {key: row for row, key in enumerate(keys[:count])}
+
+    def key(self, text: str) -> str:
+        return hashlib.blake2b(f"{self.model_name}\0{text}".encode('utf-8'), digest_size=16).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        row = self._rows.get(self.key(text))
+        return None if row is None else self._vectors[row]
+
+    def add(self, texts: List[str], embeddings) -> None:
+        """배치 결과를 캐시 파일 끝에 바로 기록"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if not texts:
+            return
+        if self.dimension is None:
+            self.dimension = int(embeddings.shape[1])
+            with open(self.keys_path, 'w', encoding='utf-8') as f:
+                f.write(f"{self.dimension}\n")
+            open(self.vectors_path, 'wb').close()
+        keys = [self.key(text) for text in texts]
+        with open(self.vectors_path, 'ab') as f:
+            f.write(np.ascontiguousarray(embeddings).tobytes())
+        with open(self.keys_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(f"{key}\n" for key in keys))
+        start = len(self._vectors) if self._vectors is not None else 0
+        self._vectors = embeddings if self._vectors is None else np.concatenate([self._vectors, embeddings])
+        for offset, key in enumerate(keys):
+            self._rows[key] = start + offset
+
+
+def convert_json_files(embeddings_dir: str, dtype: str = EMBEDDING_STORE_DTYPE,
+                       remove_json: bool = False) -> Dict[str, int]:
+    """rag_doc_*_embeddings.json을 바이너리 저장소로 변환
+
+    Returns:
+        dict: 문서별 변환된 항목 수
+    """
+    converted = {}
+    for doc_name in DOCUMENT_NAMES:
+        base_path = _base_path(embeddings_dir, doc_name)
+        json_path = f"{base_path}{JSON_SUFFIX}"
+        if not os.path.exists(json_path):
+            continue
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        converted[doc_name] = save_store(data, base_path, dtype)
+        if remove_json:
+            os.remove(json_path)
+    return converted
+
+
+def main():
+    """JSON 임베딩 파일 → .npy + .jsonl 변환 CLI"""
+    parser = argparse.ArgumentParser(description="Convert embedding JSON files to the binary embedding store")
+    parser.add_argument('--embeddings-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'embeddings'))
+    parser.add_argument('--dtype', choices=['float32', 'float16'], default=EMBEDDING_STORE_DTYPE)
+    parser.add_argument('--remove-json', action='store_true', help='Delete the JSON files after conversion')
+    args = parser.parse_args()
+
+    converted = convert_json_files(args.embeddings_dir, args.dtype, args.remove_json)
+    if not converted:
+        print(f"✗ 변환할 JSON 파일이 없습니다: {args.embeddings_dir}")
+        return False
+    for doc_name, count in converted.items():
+        vectors_path, records_path = store_paths(_base_path(args.embeddings_dir, doc_name))
+        size = os.path.getsize(vectors_path) + os.path.getsize(records_path)
+        print(f"✓ {doc_name}: {count}개 항목 → {os.path.basename(vectors_path)} ({size / 1024:.0f} KB)")
+    return True
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if main() else 1)
@@ -2,15 +2,30 @@
 import os 
 import glob 
 import json 
+import argparse
 import numpy as np
 from tqdm import tqdm 
 import re 
 from collections import defaultdict 
+import sys
 
-from sentence_transformers import SentenceTransformer
-# 1. 모델 로드 (KURE - v1) - 1024차원 벡터
-model = SentenceTransformer("nlpai-lab/KURE-v1")
-model.max_seq_length = 8192  # 최대 시퀀스 길이 설정
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from embedding_store import EMBEDDING_STORE_DTYPE, TextEmbeddingCache, save_store, store_paths
+
+# 임베딩 생성 설정 (환경변수)
+MODEL_NAME = os.getenv('EMBEDDING_MODEL_NAME', 'nlpai-lab/KURE-v1')   # 1024차원 벡터
+MAX_SEQ_LENGTH = 8192                                                   # 최대 시퀀스 길이
+ENCODE_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '32'))        # 모델 배치 크기
+WRITE_CHUNK_SIZE = int(os.getenv('EMBEDDING_WRITE_CHUNK', '256'))       # 캐시에 기록하는 단위 (텍스트 수)
+
+
+def load_model(model_name=MODEL_NAME):
+    """임베딩 모델 로드 (import 시점이 아니라 실제로 인코딩할 때만)"""
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name)
+    model.max_seq_length = MAX_SEQ_LENGTH
+    return model
 
 
 # md 파일 로드  
@@ -103,52 +118,97 @@ def fomatted_chunked_data(element_groups):
     
     return '\n'.join(result)
 
-def create_embeddings_for_chunks(element_groups, filename, model):
+def build_chunk_text(element, item):
     """
-    각 요소 chunk에 대해 임베딩을 생성하는 함수
+    임베딩할 텍스트 생성 (조건, 키워드, 설명을 모두 포함)
     """
-    embeddings_data = {}
+    text_parts = []
+    text_parts.append(f"요소: {element}")
     
-    for element, items in tqdm(element_groups.items(), desc=f"Creating embeddings for {filename}"):
-        element_embeddings = []
-        
+    if item['conditions']:
+        text_parts.append(f"조건: {'; '.join(item['conditions'])}")
+    
+    if item['keywords']:
+        text_parts.append(f"감정 키워드: {'; '.join(item['keywords'])}")
+    
+    if item['explanations']:
+        text_parts.append(f"해석 설명: {'; '.join(item['explanations'])}")
+    
+    return ' '.join(text_parts)
+
+def collect_chunks(element_groups):
+    """
+    요소 chunk를 (요소, 텍스트, 메타데이터) 리스트로 변환 (인코딩 전에 모든 텍스트를 모으기 위함)
+    """
+    chunks = []
+    for element, items in element_groups.items():
         for item in items:
-            # 임베딩할 텍스트 생성 (조건, 키워드, 설명을 모두 포함)
-            text_parts = []
-            text_parts.append(f"요소: {element}")
-            
-            if item['conditions']:
-                text_parts.append(f"조건: {'; '.join(item['conditions'])}")
-            
-            if item['keywords']:
-                text_parts.append(f"감정 키워드: {'; '.join(item['keywords'])}")
-            
-            if item['explanations']:
-                text_parts.append(f"해석 설명: {'; '.join(item['explanations'])}")
-            
-            # 전체 텍스트 생성
-            full_text = ' '.join(text_parts)
-            
-            # 임베딩 생성
-            embedding = model.encode(full_text)
-            
-            # 데이터 저장
-            element_embeddings.append({
-                'text': full_text,
-                'embedding': embedding.tolist(),  # numpy array를 list로 변환
-                'metadata': {
-                    'original_elements': item['original_elements'],
-                    'conditions': item['conditions'],
-                    'keywords': item['keywords'],
-                    'explanations': item['explanations'],
-                    'images': item['images']
-                }
-            })
-        
-        embeddings_data[element] = element_embeddings
+            chunks.append((element, build_chunk_text(element, item), {
+                'original_elements': item['original_elements'],
+                'conditions': item['conditions'],
+                'keywords': item['keywords'],
+                'explanations': item['explanations'],
+                'images': item['images']
+            }))
+    return chunks
+
+def encode_texts(texts, model, cache=None, batch_size=ENCODE_BATCH_SIZE, pool=None,
+                 write_chunk_size=WRITE_CHUNK_SIZE, desc="Encoding"):
+    """
+    텍스트 리스트를 임베딩 행렬로 변환 (입력 순서 유지)
+    
+    - 중복 텍스트와 캐시에 있는 텍스트는 인코딩하지 않음
+    - 나머지는 길이순으로 정렬해 write_chunk_size 단위로 인코딩 (비슷한 길이끼리 배치되어 패딩 감소)
+    - pool(start_multi_process_pool)이 있으면 여러 프로세스/디바이스로 인코딩
+    - 단위마다 캐시 파일에 바로 기록하므로 중간에 중단되어도 다시 실행하면 이어서 진행
+    """
+    embeddings = {}
+    if cache is not None:
+        for text in texts:
+            cached = cache.get(text)
+            if cached is not None:
+                embeddings[text] = cached
+    
+    missing = sorted({text for text in texts if text not in embeddings}, key=len, reverse=True)
+    print(f"{desc}: 전체 {len(texts)}개, 캐시 {len(texts) - len(missing)}개 재사용, {len(missing)}개 인코딩")
+    
+    for start in tqdm(range(0, len(missing), write_chunk_size), desc=desc, disable=not missing):
+        chunk = missing[start:start + write_chunk_size]
+        if pool is not None:
+            vectors = model.encode_multi_process(chunk, pool, batch_size=batch_size)
+        else:
+            vectors = model.encode(chunk, batch_size=batch_size, show_progress_bar=False)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if cache is not None:
+            cache.add(chunk, vectors)
+        embeddings.update(zip(chunk, vectors))
     
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.stack([embeddings[text] for text in texts])
+
+def build_embeddings_data(chunks, vectors):
+    """
+    (요소, 텍스트, 메타데이터) 리스트와 임베딩 행렬을 {요소: [항목]} 구조로 변환
+    """
+    embeddings_data = {}
+    for (element, text, metadata), embedding in zip(chunks, vectors):
+        embeddings_data.setdefault(element, []).append({
+            'text': text,
+            'embedding': embedding,
+            'metadata': metadata
+        })
     return embeddings_data
 
+def create_embeddings_for_chunks(element_groups, filename, model, cache=None, pool=None):
+    """
+    각 요소 chunk에 대해 임베딩을 생성하는 함수 (배치 인코딩)
+    """
+    chunks = collect_chunks(element_groups)
+    vectors = encode_texts([text for _, text, _ in chunks], model, cache=cache, pool=pool,
+                           desc=f"Creating embeddings for {filename}")
+    return build_embeddings_data(chunks, vectors)
+
 def save_embeddings_to_file(embeddings_data, filename, output_dir):
     """
     임베딩 데이터를 파일로 저장하는 함수
@@ -156,13 +216,11 @@ def save_embeddings_to_file(embeddings_data, filename, output_dir):
     # 파일명에서 확장자 제거
     base_filename = os.path.splitext(filename)[0]
     
-    # 임베딩 파일 저장
-    embedding_file = os.path.join(output_dir, f"{base_filename}_embeddings.json")
-    
-    with open(embedding_file, 'w', encoding='utf-8') as f:
-        json.dump(embeddings_data, f, ensure_ascii=False, indent=2)
+    # 임베딩 저장 (.npy 벡터 행렬 + .jsonl 메타데이터, 들여쓰기 JSON 대비 용량/로드 시간 감소)
+    base_path = os.path.join(output_dir, base_filename)
+    save_store(embeddings_data, base_path, EMBEDDING_STORE_DTYPE)
     
-    print(f"임베딩 데이터 저장 완료: {embedding_file}")
+    print(f"임베딩 데이터 저장 완료: {', '.join(store_paths(base_path))}")
     
     # 요약 정보 저장
     summary = {}
@@ -178,78 +236,84 @@ def save_embeddings_to_file(embeddings_data, filename, output_dir):
     
     print(f"요약 정보 저장 완료: {summary_file}")
 
-def process_all_documents(md_dir, output_dir, model):
+def process_all_documents(md_dir, output_dir, model=None, use_cache=True, devices=None,
+                          batch_size=ENCODE_BATCH_SIZE):
     """
     모든 문서에 대해 임베딩 처리를 수행하는 함수
+    
+    모든 문서의 청크 텍스트를 먼저 모은 뒤 한 번에 배치 인코딩하고, 문서별 저장소 파일을 기록합니다.
+    
+    Args:
+        md_dir: 원본 md 문서 디렉토리
+        output_dir: 임베딩 저장 디렉토리 (텍스트 해시 캐시는 output_dir/embedding_cache)
+        model: SentenceTransformer 모델 (None이면 필요할 때 로드)
+        use_cache: 바뀌지 않은 청크의 임베딩 재사용 여부
+        devices: 멀티 프로세스 인코딩에 사용할 디바이스 목록 (예: ['cuda:0', 'cuda:1'], None이면 단일 프로세스)
+        batch_size: 모델 배치 크기
     """
     # 출력 디렉토리 생성
     os.makedirs(output_dir, exist_ok=True)
     
-    # 모든 md 파일 로드
+    # 모든 md 파일 로드 후 청킹
     docs = load_md_file(md_dir)
-    
+    doc_chunks = []
     for doc in docs:
-        print(f"\n처리 중인 문서: {doc['filename']}")
-        
-        # 청킹 수행
         chunked_data = chunk_by_elements(doc)
-        print(f"총 요소 수: {len(chunked_data)}")
-        
-        # 임베딩 생성
-        embeddings_data = create_embeddings_for_chunks(chunked_data, doc['filename'], model)
-        
-        # 파일로 저장
-        save_embeddings_to_file(embeddings_data, doc['filename'], output_dir)
+        print(f"{doc['filename']}: 총 요소 수 {len(chunked_data)}")
+        doc_chunks.append((doc['filename'], collect_chunks(chunked_data)))
+    
+    texts = [text for _, chunks in doc_chunks for _, text, _ in chunks]
+    cache = TextEmbeddingCache(os.path.join(output_dir, 'embedding_cache'), MODEL_NAME) if use_cache else None
+    
+    if cache is not None and all(cache.get(text) is not None for text in texts):
+        vectors = encode_texts(texts, None, cache=cache)
+    else:
+        model = model or load_model()
+        pool = model.start_multi_process_pool(target_devices=devices) if devices else None
+        try:
+            vectors = encode_texts(texts, model, cache=cache, batch_size=batch_size, pool=pool)
+        finally:
+            if pool is not None:
+                model.stop_multi_process_pool(pool)
+    
+    # 문서별로 저장
+    offset = 0
+    for filename, chunks in doc_chunks:
+        embeddings_data = build_embeddings_data(chunks, vectors[offset:offset + len(chunks)])
+        offset += len(chunks)
+        save_embeddings_to_file(embeddings_data, filename, output_dir)
 
 
-if __name__ == '__main__':
-    # 설정
-    md_dir = '../../data/md'
-    output_dir = '.'
+def main():
+    parser = argparse.ArgumentParser(description="RAG 문서 임베딩 생성")
+    parser.add_argument('--md-dir', default='../../data/md')
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--batch-size', type=int, default=ENCODE_BATCH_SIZE)
+    parser.add_argument('--devices', nargs='+', default=None,
+                        help="멀티 프로세스 인코딩 디바이스 (예: cuda:0 cuda:1 또는 cpu cpu)")
+    parser.add_argument('--no-cache', action='store_true', help="캐시를 무시하고 모든 청크를 다시 인코딩")
+    args = parser.parse_args()
     
     print("=== 문서 임베딩 처리 시작 ===")
     
     # 모든 문서 처리
-    process_all_documents(md_dir, output_dir, model)
+    process_all_documents(args.md_dir, args.output_dir, use_cache=not args.no_cache,
+                          devices=args.devices, batch_size=args.batch_size)
     
     print("\n=== 모든 문서 임베딩 처리 완료 ===")
     
-    # 결과 확인을 위한 예시 출력
-    print("\n=== 임베딩 파일 확인 ===")
-    if os.path.exists(output_dir):
-        embedding_files = glob.glob(os.path.join(output_dir, "*_embeddings.json"))
-        summary_files = glob.glob(os.path.join(output_dir, "*_summary.json"))
-        
-        print(f"생성된 임베딩 파일: {len(embedding_files)}개")
-        print(f"생성된 요약 파일: {len(summary_files)}개")
-        
-        for f in embedding_files:
-            print(f"  - {os.path.basename(f)}")
-        for f in summary_files:
-            print(f"  - {os.path.basename(f)}")
+    # 결과 확인
+    embedding_files = glob.glob(os.path.join(args.output_dir, "*_embeddings.npy"))
+    summary_files = glob.glob(os.path.join(args.output_dir, "*_summary.json"))
     
-    # 간단한 테스트를 위한 예시 데이터 로드
-    print("\n=== 임베딩 데이터 예시 ===")
-    docs = load_md_file(md_dir)
-    if docs:
-        test_doc = docs[0]
-        print(f"테스트 문서: {test_doc['filename']}")
-        chunked_data = chunk_by_elements(test_doc)
-        print(f"총 요소 수: {len(chunked_data)}")
-        
-        # 첫 번째 요소의 첫 번째 항목만 임베딩 테스트
-        first_element = list(chunked_data.keys())[0]
-        first_item = chunked_data[first_element][0]
-        
-        text_parts = [f"요소: {first_element}"]
-        if first_item['conditions']:
-            text_parts.append(f"조건: {'; '.join(first_item['conditions'])}")
-        if first_item['keywords']:
-            text_parts.append(f"감정 키워드: {'; '.join(first_item['keywords'])}")
-        
-        test_text = ' '.join(text_parts)
-        test_embedding = model.encode(test_text)
-        
-        print(f"예시 텍스트: {test_text[:100]}...")
-        print(f"임베딩 차원: {test_embedding.shape}")
-        print(f"임베딩 샘플: {test_embedding[:5]}")
\ No newline at end of file
+    print(f"생성된 임베딩 파일: {len(embedding_files)}개")
+    print(f"생성된 요약 파일: {len(summary_files)}개")
+    
+    for f in embedding_files:
+        print(f"  - {os.path.basename(f)}")
+    for f in summary_files:
+        print(f"  - {os.path.basename(f)}")
+
+
+if __name__ == '__main__':
+    main()
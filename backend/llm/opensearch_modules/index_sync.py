@@ -0,0 +1,173 @@
+"""
+Incremental Index Sync Module
+"""
+
+import json
+import time
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+import numpy as np
+from opensearchpy.helpers import parallel_bulk, scan, streaming_bulk
+
+from embedding_store import as_list, iter_embedding_items
+
+logger = logging.getLogger(__name__)
+
+SYNC_CHUNK_SIZE = 100
+
+
+def content_doc_id(doc_name: str, element: str, item: Dict[str, Any]) -> str:
+    """청크 내용(문서/요소/텍스트/메타데이터/임베딩)의 해시로 만든 문서 ID
+
+    내용이 같으면 항상 같은 ID이므로 인덱스에 이미 있는 ID는 변경되지 않은 청크입니다.
+    임베딩도 해시에 포함되어 임베딩 모델이 바뀌면 모든 청크가 다시 색인됩니다.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(json.dumps(
+        [doc_name, element, item['text'], item.get('metadata', {})], ensure_ascii=False, sort_keys=True
+    ).encode('utf-8'))
+    digest.update(np.asarray(item['embedding'], dtype=np.float32).tobytes())
+    return f"{doc_name}_{digest.hexdigest()}"
+
+
+def iter_content_documents(embeddings_dir: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """임베딩 저장소 → (내용 해시 ID, _source) 스트리밍"""
+    return iter_item_documents(iter_embedding_items(embeddings_dir))
+
+
+def iter_item_documents(items: Iterable[Tuple[str, str, Any]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(문서명, 요소, 청크) → (내용 해시 ID, _source) 스트리밍
+
+    모든 색인 경로(전체 색인, 증분 동기화, 벌크 로드, 로컬 인덱스)가 이 ID를 사용합니다.
+    완전히 같은 청크가 여러 번 나오면 순번을 붙여 구분합니다.
+    """
+    seen: Dict[str, int] = {}
+    for doc_name, element, item in items:
+        if not isinstance(item, dict) or 'text' not in item or 'embedding' not in item:
+            continue
+        doc_id = content_doc_id(doc_name, element, item)
+        occurrence = seen.get(doc_id, 0)
+        seen[doc_id] = occurrence + 1
+        if occurrence:
+            doc_id = f"{doc_id}-{occurrence}"
+        yield doc_id, {
+            "id": doc_id,
+            "document": doc_name,
+            "element": element,
+            "text": item['text'],
+            "metadata": item.get('metadata', {}),
+            "embedding": as_list(item['embedding'])
+        }
+
+
+def fetch_indexed_ids(client, index_name: str) -> Set[str]:
+    """인덱스에 있는 문서 ID 전체 (본문 없이 ID만 스크롤 조회)"""
+    if not client.indices.exists(index=index_name):
+        return set()
+    return {
+        hit['_id'] for hit in scan(client, index=index_name, query={"query": {"match_all": {}}}, _source=False)
+    }
+
+
+class IndexSync:
+    """임베딩 저장소와 OpenSearch 인덱스를 내용 해시 ID 기준으로 동기화
+
+    - 인덱스에 없는 ID(추가/변경된 청크)만 색인하고, 저장소에 없는 ID(삭제/변경 전 청크)는 삭제
+    - 액션은 제너레이터로 만들어 streaming_bulk(threads > 1이면 parallel_bulk)로 전송하므로
+      전체 액션 리스트를 메모리에 올리지 않음
+    - chunk_size개 처리할 때마다 배치 처리량(docs/s)을 기록
+    """
+
+    def __init__(self, client, index_name: str, chunk_size: int = SYNC_CHUNK_SIZE, threads: int = 1):
+        self.client = client
+        self.index_name = index_name
+        self.chunk_size = chunk_size
+        self.threads = threads
+        self.report: Dict[str, Any] = {}
+
+    def _actions(self, embeddings_dir: str, indexed_ids: Set[str]) -> Iterator[Dict[str, Any]]:
+        local_ids = set()
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        for doc_id, source in iter_content_documents(embeddings_dir):
+            local_ids.add(doc_id)
+            if doc_id in indexed_ids:
+                self.report["unchanged"] += 1
+                continue
+            self.report["added"] += 1
+            source["timestamp"] = timestamp
+            yield {"_op_type": "index", "_index": self.index_name, "_id": doc_id, "_source": source}
+
+        for doc_id in indexed_ids - local_ids:
+            self.report["deleted"] += 1
+            yield {"_op_type": "delete", "_index": self.index_name, "_id": doc_id}
+
+    def _bulk(self, actions):
+        if self.threads > 1:
+            return parallel_bulk(self.client, actions, thread_count=self.threads, chunk_size=self.chunk_size,
+                                 raise_on_error=False, raise_on_exception=False)
+        return streaming_bulk(self.client, actions, chunk_size=self.chunk_size,
+                              raise_on_error=False, raise_on_exception=False)
+
+    def run(self, embeddings_dir: str, dry_run: bool = False) -> Dict[str, Any]:
+        """동기화 실행 후 결과 반환 (dry_run이면 변경 건수만 계산)"""
+        start = time.time()
+        indexed_ids = fetch_indexed_ids(self.client, self.index_name)
+        self.report = {
+            "index": self.index_name,
+            "indexed_before": len(indexed_ids),
+            "added": 0,
+            "deleted": 0,
+            "unchanged": 0,
+            "errors": 0,
+            "batches": [],
+            "dry_run": dry_run
+        }
+        actions = self._actions(embeddings_dir, indexed_ids)
+        if dry_run:
+            for _ in actions:
+                pass
+        else:
+            self._send(actions)
+            self.client.indices.refresh(index=self.index_name)
+        self.report["seconds"] = round(time.time() - start, 2)
+        return self.report
+
+    def _send(self, actions):
+        batch_start = time.time()
+        batch_docs = 0
+        for ok, result in self._bulk(actions):
+            if not ok:
+                op, info = next(iter(result.items()))
+                # 이미 없는 문서 삭제는 실패로 보지 않음
+                if not (op == 'delete' and info.get('status') == 404):
+                    self.report["errors"] += 1
+                    logger.warning(f"동기화 실패 ({op} {info.get('_id')}): {info.get('error')}")
+            batch_docs += 1
+            if batch_docs >= self.chunk_size:
+                self._record_batch(batch_docs, time.time() - batch_start)
+                batch_start = time.time()
+                batch_docs = 0
+        if batch_docs:
+            self._record_batch(batch_docs, time.time() - batch_start)
+
+    def _record_batch(self, docs: int, seconds: float):
+        batch = {
+            "docs": docs,
+            "seconds": round(seconds, 3),
+            "docs_per_second": round(docs / seconds, 1) if seconds > 0 else None
+        }
+        self.report["batches"].append(batch)
+        print(f"배치 {len(self.report['batches'])}: {docs}건, {seconds:.2f}초 ({batch['docs_per_second']} docs/s)")
+
+
+def sync_index(client, index_name: str, embeddings_dir: str, chunk_size: int = SYNC_CHUNK_SIZE,
+               threads: int = 1, dry_run: bool = False) -> Optional[Dict[str, Any]]:
+    """임베딩 저장소 → 인덱스 증분 동기화 (실패 시 None)"""
+    try:
+        return IndexSync(client, index_name, chunk_size, threads).run(embeddings_dir, dry_run)
+    except Exception as e:
+        logger.error(f"인덱스 동기화 실패: {e}")
+        return None
@@ -0,0 +1,474 @@
+"""
+Local In-Process Search Backend
+"""
+
+import os
+import re
+import json
+import math
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from embedding_store import source_paths
+from index_sync import iter_content_documents
+
+logger = logging.getLogger(__name__)
+
+# 검색 백엔드 설정 (환경변수)
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'opensearch').lower()  # opensearch | local
+EMBEDDINGS_DIR = os.getenv(
+    'LOCAL_EMBEDDINGS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'embeddings')
+)
+LOCAL_INDEX_DIR = os.getenv('LOCAL_INDEX_DIR', os.path.join(EMBEDDINGS_DIR, 'local_index'))
+LOCAL_INDEX_HNSW = os.getenv('LOCAL_INDEX_HNSW', 'false').lower() == 'true'
+
+# 문서 ID 체계가 바뀌면 파일명을 바꿔 이전 ID로 저장된 인덱스를 다시 만들도록 함 (v2: 내용 해시 ID)
+VECTORS_FILE = 'vectors.v2.npy'
+DOCS_FILE = 'docs.v2.jsonl'
+
+# BM25 파라미터 (OpenSearch 기본값)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 메타데이터 중 keyword 타입 필드 (분석기 없이 값 전체가 일치해야 매칭)
+KEYWORD_FIELDS = {'id', 'document', 'element', 'metadata.keywords', 'metadata.images'}
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def analyze_text(text: str) -> List[str]:
+    """OpenSearch standard 분석기와 비슷한 토큰화 (유니코드 단어 단위 + 소문자)"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _field_values(doc: Dict[str, Any], field: str) -> List[str]:
+    """'metadata.keywords' 같은 점 표기 필드 값을 문자열 리스트로 반환"""
+    value: Any = doc
+    for part in field.split('.'):
+        if not isinstance(value, dict):
+            return []
+        value = value.get(part)
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value if v is not None]
+    return [str(value)]
+
+
+class BM25Field:
+    """필드 하나에 대한 BM25 역색인 (keyword 필드는 정규화 없이 값 전체를 하나의 토큰으로 취급)"""
+
+    def __init__(self, values: List[List[str]], keyword: bool = False,
+                 k1: float = BM25_K1, b: float = BM25_B):
+        self.keyword = keyword
+        self.k1 = k1
+        self.b = 0.0 if keyword else b
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        lengths = []
+        for doc_index, doc_values in enumerate(values):
+            tokens = list(doc_values) if keyword else [t for v in doc_values for t in analyze_text(v)]
+            lengths.append(len(tokens))
+            for token in tokens:
+                self.postings[token][doc_index] = self.postings[token].get(doc_index, 0) + 1
+        self.doc_count = len(values)
+        self.doc_lengths = np.asarray(lengths, dtype=np.float32)
+        self.avg_length = float(self.doc_lengths.mean()) if lengths and self.doc_lengths.sum() > 0 else 1.0
+        self.postings = dict(self.postings)
+        self.idf = {
+            token: math.log(1 + (self.doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for token, docs in self.postings.items()
+        }
+
+    def score(self, query: str) -> Dict[int, float]:
+        tokens = [query] if self.keyword else analyze_text(query)
+        scores: Dict[int, float] = defaultdict(float)
+        for token in tokens:
+            docs = self.postings.get(token)
+            if not docs:
+                continue
+            idf = self.idf[token]
+            for doc_index, tf in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_index] / self.avg_length)
+                scores[doc_index] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+
+class LocalVectorIndex:
+    """RAG 코퍼스용 인메모리 검색 인덱스
+
+    - 임베딩은 L2 정규화된 float32 행렬(.npy, 메모리 맵)로 보관하여 내적 한 번으로 코사인 유사도 계산
+    - hnswlib가 설치되어 있고 use_hnsw=True이면 필터 없는 knn에 HNSW 그래프 사용
+    - 텍스트 필드는 BM25 역색인을 지연 생성
+    """
+
+    def __init__(self, vectors: np.ndarray, docs: List[Dict[str, Any]], use_hnsw: bool = LOCAL_INDEX_HNSW):
+        if len(vectors) != len(docs):
+            raise ValueError(f"벡터 수({len(vectors)})와 문서 수({len(docs)})가 다릅니다.")
+        self.vectors = vectors
+        self.docs = docs
+        self.dimension = int(vectors.shape[1]) if len(vectors) else 0
+        self._fields: Dict[str, BM25Field] = {}
+        self._fields_lock = threading.Lock()
+        self._hnsw = self._build_hnsw() if use_hnsw else None
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    @staticmethod
+    def normalize(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    @classmethod
+    def from_embedding_files(cls, embeddings_dir: str = EMBEDDINGS_DIR, **kwargs) -> 'LocalVectorIndex':
+        """rag_doc_{person,house,tree} 임베딩에서 인덱스 생성 (OpenSearch 인덱싱과 같은 내용 해시 문서 ID)"""
+        docs = []
+        vectors = []
+        for _, source in iter_content_documents(embeddings_dir):
+            vectors.append(source.pop('embedding'))
+            docs.append(source)
+        matrix = cls.normalize(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+        return cls(matrix, docs, **kwargs)
+
+    def save(self, index_dir: str = LOCAL_INDEX_DIR) -> None:
+        """벡터(.npy) + 문서(.jsonl)로 저장 (임시 파일에 쓴 뒤 교체)"""
+        os.makedirs(index_dir, exist_ok=True)
+        vectors_path = os.path.join(index_dir, VECTORS_FILE)
+        docs_path = os.path.join(index_dir, DOCS_FILE)
+        with open(f"{vectors_path}.tmp", 'wb') as f:
+            np.save(f, np.ascontiguousarray(self.vectors, dtype=np.float32))
+        with open(f"{docs_path}.tmp", 'w', encoding='utf-8') as f:
+            for doc in self.docs:
+                f.write(json.dumps(doc, ensure_ascii=False) + '\n')
+        os.replace(f"{vectors_path}.tmp", vectors_path)
+        os.replace(f"{docs_path}.tmp", docs_path)
+
+    @classmethod
+    def load(cls, index_dir: str = LOCAL_INDEX_DIR, **kwargs) -> 'LocalVectorIndex':
+        """저장된 인덱스 로드 (벡터는 메모리 맵으로 열어 프로세스 간 페이지 공유)"""
+        vectors = np.load(os.path.join(index_dir, VECTORS_FILE), mmap_mode='r')
+        with open(os.path.join(index_dir, DOCS_FILE), 'r', encoding='utf-8') as f:
+            docs = [json.loads(line) for line in f if line.strip()]
+        return cls(vectors, docs, **kwargs)
+
+    @classmethod
+    def open(cls, embeddings_dir: str = EMBEDDINGS_DIR, index_dir: str = LOCAL_INDEX_DIR,
+             **kwargs) -> 'LocalVectorIndex':
+        """저장된 인덱스가 원본 임베딩 파일보다 최신이면 로드, 아니면 다시 만들어 저장"""
+        source_mtime = max((os.path.getmtime(p) for p in source_paths(embeddings_dir)), default=0)
+        vectors_path = os.path.join(index_dir, VECTORS_FILE)
+        docs_path = os.path.join(index_dir, DOCS_FILE)
+        if (os.path.exists(vectors_path) and os.path.exists(docs_path)
+                and min(os.path.getmtime(vectors_path), os.path.getmtime(docs_path)) >= source_mtime):
+            return cls.load(index_dir, **kwargs)
+
+        index = cls.from_embedding_files(embeddings_dir, **kwargs)
+        try:
+            index.save(index_dir)
+            logger.info(f"로컬 인덱스 저장: {index_dir} ({len(index)}개 문서)")
+            return cls.load(index_dir, **kwargs)
+        except OSError as e:
+            logger.warning(f"로컬 인덱스 저장 실패, 메모리 인덱스 사용: {e}")
+            return index
+
+    def _build_hnsw(self):
+        try:
+            import hnswlib
+        except ImportError:
+            logger.warning("hnswlib가 설치되지 않아 전체 내적 검색을 사용합니다.")
+            return None
+        if not len(self.docs):
+            return None
+        graph = hnswlib.Index(space='ip', dim=self.dimension)
+        graph.init_index(max_elements=len(self.docs), ef_construction=128, M=24)
+        graph.add_items(np.asarray(self.vectors), np.arange(len(self.docs)))
+        graph.set_ef(100)
+        return graph
+
+    def field(self, name: str) -> BM25Field:
+        """필드별 BM25 역색인 (최초 사용 시 생성)"""
+        index = self._fields.get(name)
+        if index is None:
+            with self._fields_lock:
+                index = self._fields.get(name)
+                if index is None:
+                    index = BM25Field(
+                        [_field_values(doc, name) for doc in self.docs],
+                        keyword=name in KEYWORD_FIELDS
+                    )
+                    self._fields[name] = index
+        return index
+
+    def knn(self, query_vector, k: int, candidates: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """코사인 유사도 상위 k개 (OpenSearch cosinesimil 점수와 같은 (1 + cos) / 2 반환)
+
+        Args:
+            query_vector: 쿼리 임베딩
+            k: 반환 개수
+            candidates: 검색 대상 문서 마스크 (bool 배열, None이면 전체)
+        """
+        if not len(self.docs) or k <= 0:
+            return []
+        query = self.normalize(query_vector).reshape(-1)
+        if self._hnsw is not None and candidates is None:
+            labels, distances = self._hnsw.knn_query(query, k=min(k, len(self.docs)))
+            # ip 공간의 거리 = 1 - 내적
+            return [(int(i), float((2 - d) / 2)) for i, d in zip(labels[0], distances[0])]
+
+        similarities = self.vectors @ query
+        if candidates is not None:
+            similarities = np.where(candidates, similarities, -np.inf)
+            k = min(k, int(candidates.sum()))
+        k = min(k, len(self.docs))
+        if k <= 0:
+            return []
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind='stable')]
+        return [(int(i), float((1 + similarities[i]) / 2)) for i in top]
+
+    def terms_mask(self, field: str, values: Iterable[str]) -> np.ndarray:
+        """keyword 필드 값이 values 중 하나인 문서 마스크"""
+        mask = np.zeros(len(self.docs), dtype=bool)
+        postings = self.field(field).postings
+        for value in set(values):
+            docs = postings.get(str(value))
+            if docs:
+                mask[list(docs)] = True
+        return mask
+
+
+class LocalIndexNotFoundError(KeyError):
+    """존재하지 않는 로컬 인덱스 조회"""
+
+
+class _LocalIndices:
+    """opensearch-py client.indices 중 검색 경로에서 쓰는 부분"""
+
+    def __init__(self, owner: 'LocalSearchClient'):
+        self._owner = owner
+
+    def exists(self, index: str, **kwargs) -> bool:
+        return self._owner.has_index(index)
+
+    def stats(self, index: str, **kwargs) -> Dict[str, Any]:
+        count = len(self._owner.get_index(index))
+        return {"indices": {index: {"total": {"docs": {"count": count}}}}}
+
+
+class LocalSearchClient:
+    """OpenSearch 클라이언트 대체용 인프로세스 검색 클라이언트
+
+    OpenSearchEmbeddingClient/SearchEngine이 보내는 쿼리 DSL(bool must/should/filter, knn,
+    multi_match best_fields, term, terms, match_all)을 그대로 해석하므로 검색 코드는 바꾸지 않고
+    self.client만 교체하면 네트워크 없이 동작합니다.
+    """
+
+    def __init__(self, index: LocalVectorIndex, index_names: Optional[Iterable[str]] = None):
+        self.index = index
+        # None이면 어떤 인덱스 이름으로 검색해도 같은 코퍼스 사용
+        self.index_names = set(index_names) if index_names else None
+        self.indices = _LocalIndices(self)
+
+    @classmethod
+    def from_env(cls, index_names: Optional[Iterable[str]] = None) -> 'LocalSearchClient':
+        return cls(LocalVectorIndex.open(EMBEDDINGS_DIR, LOCAL_INDEX_DIR), index_names)
+
+    def has_index(self, index: str) -> bool:
+        return self.index_names is None or index in self.index_names
+
+    def get_index(self, index: str) -> LocalVectorIndex:
+        if not self.has_index(index):
+            raise LocalIndexNotFoundError(index)
+        return self.index
+
+    def ping(self, **kwargs) -> bool:
+        return True
+
+    def info(self, **kwargs) -> Dict[str, Any]:
+        return {"name": "local", "version": {"distribution": "local", "number": "0"}, "documents": len(self.index)}
+
+    def close(self):
+        pass
+
+    def count(self, index: str, body: Optional[Dict] = None, **kwargs) -> Dict[str, int]:
+        index_obj = self.get_index(index)
+        query = (body or {}).get("query", {"match_all": {}})
+        scores = self._evaluate(index_obj, query)
+        return {"count": len(scores)}
+
+    def search(self, index: str, body: Optional[Dict] = None, **kwargs) -> Dict[str, Any]:
+        """OpenSearch search 응답 형식({'hits': {'total', 'max_score', 'hits'}})으로 반환"""
+        index_obj = self.get_index(index)
+        body = body or {}
+        size = int(body.get("size", 10))
+        scores = self._evaluate(index_obj, body.get("query", {"match_all": {}}))
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:size]
+        source_fields = body.get("_source")
+
+        hits = []
+        for doc_index, score in ranked:
+            doc = index_obj.docs[doc_index]
+            source = {f: doc[f] for f in source_fields if f in doc} if isinstance(source_fields, list) else dict(doc)
+            hits.append({"_index": index, "_id": doc["id"], "_score": float(score), "_source": source})
+        return {
+            "hits": {
+                "total": {"value": len(scores), "relation": "eq"},
+                "max_score": float(ranked[0][1]) if ranked else None,
+                "hits": hits
+            }
+        }
+
+    def msearch(self, body: List[Dict[str, Any]], index: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """(헤더, 본문) 쌍 리스트를 차례로 검색 (OpenSearch _msearch 응답 형식, 쿼리별 오류는 해당 항목에만 기록)"""
+        responses = []
+        for header, search_body in zip(body[::2], body[1::2]):
+            try:
+                response = self.search(header.get("index", index), search_body)
+                response["status"] = 200
+            except LocalIndexNotFoundError as e:
+                response = {"error": {"type": "index_not_found_exception", "reason": str(e)}, "status": 404}
+            responses.append(response)
+        return {"responses": responses}
+
+    # ---- 쿼리 DSL 해석 (문서 인덱스 -> 점수) ----
+
+    def _evaluate(self, index: LocalVectorIndex, query: Dict[str, Any]) -> Dict[int, float]:
+        if not query:
+            return {i: 1.0 for i in range(len(index))}
+        (kind, spec), = query.items()
+        if kind == "match_all":
+            return {i: float(spec.get("boost", 1.0)) for i in range(len(index))}
+        if kind == "bool":
+            return self._bool(index, spec)
+        if kind == "knn":
+            return self._knn(index, spec)
+        if kind == "multi_match":
+            return self._multi_match(index, spec)
+        if kind == "match":
+            (field, value), = spec.items()
+            text = value["query"] if isinstance(value, dict) else value
+            boost = value.get("boost", 1.0) if isinstance(value, dict) else 1.0
+            return {i: s * boost for i, s in index.field(field).score(str(text)).items()}
+        if kind in ("term", "terms"):
+            (field, value), = spec.items()
+            values = value if isinstance(value, list) else [value.get("value") if isinstance(value, dict) else value]
+            mask = index.terms_mask(field, values)
+            return {int(i): 1.0 for i in np.flatnonzero(mask)}
+        raise ValueError(f"로컬 검색에서 지원하지 않는 쿼리: {kind}")
+
+    def _bool(self, index: LocalVectorIndex, spec: Dict[str, Any]) -> Dict[int, float]:
+        def clauses(key):
+            value = spec.get(key, [])
+            return value if isinstance(value, list) else [value]
+
+        must, should, filters = clauses("must"), clauses("should"), clauses("filter")
+        allowed = None
+        for clause in filters:
+            matched = set(self._evaluate(index, clause))
+            allowed = matched if allowed is None else allowed & matched
+
+        scores: Dict[int, float] = defaultdict(float)
+        candidates = None
+        for clause in must:
+            clause_scores = self._evaluate(index, clause)
+            candidates = set(clause_scores) if candidates is None else candidates & set(clause_scores)
+            for doc_index, score in clause_scores.items():
+                scores[doc_index] += score
+
+        should_matches: Dict[int, int] = defaultdict(int)
+        for clause in should:
+            for doc_index, score in self._evaluate(index, clause).items():
+                scores[doc_index] += score
+                should_matches[doc_index] += 1
+
+        # must/filter가 없으면 should 중 하나 이상 일치해야 함 (OpenSearch minimum_should_match 기본값)
+        minimum_should_match = int(spec.get("minimum_should_match", 0 if (must or filters) else 1))
+        if candidates is None:
+            candidates = set(should_matches) if minimum_should_match > 0 else set(range(len(index)))
+        if allowed is not None:
+            candidates &= allowed
+        return {
+            doc_index: scores.get(doc_index, 0.0) for doc_index in candidates
+            if should_matches.get(doc_index, 0) >= minimum_should_match
+        }
+
+    def _knn(self, index: LocalVectorIndex, spec: Dict[str, Any]) -> Dict[int, float]:
+        (_, params), = spec.items()
+        boost = float(params.get("boost", 1.0))
+        candidates = None
+        if params.get("filter"):
+            candidates = np.zeros(len(index), dtype=bool)
+            candidates[list(self._evaluate(index, params["filter"]))] = True
+        return {i: s * boost for i, s in index.knn(params["vector"], int(params.get("k", 10)), candidates)}
+
+    def _multi_match(self, index: LocalVectorIndex, spec: Dict[str, Any]) -> Dict[int, float]:
+        """best_fields: 필드별 BM25 점수(가중치 적용) 중 최댓값"""
+        text = str(spec["query"])
+        boost = float(spec.get("boost", 1.0))
+        tie_breaker = float(spec.get("tie_breaker", 0.0))
+        per_doc: Dict[int, List[float]] = defaultdict(list)
+        for field_spec in spec.get("fields", ["text"]):
+            field, _, weight = field_spec.partition("^")
+            weight = float(weight) if weight else 1.0
+            for doc_index, score in index.field(field).score(text).items():
+                per_doc[doc_index].append(score * weight)
+        return {
+            doc_index: boost * (max(values) + tie_breaker * (sum(values) - max(values)))
+            for doc_index, values in per_doc.items()
+        }
+
+
+_local_client: Optional[LocalSearchClient] = None
+_local_client_lock = threading.Lock()
+
+
+def get_local_search_client() -> LocalSearchClient:
+    """로컬 검색 클라이언트 가져오기 (싱글톤 패턴, 프로세스당 인덱스 1회 로드)"""
+    global _local_client
+    if _local_client is None:
+        with _local_client_lock:
+            if _local_client is None:
+                _local_client = LocalSearchClient.from_env()
+    return _local_client
+
+
+def main():
+    """로컬 인덱스 생성 및 검색 확인 CLI"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="RAG 코퍼스 로컬 인덱스 생성/검색")
+    parser.add_argument('command', choices=['build', 'search'], help='build: 인덱스 생성, search: 텍스트 검색')
+    parser.add_argument('--embeddings-dir', type=str, default=EMBEDDINGS_DIR, help='임베딩 JSON 디렉토리')
+    parser.add_argument('--index-dir', type=str, default=LOCAL_INDEX_DIR, help='로컬 인덱스 저장 디렉토리')
+    parser.add_argument('--query', type=str, default='나무 가지 우울감', help='검색어 (BM25 텍스트 검색)')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        index = LocalVectorIndex.from_embedding_files(args.embeddings_dir)
+        index.save(args.index_dir)
+        print(f"로컬 인덱스 생성 완료: {args.index_dir} ({len(index)}개 문서, {index.dimension}차원)")
+        return
+
+    client = LocalSearchClient(LocalVectorIndex.open(args.embeddings_dir, args.index_dir))
+    body = {
+        "size": 5,
+        "query": {"multi_match": {"query": args.query, "fields": ["text^2", "metadata.keywords^5"]}},
+        "_source": ["id", "document", "element", "text"]
+    }
+    start = time.perf_counter()
+    response = client.search(index="local", body=body)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    for hit in response["hits"]["hits"]:
+        print(f"{hit['_score']:.3f} {hit['_id']}: {hit['_source']['text'][:60]}")
+    print(f"검색 시간: {elapsed_ms:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
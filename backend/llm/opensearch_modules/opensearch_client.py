@@ -2,9 +2,9 @@
 OpenSearch Client Connection Manager
 """
 
-import os
-import json
+import time
 import glob
+from datetime import datetime, timezone
 import numpy as np
 from opensearchpy import OpenSearch
 from opensearchpy.helpers import bulk
@@ -17,10 +17,23 @@ from tqdm import tqdm
 import logging
 
 from opensearch_config import OpenSearchConfig
+from query_cache import QueryEmbeddingCache
+from reranker_service import RerankerService
+from embedding_store import DOCUMENT_NAMES, load_embedding_documents
+from local_index import SEARCH_BACKEND, get_local_search_client
+from index_sync import SYNC_CHUNK_SIZE, iter_content_documents, sync_index
+from bulk_loader import BULK_THREADS, bulk_load_embeddings
 
 logger = logging.getLogger(__name__)
 
 
+def load_embedding_model(model_name: str = 'nlpai-lab/KURE-v1', max_seq_length: int = 8192) -> SentenceTransformer:
+    """KURE-v1 임베딩 모델 로드"""
+    model = SentenceTransformer(model_name)
+    model.max_seq_length = max_seq_length
+    return model
+
+
 class OpenSearchConnection:
     """OpenSearch connection manager"""
     
@@ -36,7 +49,12 @@ class OpenSearchConnection:
         return self._client
     
     def _connect(self):
-        """Establish OpenSearch connection"""
+        """Establish OpenSearch connection (or open the in-process index for the local backend)"""
+        if self.config.search_backend == 'local':
+            self._client = get_local_search_client()
+            logger.info(f"Local search index loaded: {len(self._client.index)} documents")
+            return
+        
         try:
             auth = (self.config.username, self.config.password) if self.config.username and self.config.password else None
             
@@ -87,7 +105,12 @@ class OpenSearchEmbeddingClient:
     def __init__(self, host: str = 'localhost', port: int = 9200, 
                  username: str = 'admin', password: str = 'MyStrongPassword123!', 
                  model_name: str = 'nlpai-lab/KURE-v1',
-                 reranker_model: str = "BAAI/bge-reranker-v2-m3"):
+                 reranker_model: str = "BAAI/bge-reranker-v2-m3",
+                 model: Optional[SentenceTransformer] = None,
+                 reranker: Optional[CrossEncoder] = None,
+                 timeout: int = 30, max_retries: int = 3,
+                 query_cache: Optional[QueryEmbeddingCache] = None,
+                 backend: Optional[str] = None):
         """
         OpenSearch 임베딩 클라이언트 초기화 (KURE-v1 기반 + Reranker)
         
@@ -98,44 +121,71 @@ class OpenSearchEmbeddingClient:
             password: 인증 비밀번호
             model_name: KURE-v1 임베딩 모델
             reranker_model: 리랭킹 모델 (BGE reranker 또는 다른 CrossEncoder)
+            model: 이미 로드된 임베딩 모델 (주어지면 model_name 로드 생략)
+            reranker: 이미 로드된 리랭킹 모델 (주어지면 reranker_model 로드 생략)
+            timeout: 요청 타임아웃 (초)
+            max_retries: 연결 실패 시 재시도 횟수
+            query_cache: 쿼리 임베딩 LRU 캐시 (None이면 환경변수 설정으로 새로 생성)
+            backend: 검색 백엔드 (opensearch / local, None이면 SEARCH_BACKEND 환경변수)
         """
-        # OpenSearch 연결 설정
-        try:
-            auth = (username, password) if username and password else None
-            self.client = OpenSearch(
-                hosts=[{'host': host, 'port': port}],
-                http_auth=auth,
-                use_ssl=True,
-                verify_certs=False,
-                ssl_assert_hostname=False,
-                ssl_show_warn=False,
-                timeout=30
-            )
-            # 연결 테스트
-            self.client.info()
-            print(f"OpenSearch 연결 성공: {host}:{port}")
-        except Exception as e:
-            print(f"OpenSearch 연결 실패: {e}")
-            raise
+        self.query_cache = query_cache if query_cache is not None else QueryEmbeddingCache()
+        self.backend = (backend or SEARCH_BACKEND).lower()
         
-        # KURE-v1 모델 로드 
-        try:
-            self.model = SentenceTransformer(model_name)
-            self.model.max_seq_length = 8192
-            print(f"임베딩 모델 로드 성공: {model_name}")
-        except Exception as e:
-            print(f"임베딩 모델 로드 실패: {e}")
-            raise
+        # 로컬 백엔드: 임베딩 파일로 만든 인프로세스 인덱스 사용 (네트워크 없음)
+        if self.backend == 'local':
+            self.client = get_local_search_client()
+            print(f"로컬 검색 인덱스 사용: {len(self.client.index)}개 문서")
+        else:
+            # OpenSearch 연결 설정
+            try:
+                auth = (username, password) if username and password else None
+                self.client = OpenSearch(
+                    hosts=[{'host': host, 'port': port}],
+                    http_auth=auth,
+                    use_ssl=True,
+                    verify_certs=False,
+                    ssl_assert_hostname=False,
+                    ssl_show_warn=False,
+                    timeout=timeout,
+                    max_retries=max_retries
+                )
+                # 연결 테스트
+                self.client.info()
+                print(f"OpenSearch 연결 성공: {host}:{port}")
+            except Exception as e:
+                print(f"OpenSearch 연결 실패: {e}")
+                raise
+        
+        # KURE-v1 모델 로드 (외부에서 주입된 모델이 있으면 재사용)
+        if model is not None:
+            self.model = model
+        else:
+            try:
+                self.model = load_embedding_model(model_name)
+                print(f"임베딩 모델 로드 성공: {model_name}")
+            except Exception as e:
+                print(f"임베딩 모델 로드 실패: {e}")
+                raise
             
-        # 리랭킹 모델 로드
-        try: 
-            self.reranker = CrossEncoder(reranker_model)
+        # 리랭킹 모델 로드 (외부에서 주입된 모델이 있으면 재사용)
+        if reranker is not None:
+            self.reranker = reranker
             self.reranker_available = True
-            print(f"Reranker 모델 로드 성공: {reranker_model}")
-        except Exception as e:
-            print(f"Reranker 모델 로드 실패: {e}")
-            self.reranker = None 
-            self.reranker_available = False
+        else:
+            try: 
+                self.reranker = CrossEncoder(reranker_model)
+                self.reranker_available = True
+                print(f"Reranker 모델 로드 성공: {reranker_model}")
+            except Exception as e:
+                print(f"Reranker 모델 로드 실패: {e}")
+                self.reranker = None 
+                self.reranker_available = False
+        # 길이순 배치 + 점수 캐시 리랭킹
+        self.reranker_service = RerankerService(self.reranker) if self.reranker_available else None
+    
+    def encode_query(self, query_text: str) -> List[float]:
+        """쿼리 임베딩 생성 (정규화된 쿼리 기준 LRU 캐시 사용)"""
+        return self.query_cache.get_or_compute(query_text, self.model.encode)
     
     def create_embedding_index(self, index_name: str, embedding_dimension: int = None):
         """
@@ -194,30 +244,14 @@ class OpenSearchEmbeddingClient:
     
     def load_embedding_files(self, embeddings_dir: str = './embeddings'):
         """
-        생성된 임베딩 파일들을 로드 
+        생성된 임베딩 파일들을 로드 (.npy + .jsonl 저장소 우선, 없으면 기존 JSON)
         """
-        embedding_files = [
-            'rag_doc_person_embeddings.json',
-            'rag_doc_house_embeddings.json', 
-            'rag_doc_tree_embeddings.json'
-        ]
-        all_data = {}
-        
-        for filename in embedding_files:
-            filepath = os.path.join(embeddings_dir, filename)
-            
-            if os.path.exists(filepath):
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    doc_name = filename.replace('_embeddings.json', '').replace('rag_doc_', '')
-                    all_data[doc_name] = data
-                    print(f"임베딩 파일 로드 성공: {filename}")
-                except Exception as e:
-                    print(f"임베딩 파일 로드 실패 {filename}: {e}")
+        all_data = load_embedding_documents(embeddings_dir)
+        for doc_name in DOCUMENT_NAMES:
+            if doc_name in all_data:
+                print(f"임베딩 파일 로드 성공: {doc_name} ({len(all_data[doc_name])}개 요소)")
             else:
-                print(f"임베딩 파일 없음: {filepath}")
+                print(f"임베딩 파일 없음: {doc_name}")
                 
         return all_data
     
@@ -226,37 +260,12 @@ class OpenSearchEmbeddingClient:
         임베딩 데이터를 OpenSearch 인덱스에 인덱싱 
         """
         try:
-            all_data = self.load_embedding_files(embeddings_dir)
-            
-            if not all_data:
-                print("로드할 데이터가 없습니다.")
-                return None
-            
-            actions = [] 
-            doc_id = 0 
-            
-            for doc_name, doc_data in all_data.items():
-                for element, items in tqdm(doc_data.items(), desc=f"Processing {doc_name}"):
-                    for item in items:
-                        if not isinstance(item, dict) or 'text' not in item or 'embedding' not in item:
-                            print(f"잘못된 데이터 형식 건너뛰기: {doc_name}_{element}_{doc_id}")
-                            continue
-                            
-                        action = {
-                            "_index": index_name,
-                            "_id": f"{doc_name}_{element}_{doc_id}",
-                            "_source": {
-                                "id": f"{doc_name}_{element}_{doc_id}",
-                                "document": doc_name,
-                                "element": element,
-                                "text": item['text'],
-                                "metadata": item.get('metadata', {}),
-                                "embedding": item['embedding'],
-                                "timestamp": "2025-07-29T00:00:00Z"
-                            }
-                        }
-                        actions.append(action)
-                        doc_id += 1
+            # 증분 동기화/벌크 로드와 같은 내용 해시 ID (다시 실행해도 같은 문서를 덮어쓰므로 중복되지 않음)
+            timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            actions = []
+            for doc_id, source in tqdm(iter_content_documents(embeddings_dir), desc="Processing"):
+                source["timestamp"] = timestamp
+                actions.append({"_index": index_name, "_id": doc_id, "_source": source})
             
             if not actions:
                 print("인덱싱할 데이터가 없습니다.")
@@ -272,20 +281,41 @@ class OpenSearchEmbeddingClient:
             print(f"인덱싱 실패: {e}")
             return None
     
-    def vector_search(self, index_name: str, query_text: str, 
-                      k: int = 10, document_filter: List[str] = None,
-                      element_filter: List[str] = None) -> List[Dict]:
+    def sync_embedding_data(self, index_name: str, embeddings_dir: str = './embeddings',
+                            chunk_size: int = SYNC_CHUNK_SIZE, threads: int = 1, dry_run: bool = False):
         """
-        백터 유사도 기반 검색 (Kure-v1 임베딩 사용)
+        임베딩 데이터를 인덱스에 증분 동기화 (내용 해시 ID 기준 추가/변경분만 색인, 없어진 청크 삭제)
+        """
+        if self.backend == 'local':
+            print("로컬 백엔드는 임베딩 저장소에서 직접 인덱스를 만들므로 동기화가 필요 없습니다.")
+            return None
+        if not dry_run and not self.client.indices.exists(index=index_name):
+            if not self.create_embedding_index(index_name):
+                return None
+        report = sync_index(self.client, index_name, embeddings_dir, chunk_size, threads, dry_run)
+        if report:
+            print(f"동기화 완료: 추가 {report['added']}, 삭제 {report['deleted']}, "
+                  f"유지 {report['unchanged']}, 실패 {report['errors']} ({report['seconds']}초)")
+        return report
+    
+    def bulk_load_embedding_data(self, index_name: str, embeddings_dir: str = './embeddings',
+                                 threads: int = BULK_THREADS, **kwargs):
+        """
+        대량 초기 색인 (refresh/replica 끄고 parallel_bulk로 전송, 실패 재시도, 설정 복구 후 force merge)
         """
+        if self.backend == 'local':
+            print("로컬 백엔드는 임베딩 저장소에서 직접 인덱스를 만들므로 색인이 필요 없습니다.")
+            return None
         try:
-            # KURE-v1로 쿼리 임베딩 생성 
-            query_embedding = self.model.encode(query_text).tolist()
+            return bulk_load_embeddings(self.client, index_name, embeddings_dir, threads=threads, **kwargs)
         except Exception as e:
-            print(f"쿼리 임베딩 생성 실패: {e}")
-            return []
-        
-        # 기본 벡터 검색 쿼리 
+            print(f"벌크 로드 실패: {e}")
+            return None
+    
+    @staticmethod
+    def _vector_search_body(query_embedding: List[float], k: int, document_filter: List[str] = None,
+                            element_filter: List[str] = None) -> Dict[str, Any]:
+        """벡터 검색 쿼리 본문"""
         search_body = {
             "size": k,
             "query":{
@@ -313,95 +343,151 @@ class OpenSearchEmbeddingClient:
             filters.append({"terms": {"element": element_filter}})
         if filters:
             search_body["query"]["bool"]["filter"] = filters
+        return search_body
+    
+    @staticmethod
+    def _parse_hits(response: Dict[str, Any], search_type: Optional[str] = None) -> List[Dict]:
+        """검색 응답 → 결과 리스트"""
+        results = []
+        for hit in response['hits']['hits']:
+            source = hit['_source']
+            result = {
+                'id': source['id'],
+                'document': source['document'],
+                'element': source['element'],
+                'text': source['text'],
+                'metadata': source['metadata'],
+                'score': hit['_score']
+            }
+            if search_type:
+                result['search_type'] = search_type
+            results.append(result)
+        return results
+    
+    def vector_search(self, index_name: str, query_text: str, 
+                      k: int = 10, document_filter: List[str] = None,
+                      element_filter: List[str] = None,
+                      query_embedding: Optional[List[float]] = None) -> List[Dict]:
+        """
+        백터 유사도 기반 검색 (Kure-v1 임베딩 사용)
+        
+        query_embedding을 주면 인코딩을 생략합니다 (같은 쿼리로 여러 전략을 실행할 때 공유).
+        """
+        if query_embedding is None:
+            try:
+                # KURE-v1로 쿼리 임베딩 생성 (캐시 적중 시 인코딩 생략)
+                query_embedding = self.encode_query(query_text)
+            except Exception as e:
+                print(f"쿼리 임베딩 생성 실패: {e}")
+                return []
+        
+        search_body = self._vector_search_body(query_embedding, k, document_filter, element_filter)
             
         try:
             response = self.client.search(index=index_name, body=search_body)
-            
-            results = []
-            
-            for hit in response['hits']['hits']:
-                source = hit['_source']
-                results.append({
-                    'id' : source['id'],
-                    'document': source['document'],
-                    'element': source['element'],
-                    'text' : source['text'],
-                    'metadata': source['metadata'],
-                    'score': hit['_score']
-                })
-            
-            return results
+            return self._parse_hits(response)
             
         except Exception as e:
             print(f"벡터 검색 실패: {e}")
             return []
 
+    def multi_search(self, index_name: str, search_bodies: List[Dict[str, Any]],
+                     search_types: List[Optional[str]] = None) -> List[List[Dict]]:
+        """
+        여러 검색 쿼리를 _msearch 한 번의 요청으로 실행 (쿼리별 결과 리스트, 실패한 쿼리는 빈 리스트)
+        """
+        search_types = search_types or [None] * len(search_bodies)
+        request = []
+        for body in search_bodies:
+            request.append({"index": index_name})
+            request.append(body)
+        
+        try:
+            response = self.client.msearch(body=request)
+        except Exception as e:
+            print(f"멀티 검색 실패: {e}")
+            return [[] for _ in search_bodies]
+        
+        results = []
+        for item, search_type in zip(response['responses'], search_types):
+            if 'error' in item:
+                print(f"멀티 검색 쿼리 실패: {item['error']}")
+                results.append([])
+            else:
+                results.append(self._parse_hits(item, search_type))
+        return results
+
     def rerank_results(self, query: str, results: List[Dict], 
-                        top_k: int = None) -> List[Dict]:
+                        top_k: int = None, timings: Optional[Dict[str, Any]] = None,
+                        score_key: Optional[str] = None) -> List[Dict]:
         """
-        검색 결과를 reranker로 재정렬
+        검색 결과를 reranker로 재정렬 (timings를 전달하면 후보 수/캐시 적중/소요시간 기록,
+        score_key는 후보 수 제한 시 기준 점수 - 기본값은 융합 결과면 fusion_score, 아니면 score)
         """
         if not self.reranker_available or not results:
             return results[:top_k] if top_k else results
         
-        # 쿼리와 문서 쌍 생성
-        query_doc_pairs = [[query, result['text']] for result in results]
-        
-        # Reranker로 점수 계산
-        scores = self.reranker.predict(query_doc_pairs)
-        
-        # 점수와 결과를 함께 정렬
-        scored_results = list(zip(scores, results))
-        scored_results.sort(key=lambda x: x[0], reverse=True)
-        
-        # 재정렬된 결과 생성
-        reranked_results = []
-        for score, result in scored_results:
-            result_copy = result.copy()
-            result_copy['rerank_score'] = float(score)
-            reranked_results.append(result_copy)
-        
-        return reranked_results[:top_k] if top_k else reranked_results
+        return self.reranker_service.rerank(query, results, top_k, timings=timings, score_key=score_key)
 
     def advanced_search(self, index_name: str, query_text: str, 
                     search_strategy: str = "auto", k: int = 10,
                     document_filter: List[str] = None,
-                    element_filter: List[str] = None) -> Dict[str, List[Dict]]:
+                    element_filter: List[str] = None) -> Dict[str, Any]:
         """
         고급 검색: 여러 전략을 조합하여 최적의 결과 제공
+        
+        auto/comprehensive는 벡터 검색과 하이브리드 검색을 _msearch 한 번으로 요청한 뒤
+        합친 후보에 대해 RRF 융합과 리랭킹을 수행합니다. 단계별 소요시간(초)은 results["timings"]에 기록됩니다.
         """
         results = {
             "vector_search": [],
             "hybrid_search": [],
             "reranked_fusion": [],
-            "final_recommendation": []
+            "final_recommendation": [],
+            "timings": {}
         }
+        timings = results["timings"]
+        started = time.perf_counter()
+        
+        # 모든 전략이 같은 쿼리 임베딩을 공유 (쿼리당 인코딩 1회)
+        try:
+            query_embedding = self.encode_query(query_text)
+        except Exception as e:
+            print(f"쿼리 임베딩 생성 실패: {e}")
+            return results
+        timings["embedding"] = time.perf_counter() - started
         
         if search_strategy in ["auto", "comprehensive"]:
-            # 1. 벡터 검색
-            vector_results = self.vector_search(
-                index_name, query_text, k=k*2, 
-                document_filter=document_filter,
-                element_filter=element_filter
+            # 1. 벡터 검색 + 하이브리드 검색 (요청 1회)
+            phase = time.perf_counter()
+            vector_results, hybrid_results = self.multi_search(
+                index_name,
+                [
+                    self._vector_search_body(query_embedding, k * 2, document_filter, element_filter),
+                    self._hybrid_search_body(query_text, query_embedding, k * 2)
+                ],
+                search_types=[None, 'hybrid']
             )
             results["vector_search"] = vector_results
-            
-            # 2. 하이브리드 검색
-            hybrid_results = self.hybrid_search(
-                index_name, query_text, k=k*2,
-                use_reranker=False
-            )
             results["hybrid_search"] = hybrid_results
+            timings["retrieval"] = time.perf_counter() - phase
             
-            # 3. 결과 융합 (Reciprocal Rank Fusion)
+            # 2. 결과 융합 (Reciprocal Rank Fusion)
+            phase = time.perf_counter()
             fused_results = self._reciprocal_rank_fusion(
                 [vector_results, hybrid_results], 
                 weights=[0.6, 0.4]
             )
+            timings["fusion"] = time.perf_counter() - phase
             
-            # 4. 최종 Reranking
+            # 3. 최종 Reranking
             if self.reranker_available:
-                final_results = self.rerank_results(query_text, fused_results, k)
+                phase = time.perf_counter()
+                rerank_stats = {}
+                final_results = self.rerank_results(query_text, fused_results, k, timings=rerank_stats,
+                                                    score_key='fusion_score')
+                timings["rerank"] = time.perf_counter() - phase
+                timings["rerank_detail"] = rerank_stats
                 results["reranked_fusion"] = final_results
             else:
                 final_results = fused_results[:k]
@@ -410,15 +496,21 @@ class OpenSearchEmbeddingClient:
             
         elif search_strategy == "fast":
             # 빠른 검색: 벡터 검색 + Reranker
+            phase = time.perf_counter()
             fast_results = self.vector_search(
                 index_name, query_text, k=k,
                 document_filter=document_filter,
-                element_filter=element_filter
+                element_filter=element_filter,
+                query_embedding=query_embedding
             )
+            timings["retrieval"] = time.perf_counter() - phase
             if self.reranker_available:
+                phase = time.perf_counter()
                 fast_results = self.rerank_results(query_text, fast_results, k)
+                timings["rerank"] = time.perf_counter() - phase
             results["final_recommendation"] = fast_results
         
+        timings["total"] = time.perf_counter() - started
         return results
     
     def _reciprocal_rank_fusion(self, result_lists: List[List[Dict]], 
@@ -459,18 +551,10 @@ class OpenSearchEmbeddingClient:
         
         return fused_results
     
-    def hybrid_search(self, index_name: str, query_text: str, 
-                     k: int = 10, boost_vector: float = 1.0, 
-                     boost_text: float = 0.5, use_reranker: bool = True,
-                     rerank_top_k: int = None) -> List[Dict]:
-        """
-        하이브리드 검색 (벡터 + 텍스트 매칭 + Reranker)
-        """
-        query_embedding = self.model.encode(query_text).tolist()
-        
-        # Reranker를 사용할 경우 더 많은 후보 검색
-        search_k = k * 3 if use_reranker and self.reranker_available else k
-        
+    @staticmethod
+    def _hybrid_search_body(query_text: str, query_embedding: List[float], search_k: int,
+                            boost_vector: float = 1.0, boost_text: float = 0.5) -> Dict[str, Any]:
+        """하이브리드 검색 쿼리 본문 (쿼리에 집/사람/나무 단어가 있으면 해당 문서로 필터)"""
         doc_type_keywords = {
             "house": ["집", "주택"],
             "person": ["사람", "인물"],
@@ -525,24 +609,34 @@ class OpenSearchEmbeddingClient:
                     }
                 }
             ]
+        return search_body
+    
+    def hybrid_search(self, index_name: str, query_text: str, 
+                     k: int = 10, boost_vector: float = 1.0, 
+                     boost_text: float = 0.5, use_reranker: bool = True,
+                     rerank_top_k: int = None, raise_on_error: bool = False,
+                     query_embedding: Optional[List[float]] = None) -> List[Dict]:
+        """
+        하이브리드 검색 (벡터 + 텍스트 매칭 + Reranker)
+        
+        raise_on_error=True이면 검색 요청 실패 시 빈 결과 대신 예외를 전달합니다 (호출 측 장애 감지용).
+        query_embedding을 주면 인코딩을 생략합니다.
+        """
+        if query_embedding is None:
+            query_embedding = self.encode_query(query_text)
+        
+        # Reranker를 사용할 경우 더 많은 후보 검색
+        search_k = k * 3 if use_reranker and self.reranker_available else k
+        
+        search_body = self._hybrid_search_body(query_text, query_embedding, search_k, boost_vector, boost_text)
         
         try:
             response = self.client.search(index=index_name, body=search_body)
-            
-            results = []
-            for hit in response['hits']['hits']:
-                source = hit['_source']
-                results.append({
-                    'id': source['id'],
-                    'document': source['document'],
-                    'element': source['element'],
-                    'text': source['text'],
-                    'metadata': source['metadata'],
-                    'score': hit['_score'],
-                    'search_type': 'hybrid'
-                })
+            results = self._parse_hits(response, 'hybrid')
         except Exception as e:
             print(f"하이브리드 검색 실패: {e}")
+            if raise_on_error:
+                raise
             return []
         
         # Reranker 적용
@@ -19,6 +19,7 @@ class OpenSearchConfig:
     ssl_assert_hostname: bool = False
     ssl_show_warn: bool = False
     timeout: int = 30
+    search_backend: str = 'opensearch'  # opensearch | local (in-process index)
     
     @classmethod
     def from_env(cls) -> 'OpenSearchConfig':
@@ -32,7 +33,8 @@ class OpenSearchConfig:
             verify_certs=os.getenv('OPENSEARCH_VERIFY_CERTS', 'false').lower() == 'true',
             ssl_assert_hostname=os.getenv('OPENSEARCH_SSL_ASSERT_HOSTNAME', 'false').lower() == 'true',
             ssl_show_warn=os.getenv('OPENSEARCH_SSL_SHOW_WARN', 'false').lower() == 'true',
-            timeout=int(os.getenv('OPENSEARCH_TIMEOUT', '30'))
+            timeout=int(os.getenv('OPENSEARCH_TIMEOUT', '30')),
+            search_backend=os.getenv('SEARCH_BACKEND', 'opensearch').lower()
         )
 
 
@@ -0,0 +1,98 @@
+"""
+Query Embedding Cache Module
+"""
+
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# 쿼리 임베딩 캐시 설정 (환경변수)
+QUERY_CACHE_SIZE = int(os.getenv('QUERY_EMBEDDING_CACHE_SIZE', '1024'))  # 0이면 캐시 사용 안 함
+QUERY_CACHE_FP16 = os.getenv('QUERY_EMBEDDING_CACHE_FP16', 'false').lower() == 'true'
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_query(text: str) -> str:
+    """캐시 키용 쿼리 정규화 (유니코드 NFC + 앞뒤 공백 제거 + 연속 공백 1칸)"""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+class QueryEmbeddingCache:
+    """정규화된 쿼리 텍스트 기준 임베딩 LRU 캐시
+
+    같은 쿼리로 여러 검색 전략(벡터/하이브리드)을 실행하거나 사용자 간에 같은 요소 쿼리가
+    반복될 때 임베딩 모델(KURE-v1) 인코딩을 한 번만 수행합니다.
+    fp16=True이면 float16으로 저장해 메모리를 절반으로 줄이고, 조회 시 float32로 돌려줍니다.
+    """
+
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE, fp16: bool = QUERY_CACHE_FP16):
+        self.max_size = max_size
+        self.dtype = np.float16 if fp16 else np.float32
+        self._entries: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = normalize_query(text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return embedding.astype(np.float32)
+
+    def put(self, text: str, embedding) -> None:
+        if self.max_size <= 0:
+            return
+        stored = np.asarray(embedding, dtype=self.dtype).copy()
+        stored.flags.writeable = False
+        key = normalize_query(text)
+        with self._lock:
+            self._entries[key] = stored
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, text: str, encode: Callable[[str], Any]) -> List[float]:
+        """캐시에 있으면 반환, 없으면 encode(정규화된 텍스트)로 계산 후 저장
+
+        Returns:
+            list: 쿼리 임베딩 (OpenSearch knn 쿼리에 바로 넣을 수 있는 float 리스트)
+        """
+        cached = self.get(text)
+        if cached is not None:
+            return cached.tolist()
+        embedding = np.asarray(encode(normalize_query(text)), dtype=np.float32)
+        self.put(text, embedding)
+        return embedding.tolist()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+            memory = sum(e.nbytes for e in self._entries.values())
+        total = self.hits + self.misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "dtype": np.dtype(self.dtype).name,
+            "memory_bytes": memory,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -393,6 +393,7 @@ class RAGDataProcessor:
                     for doc in used_docs
                 ],
                 'query': query,
+                'search_timings': search_results.get('timings', {}),
                 'prepared_at': datetime.now().isoformat()
             }
             
@@ -0,0 +1,173 @@
+"""
+Cross-Encoder Reranking Service
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from query_cache import normalize_query
+
+# 리랭킹 설정 (환경변수)
+RERANK_BATCH_SIZE = int(os.getenv('RERANK_BATCH_SIZE', '16'))
+RERANK_CACHE_SIZE = int(os.getenv('RERANK_CACHE_SIZE', '4096'))        # 0이면 점수 캐시 사용 안 함
+RERANK_MAX_CANDIDATES = int(os.getenv('RERANK_MAX_CANDIDATES', '0'))   # 0이면 후보 전체 리랭킹
+
+CacheKey = Tuple[str, str, str]
+
+
+def _text_digest(text: str) -> str:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class RerankerService:
+    """CrossEncoder 리랭킹 서비스
+
+    - 캐시에 없는 (쿼리, 문서) 쌍만 길이순으로 정렬해 batch_size 단위로 점수 계산 (패딩 최소화)
+    - (정규화된 쿼리, 문서 ID, 본문 해시) 기준 점수 LRU 캐시 (반복되는 요소 쿼리는 모델 호출 없음)
+    - max_candidates를 지정하면 1차 검색 점수 상위 후보만 리랭킹
+    - 호출마다 후보 수/캐시 적중/배치 수/소요시간을 timings로 제공
+
+    쌍별 점수는 배치 구성과 무관하므로 정렬/캐시를 적용해도 리랭킹 순위는 그대로입니다.
+    """
+
+    def __init__(self, reranker, batch_size: int = RERANK_BATCH_SIZE, cache_size: int = RERANK_CACHE_SIZE,
+                 max_candidates: int = RERANK_MAX_CANDIDATES):
+        self.reranker = reranker
+        self.batch_size = max(1, batch_size)
+        self.cache_size = cache_size
+        self.max_candidates = max_candidates
+        self._cache: 'OrderedDict[CacheKey, float]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.pairs_scored = 0
+        self.cache_hits = 0
+        self.total_seconds = 0.0
+
+    def _cache_get(self, key: CacheKey) -> Optional[float]:
+        with self._lock:
+            score = self._cache.get(key)
+            if score is not None:
+                self._cache.move_to_end(key)
+            return score
+
+    def _cache_put(self, items: List[Tuple[CacheKey, float]]) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            for key, score in items:
+                self._cache[key] = score
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def score(self, query: str, texts: Sequence[str], doc_ids: Optional[Sequence[str]] = None,
+              timings: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """(query, text) 쌍별 리랭킹 점수 (입력 순서대로)
+
+        Args:
+            query: 검색 쿼리
+            texts: 후보 문서 본문
+            doc_ids: 후보 문서 ID (캐시 키에 사용, 없으면 본문 해시만 사용)
+            timings: 전달하면 이번 호출의 통계를 기록
+        """
+        start = time.perf_counter()
+        normalized = normalize_query(query)
+        keys = [
+            (normalized, str(doc_ids[i]) if doc_ids is not None else '', _text_digest(text))
+            for i, text in enumerate(texts)
+        ]
+        scores = np.empty(len(texts), dtype=np.float32)
+        missing = []
+        for i, key in enumerate(keys):
+            cached = self._cache_get(key) if self.cache_size > 0 else None
+            if cached is None:
+                missing.append(i)
+            else:
+                scores[i] = cached
+
+        batches = 0
+        if missing:
+            # 길이순 정렬 후 배치 예측 (비슷한 길이끼리 묶여 패딩 낭비 감소)
+            order = sorted(missing, key=lambda i: len(texts[i]))
+            pairs = [[query, texts[i]] for i in order]
+            predicted = np.asarray(
+                self.reranker.predict(pairs, batch_size=self.batch_size, show_progress_bar=False),
+                dtype=np.float32
+            ).reshape(-1)
+            scores[order] = predicted
+            batches = (len(order) + self.batch_size - 1) // self.batch_size
+            self._cache_put([(keys[i], float(scores[i])) for i in order])
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.calls += 1
+            self.pairs_scored += len(missing)
+            self.cache_hits += len(texts) - len(missing)
+            self.total_seconds += elapsed
+        if timings is not None:
+            timings.update({
+                "candidates": len(texts),
+                "scored": len(missing),
+                "cache_hits": len(texts) - len(missing),
+                "batches": batches,
+                "seconds": elapsed
+            })
+        return scores
+
+    def truncate(self, results: List[Dict], score_key: Optional[str] = None) -> List[Dict]:
+        """1차 검색 점수 상위 max_candidates개만 남김 (같은 점수면 기존 순서 유지)
+
+        score_key를 지정하지 않으면 RRF 융합 결과는 'fusion_score', 아니면 'score' 기준으로 자릅니다.
+        융합 결과의 'score'는 출처(벡터 코사인/하이브리드 BM25+knn)마다 척도가 달라 비교할 수 없습니다.
+        """
+        if self.max_candidates <= 0 or len(results) <= self.max_candidates:
+            return results
+        if score_key is None:
+            score_key = 'fusion_score' if all('fusion_score' in result for result in results) else 'score'
+        ranked = sorted(range(len(results)), key=lambda i: -float(results[i].get(score_key) or 0.0))
+        keep = sorted(ranked[:self.max_candidates])
+        return [results[i] for i in keep]
+
+    def rerank(self, query: str, results: List[Dict], top_k: Optional[int] = None,
+               timings: Optional[Dict[str, Any]] = None, score_key: Optional[str] = None) -> List[Dict]:
+        """검색 결과를 리랭킹 점수 순으로 재정렬 ('rerank_score' 추가한 사본 반환, score_key는 truncate 기준)"""
+        if not results:
+            return []
+        candidates = self.truncate(results, score_key)
+        scores = self.score(
+            query,
+            [result['text'] for result in candidates],
+            doc_ids=[result.get('id', '') for result in candidates],
+            timings=timings
+        )
+        if timings is not None:
+            timings["truncated"] = len(results) - len(candidates)
+
+        order = sorted(range(len(candidates)), key=lambda i: -scores[i])
+        reranked = []
+        for i in order[:top_k] if top_k else order:
+            result_copy = candidates[i].copy()
+            result_copy['rerank_score'] = float(scores[i])
+            reranked.append(result_copy)
+        return reranked
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.pairs_scored + self.cache_hits
+            return {
+                "calls": self.calls,
+                "pairs_scored": self.pairs_scored,
+                "cache_hits": self.cache_hits,
+                "cache_hit_rate": self.cache_hits / lookups if lookups else 0.0,
+                "cache_size": len(self._cache),
+                "max_cache_size": self.cache_size,
+                "batch_size": self.batch_size,
+                "max_candidates": self.max_candidates,
+                "avg_seconds": self.total_seconds / self.calls if self.calls else 0.0
+            }
@@ -5,12 +5,15 @@ OpenSearch Search Engine Module
 from opensearchpy.helpers import bulk
 from typing import List, Dict, Any, Optional, Tuple
 from collections import defaultdict
+import time
 import logging
+from datetime import datetime, timezone
 from tqdm import tqdm
 
 from opensearch_client import OpenSearchConnection
 from embedding_manager import EmbeddingManager
 from opensearch_config import IndexConfig
+from index_sync import iter_item_documents, sync_index
 
 logger = logging.getLogger(__name__)
 
@@ -87,31 +90,18 @@ class IndexManager:
                 logger.warning("No data to index")
                 return None
             
+            # Same content-hash ids as incremental sync and bulk load, so re-indexing overwrites instead of duplicating
+            items = (
+                (doc_name, element, item)
+                for doc_name, doc_data in embedding_data.items()
+                for element, element_items in doc_data.items()
+                for item in element_items
+            )
+            timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
             actions = []
-            doc_id = 0
-            
-            for doc_name, doc_data in embedding_data.items():
-                for element, items in tqdm(doc_data.items(), desc=f"Processing {doc_name}"):
-                    for item in items:
-                        if not isinstance(item, dict) or 'text' not in item or 'embedding' not in item:
-                            logger.warning(f"Skipping invalid data: {doc_name}_{element}_{doc_id}")
-                            continue
-                        
-                        action = {
-                            "_index": index_name,
-                            "_id": f"{doc_name}_{element}_{doc_id}",
-                            "_source": {
-                                "id": f"{doc_name}_{element}_{doc_id}",
-                                "document": doc_name,
-                                "element": element,
-                                "text": item['text'],
-                                "metadata": item.get('metadata', {}),
-                                "embedding": item['embedding'],
-                                "timestamp": "2025-07-29T00:00:00Z"
-                            }
-                        }
-                        actions.append(action)
-                        doc_id += 1
+            for doc_id, source in tqdm(iter_item_documents(items), desc="Processing"):
+                source["timestamp"] = timestamp
+                actions.append({"_index": index_name, "_id": doc_id, "_source": source})
             
             if not actions:
                 logger.warning("No valid documents to index")
@@ -126,6 +116,19 @@ class IndexManager:
             logger.error(f"Indexing failed: {e}")
             return None
     
+    def sync_embedding_data(self, index_name: str, embeddings_dir: str, threads: int = 1,
+                            dry_run: bool = False) -> Optional[Dict[str, Any]]:
+        """Incrementally sync the embedding store into the index (content-hash ids, upserts and deletes only)"""
+        if not dry_run and not self.connection.client.indices.exists(index=index_name):
+            if not self.create_embedding_index(index_name):
+                return None
+        report = sync_index(self.connection.client, index_name, embeddings_dir,
+                            chunk_size=self.config.chunk_size, threads=threads, dry_run=dry_run)
+        if report:
+            logger.info(f"Sync completed: {report['added']} added, {report['deleted']} deleted, "
+                        f"{report['unchanged']} unchanged, {report['errors']} errors")
+        return report
+    
     def get_index_stats(self, index_name: str) -> Optional[Dict[str, Any]]:
         """Get index statistics"""
         try:
@@ -168,16 +171,10 @@ class SearchEngine:
         self.connection = connection
         self.embedding_manager = embedding_manager
     
-    def vector_search(self, index_name: str, query_text: str, 
-                     k: int = 10, document_filter: List[str] = None,
-                     element_filter: List[str] = None) -> List[Dict]:
-        """Vector similarity search"""
-        try:
-            query_embedding = self.embedding_manager.encode_text(query_text)
-        except Exception as e:
-            logger.error(f"Failed to create query embedding: {e}")
-            return []
-        
+    @staticmethod
+    def _vector_search_body(query_embedding: List[float], k: int, document_filter: List[str] = None,
+                            element_filter: List[str] = None) -> Dict[str, Any]:
+        """Build the vector search request body"""
         search_body = {
             "size": k,
             "query": {
@@ -205,36 +202,13 @@ class SearchEngine:
             filters.append({"terms": {"element": element_filter}})
         if filters:
             search_body["query"]["bool"]["filter"] = filters
-        
-        try:
-            response = self.connection.client.search(index=index_name, body=search_body)
-            
-            results = []
-            for hit in response['hits']['hits']:
-                source = hit['_source']
-                results.append({
-                    'id': source['id'],
-                    'document': source['document'],
-                    'element': source['element'],
-                    'text': source['text'],
-                    'metadata': source['metadata'],
-                    'score': hit['_score'],
-                    'search_type': 'vector'
-                })
-            
-            return results
-            
-        except Exception as e:
-            logger.error(f"Vector search failed: {e}")
-            return []
+        return search_body
     
-    def hybrid_search(self, index_name: str, query_text: str, 
-                     k: int = 10, boost_vector: float = 1.0, 
-                     boost_text: float = 0.5) -> List[Dict]:
-        """Hybrid search combining vector and text matching"""
-        query_embedding = self.embedding_manager.encode_text(query_text)
-        
-        search_body = {
+    @staticmethod
+    def _hybrid_search_body(query_text: str, query_embedding: List[float], k: int,
+                            boost_vector: float = 1.0, boost_text: float = 0.5) -> Dict[str, Any]:
+        """Build the hybrid (knn + multi_match) search request body"""
+        return {
             "size": k,
             "query": {
                 "bool": {
@@ -266,29 +240,87 @@ class SearchEngine:
             },
             "_source": ["id", "document", "element", "text", "metadata"]
         }
+    
+    @staticmethod
+    def _parse_hits(response: Dict[str, Any], search_type: str) -> List[Dict]:
+        """Convert a search response into result dicts"""
+        results = []
+        for hit in response['hits']['hits']:
+            source = hit['_source']
+            results.append({
+                'id': source['id'],
+                'document': source['document'],
+                'element': source['element'],
+                'text': source['text'],
+                'metadata': source['metadata'],
+                'score': hit['_score'],
+                'search_type': search_type
+            })
+        return results
+    
+    def vector_search(self, index_name: str, query_text: str, 
+                     k: int = 10, document_filter: List[str] = None,
+                     element_filter: List[str] = None,
+                     query_embedding: Optional[List[float]] = None) -> List[Dict]:
+        """Vector similarity search (pass query_embedding to skip encoding)"""
+        if query_embedding is None:
+            try:
+                query_embedding = self.embedding_manager.encode_query(query_text)
+            except Exception as e:
+                logger.error(f"Failed to create query embedding: {e}")
+                return []
+        
+        search_body = self._vector_search_body(query_embedding, k, document_filter, element_filter)
         
         try:
             response = self.connection.client.search(index=index_name, body=search_body)
+            return self._parse_hits(response, 'vector')
             
-            results = []
-            for hit in response['hits']['hits']:
-                source = hit['_source']
-                results.append({
-                    'id': source['id'],
-                    'document': source['document'],
-                    'element': source['element'],
-                    'text': source['text'],
-                    'metadata': source['metadata'],
-                    'score': hit['_score'],
-                    'search_type': 'hybrid'
-                })
-            
-            return results
+        except Exception as e:
+            logger.error(f"Vector search failed: {e}")
+            return []
+    
+    def hybrid_search(self, index_name: str, query_text: str, 
+                     k: int = 10, boost_vector: float = 1.0, 
+                     boost_text: float = 0.5,
+                     query_embedding: Optional[List[float]] = None) -> List[Dict]:
+        """Hybrid search combining vector and text matching (pass query_embedding to skip encoding)"""
+        if query_embedding is None:
+            query_embedding = self.embedding_manager.encode_query(query_text)
+        
+        search_body = self._hybrid_search_body(query_text, query_embedding, k, boost_vector, boost_text)
+        
+        try:
+            response = self.connection.client.search(index=index_name, body=search_body)
+            return self._parse_hits(response, 'hybrid')
             
         except Exception as e:
             logger.error(f"Hybrid search failed: {e}")
             return []
     
+    def multi_search(self, index_name: str, search_bodies: List[Dict[str, Any]],
+                     search_types: List[str]) -> List[List[Dict]]:
+        """Run several searches in a single _msearch request (failed searches return empty lists)"""
+        request = []
+        for body in search_bodies:
+            request.append({"index": index_name})
+            request.append(body)
+        
+        try:
+            response = self.connection.client.msearch(body=request)
+        except Exception as e:
+            logger.error(f"Multi search failed: {e}")
+            return [[] for _ in search_bodies]
+        
+        results = []
+        for item, search_type in zip(response['responses'], search_types):
+            if 'error' in item:
+                logger.error(f"Multi search query failed: {item['error']}")
+                results.append([])
+            else:
+                results.append(self._parse_hits(item, search_type))
+        return results
+    
     def search_by_element(self, index_name: str, element_name: str, k: int = 10) -> List[Dict]:
         """Search by specific element name"""
         search_body = {
@@ -357,38 +389,56 @@ class SearchEngine:
     def advanced_search(self, index_name: str, query_text: str, 
                        strategy: str = "auto", k: int = 10,
                        document_filter: List[str] = None,
-                       element_filter: List[str] = None) -> Dict[str, List[Dict]]:
-        """Advanced search with multiple strategies"""
+                       element_filter: List[str] = None) -> Dict[str, Any]:
+        """Advanced search with multiple strategies
+        
+        auto/comprehensive sends the vector and hybrid queries in one _msearch request, then runs
+        fusion and reranking over the merged candidates. Per-phase seconds are in results["timings"].
+        """
         results = {
             "vector_search": [],
             "hybrid_search": [],
             "reranked_fusion": [],
-            "final_recommendation": []
+            "final_recommendation": [],
+            "timings": {}
         }
+        timings = results["timings"]
+        started = time.perf_counter()
+        
+        # All strategies share a single query embedding
+        try:
+            query_embedding = self.embedding_manager.encode_query(query_text)
+        except Exception as e:
+            logger.error(f"Failed to create query embedding: {e}")
+            return results
+        timings["embedding"] = time.perf_counter() - started
         
         if strategy in ["auto", "comprehensive"]:
-            # Vector search
-            vector_results = self.vector_search(
-                index_name, query_text, k=k*2, 
-                document_filter=document_filter,
-                element_filter=element_filter
+            # Vector + hybrid search in a single round trip
+            phase = time.perf_counter()
+            vector_results, hybrid_results = self.multi_search(
+                index_name,
+                [
+                    self._vector_search_body(query_embedding, k * 2, document_filter, element_filter),
+                    self._hybrid_search_body(query_text, query_embedding, k * 2)
+                ],
+                search_types=['vector', 'hybrid']
             )
             results["vector_search"] = vector_results
-            
-            # Hybrid search
-            hybrid_results = self.hybrid_search(
-                index_name, query_text, k=k*2
-            )
             results["hybrid_search"] = hybrid_results
+            timings["retrieval"] = time.perf_counter() - phase
             
             # Fusion
+            phase = time.perf_counter()
             fused_results = self.reciprocal_rank_fusion(
                 [vector_results, hybrid_results], 
                 weights=[0.6, 0.4]
             )
+            timings["fusion"] = time.perf_counter() - phase
             
             # Reranking
             if self.embedding_manager.reranker_available and fused_results:
+                phase = time.perf_counter()
                 texts = [r['text'] for r in fused_results]
                 scored_indices = self.embedding_manager.rerank_results(query_text, texts)
                 
@@ -397,6 +447,7 @@ class SearchEngine:
                     result = fused_results[idx].copy()
                     result['rerank_score'] = score
                     final_results.append(result)
+                timings["rerank"] = time.perf_counter() - phase
                 
                 results["reranked_fusion"] = final_results
                 results["final_recommendation"] = final_results
@@ -404,13 +455,17 @@ class SearchEngine:
                 results["final_recommendation"] = fused_results[:k]
         
         elif strategy == "fast":
+            phase = time.perf_counter()
             fast_results = self.vector_search(
                 index_name, query_text, k=k,
                 document_filter=document_filter,
-                element_filter=element_filter
+                element_filter=element_filter,
+                query_embedding=query_embedding
             )
+            timings["retrieval"] = time.perf_counter() - phase
             
             if self.embedding_manager.reranker_available:
+                phase = time.perf_counter()
                 texts = [r['text'] for r in fast_results]
                 scored_indices = self.embedding_manager.rerank_results(query_text, texts)
                 
@@ -419,9 +474,11 @@ class SearchEngine:
                     result = fast_results[idx].copy()
                     result['rerank_score'] = score
                     reranked_results.append(result)
+                timings["rerank"] = time.perf_counter() - phase
                 
                 results["final_recommendation"] = reranked_results
             else:
                 results["final_recommendation"] = fast_results
         
-        return results
\ No newline at end of file
+        timings["total"] = time.perf_counter() - started
+        return results
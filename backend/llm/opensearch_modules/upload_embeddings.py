@@ -6,7 +6,6 @@ Uploads embedding files from the embeddings directory to OpenSearch
 
 import os
 import sys
-import json
 import argparse
 from pathlib import Path
 from typing import Optional, Dict, Any
@@ -16,33 +15,24 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from opensearch_config import ConfigManager
 from opensearch_client import OpenSearchEmbeddingClient
+from embedding_store import DOCUMENT_NAMES, iter_document
 
 
 def load_embedding_files(embeddings_dir: str) -> Dict[str, Any]:
-    """Load all embedding JSON files from the directory"""
-    embedding_files = [
-        'rag_doc_person_embeddings.json',
-        'rag_doc_house_embeddings.json', 
-        'rag_doc_tree_embeddings.json'
-    ]
-    
+    """Load all embeddings from the directory (binary .npy + .jsonl store, falling back to JSON)"""
     all_data = {}
     
-    for filename in embedding_files:
-        filepath = os.path.join(embeddings_dir, filename)
-        
-        if os.path.exists(filepath):
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                doc_name = filename.replace('_embeddings.json', '').replace('rag_doc_', '')
-                all_data[doc_name] = data
-                print(f"✓ Loaded: {filename} ({len(data)} elements)")
-            except Exception as e:
-                print(f"✗ Failed to load {filename}: {e}")
-        else:
-            print(f"✗ File not found: {filepath}")
+    for doc_name in DOCUMENT_NAMES:
+        try:
+            data = {}
+            for element, item in iter_document(embeddings_dir, doc_name):
+                data.setdefault(element, []).append(item)
+            all_data[doc_name] = data
+            print(f"✓ Loaded: {doc_name} ({len(data)} elements)")
+        except FileNotFoundError as e:
+            print(f"✗ File not found: {e}")
+        except Exception as e:
+            print(f"✗ Failed to load {doc_name}: {e}")
     
     return all_data
 
@@ -55,7 +45,10 @@ def upload_embeddings_to_opensearch(
     username: str = 'admin',
     password: str = 'MyStrongPassword123!',
     create_index: bool = True,
-    force_recreate: bool = False
+    force_recreate: bool = False,
+    incremental: bool = False,
+    threads: int = 1,
+    bulk_load: bool = False
 ) -> bool:
     """
     Upload embeddings to OpenSearch
@@ -69,6 +62,10 @@ def upload_embeddings_to_opensearch(
         password: OpenSearch password
         create_index: Whether to create index if it doesn't exist
         force_recreate: Whether to delete and recreate existing index
+        incremental: Only upsert added/changed chunks and delete removed ones (content-hash ids)
+        threads: Bulk request threads for incremental sync / bulk load (parallel_bulk when > 1)
+        bulk_load: Tuned initial load into a new or empty index (refresh/replicas off, parallel_bulk,
+            retries, force merge); refused for a non-empty index unless force_recreate is set
     
     Returns:
         bool: Success status
@@ -84,9 +81,27 @@ def upload_embeddings_to_opensearch(
             password=password
         )
         
+        if incremental:
+            print("Starting incremental sync to OpenSearch...")
+            report = client.sync_embedding_data(index_name, embeddings_dir, threads=threads)
+            if report is None or report['errors']:
+                print("✗ Sync failed")
+                return False
+            print(f"✓ Sync completed: {report['added']} added, {report['deleted']} deleted, "
+                  f"{report['unchanged']} unchanged in {report['seconds']}s")
+            return True
+        
         # Check if index exists
         index_exists = client.client.indices.exists(index=index_name)
         
+        # Bulk load is for an empty index only (existing documents could duplicate the corpus)
+        if bulk_load and index_exists and not force_recreate:
+            existing = client.client.count(index=index_name)['count']
+            if existing:
+                print(f"✗ Index {index_name} already has {existing} documents; "
+                      f"use --bulk-load with --force-recreate, or --incremental to update it in place")
+                return False
+        
         if force_recreate and index_exists:
             print(f"Deleting existing index: {index_name}")
             client.client.indices.delete(index=index_name)
@@ -111,8 +126,13 @@ def upload_embeddings_to_opensearch(
             return False
         
         # Upload embeddings
-        print("Starting bulk upload to OpenSearch...")
-        response = client.index_embedding_data(index_name, embeddings_dir)
+        if bulk_load:
+            print(f"Starting tuned bulk load to OpenSearch ({threads} threads)...")
+            report = client.bulk_load_embedding_data(index_name, embeddings_dir, threads=threads)
+            response = report if report and not report['errors'] else None
+        else:
+            print("Starting bulk upload to OpenSearch...")
+            response = client.index_embedding_data(index_name, embeddings_dir)
         
         if response:
             print("✓ Upload completed successfully!")
@@ -158,6 +178,15 @@ Examples:
   # Dry run to see what would be uploaded
   python upload_embeddings.py --dry-run
   
+  # Incremental sync (only added/changed chunks are indexed, removed chunks are deleted)
+  python upload_embeddings.py --incremental
+  
+  # Full rebuild with the tuned bulk loader (refresh/replicas off, 8 threads, force merge)
+  python upload_embeddings.py --force-recreate --bulk-load --threads 8
+  
+  # Convert the JSON files to the binary store (.npy + .jsonl) for faster loading
+  python embedding_store.py --embeddings-dir ./embeddings
+  
   # Upload specific files to psychology_analysis index:
   # - rag_doc_person_embeddings.json (사람 그림 심리 분석 데이터)
   # - rag_doc_house_embeddings.json (집 그림 심리 분석 데이터)  
@@ -221,6 +250,26 @@ Data Structure:
         help='Delete and recreate index if it exists'
     )
     
+    parser.add_argument(
+        '--incremental', 
+        action='store_true',
+        help='Sync only added/changed/removed chunks using content-hash document ids'
+    )
+    
+    parser.add_argument(
+        '--threads', 
+        type=int, 
+        default=1,
+        help='Bulk request threads for incremental sync / bulk load (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--bulk-load', 
+        action='store_true',
+        help='Tuned bulk load into a new or empty index (combine with --force-recreate for an existing one): '
+             'disable refresh/replicas, parallel_bulk with retries, restore and force merge'
+    )
+    
     parser.add_argument(
         '--dry-run', 
         action='store_true',
@@ -263,7 +312,10 @@ Data Structure:
         username=args.username,
         password=args.password,
         create_index=not args.no_create_index,
-        force_recreate=args.force_recreate
+        force_recreate=args.force_recreate,
+        incremental=args.incremental,
+        threads=args.threads,
+        bulk_load=args.bulk_load
     )
     
     if success:
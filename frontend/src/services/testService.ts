@@ -4,6 +4,7 @@ import { DrawingTest, PipelineAnalysisResponse, PipelineStatusResponse } from '.
 class TestService {
   private readonly BASE_PATH = '/api/v1/test';
   private readonly PIPELINE_PATH = '/api/v1/pipeline';
+  private readonly MIN_STAGE_DISPLAY_MS = 2000; // 단계별 최소 표시 시간
 
   /**
    * 현재 사용자의 그림 테스트 결과 조회
@@ -93,8 +94,28 @@ class TestService {
 
   /**
    * 분석 완료까지 폴링
+   * 서버는 단계가 끝나는 즉시 다음 단계로 넘어가므로, 단계별 최소 표시 시간은 여기서 보장합니다.
    */
   async pollAnalysisStatus(testId: string, onProgress?: (status: PipelineStatusResponse) => void, abortSignal?: AbortSignal): Promise<PipelineStatusResponse> {
+    let displayedStep = 0;
+    let stepShownAt = Date.now();
+
+    // 이전 단계가 최소 표시 시간을 채운 뒤에 다음 단계를 표시
+    const showProgress = async (status: PipelineStatusResponse) => {
+      const step = status.status === 'completed' ? (status.total_steps ?? 3) + 1 : status.current_step;
+      if (typeof step === 'number' && step > displayedStep) {
+        const remaining = this.MIN_STAGE_DISPLAY_MS - (Date.now() - stepShownAt);
+        if (displayedStep > 0 && remaining > 0) {
+          await new Promise((resolve) => setTimeout(resolve, remaining));
+        }
+        displayedStep = step;
+        stepShownAt = Date.now();
+      }
+      if (onProgress && !abortSignal?.aborted) {
+        onProgress(status);
+      }
+    };
+
     const poll = async (): Promise<PipelineStatusResponse> => {
       // 중단 신호가 있으면 폴링 중단
       if (abortSignal?.aborted) {
@@ -104,9 +125,7 @@ class TestService {
       try {
         const status = await this.getAnalysisStatus(testId);
         
-        if (onProgress) {
-          onProgress(status);
-        }
+        await showProgress(status);
 
         if (status.status === 'completed' || status.status === 'failed' || status.status === 'cancelled') {
           return status;